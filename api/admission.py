@@ -0,0 +1,53 @@
+"""Admission control in front of the solver pools.
+
+Every equation is costed with ``cost_estimator.estimate_cost`` before any
+SymPy work starts.  Cheap equations run on the normal pool, expensive ones on
+a small background pool with a longer budget so they cannot hold up everyone
+else, and anything past the hard limits is refused with ``SolverRejected``
+and a message that says what to fix.
+
+Estimates are memoized by canonical equation key, so a repeated equation
+costs a dictionary lookup instead of a parse.
+"""
+
+import threading
+
+from cost_estimator import BACKGROUND, INLINE, REJECT, estimate_cost
+from solution_cache import SolutionCache, canonical_equation_key
+from solver_pool import SolverRejected
+
+
+class Admission:
+    """Pick the pool for an equation, or reject it."""
+
+    def __init__(self, limits, inline_pool, background_pool, memo_size=4096):
+        self.limits = limits
+        self.memo = SolutionCache(maxsize=memo_size, ttl=0)
+        self.pools = {INLINE: inline_pool, BACKGROUND: background_pool}
+        self.counts = {INLINE: 0, BACKGROUND: 0, REJECT: 0}
+        self._lock = threading.Lock()
+
+    def estimate(self, equation):
+        key = canonical_equation_key(equation)
+        estimate = self.memo.get_or_compute(key, lambda: estimate_cost(equation, self.limits))
+        with self._lock:
+            self.counts[estimate.tier] += 1
+        return estimate
+
+    def pool_for(self, equation):
+        """Return (pool, estimate) for ``equation``; raises ``SolverRejected``."""
+        estimate = self.estimate(equation)
+        if estimate.tier == REJECT:
+            raise SolverRejected(estimate.reason)
+        return self.pools[estimate.tier], estimate
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'counts': counts,
+            'inline_max_degree': self.limits.inline_degree,
+            'max_degree': self.limits.max_degree,
+            'memo': self.memo.stats(),
+            'background_pool': self.pools[BACKGROUND].stats(),
+        }
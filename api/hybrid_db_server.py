@@ -14,16 +14,114 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the rational function calculator
 try:
-    from yessss import RationalFunctionCalculator
+    import rational_function_tasks
     CALCULATOR_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Rational function calculator not available: {e}")
     CALCULATOR_AVAILABLE = False
 
+from settings import (
+    SOLVER_CACHE_SIZE,
+    SOLVER_CACHE_TTL,
+    SOLVER_JOB_MAX_PENDING,
+    SOLVER_JOB_TIMEOUT,
+    SOLVER_JOB_TTL,
+    SOLVER_JOB_WORKERS,
+    SOLVER_JOBS_PATH,
+    SOLVER_POOL_START_METHOD,
+    SOLVER_POOL_WORKERS,
+    SOLVER_PROFILE_TOKEN,
+    SOLVER_SERVER_TIMING,
+    SOLVER_STORE_MAX_ENTRIES,
+    SOLVER_STORE_PATH,
+    SOLVER_STORE_TTL,
+    SOLVER_STORE_VERSION,
+    SOLVER_TIMEOUT,
+    SOLVER_WARMUP,
+    SOLVER_WARMUP_FILE,
+    SOLVER_WORKER_MAX_RSS_MB,
+    SOLVER_WORKER_MAX_TASKS,
+)
+from job_queue import JobQueue, UnknownJobKind
+from profiling import Profiler, profile_mode, profiled_call
+from request_metrics import RequestMetrics, TimedConnection, timed
+from solution_cache import SolutionCache, canonical_function_key
+from solution_store import SolutionStore
+from solver_pool import SolverError, SolverPool, error_response
+from warmup import Warmup, load_warmup_items
+
 DB_PATH = os.path.join(os.path.dirname(__file__), 'hybrid.db')
 
 app = Flask(__name__)
 CORS(app)
+metrics = RequestMetrics('hybrid-db', server_timing=bool(SOLVER_SERVER_TIMING)).install(app)
+profiler = Profiler(token=SOLVER_PROFILE_TOKEN).install(app)
+
+# SymPy work from the rational-function endpoints runs here, off the request thread
+solver_pool = SolverPool(
+    max_workers=SOLVER_POOL_WORKERS,
+    timeout=SOLVER_TIMEOUT,
+    max_tasks=SOLVER_WORKER_MAX_TASKS,
+    max_rss_mb=SOLVER_WORKER_MAX_RSS_MB,
+    preload=('rational_function_tasks',),
+    start_method=SOLVER_POOL_START_METHOD,
+)
+
+solution_store = SolutionStore(
+    SOLVER_STORE_PATH, version=SOLVER_STORE_VERSION, max_entries=SOLVER_STORE_MAX_ENTRIES,
+    ttl=SOLVER_STORE_TTL,
+) if SOLVER_STORE_PATH else None
+analysis_cache = SolutionCache(maxsize=SOLVER_CACHE_SIZE, ttl=SOLVER_CACHE_TTL, store=solution_store)
+
+def cached_analysis(kind, function_str, timeout=None):
+    """Run ``rational_function_tasks.<kind>`` through the cache and the pool."""
+    task = getattr(rational_function_tasks, kind)
+    if profile_mode():
+        # Profiled requests (api/profiling.py) redo the work instead of using the cache
+        return profiled_call(solver_pool, task, function_str, timeout=timeout)
+    key = ('rational-function', kind, canonical_function_key(function_str))
+    return analysis_cache.get_or_compute(key, lambda: solver_pool.call(task, function_str, timeout=timeout))
+
+def warm_function(function_str):
+    for kind in ('analyze', 'domain', 'zeros', 'asymptotes'):
+        cached_analysis(kind, function_str)
+
+# Pre-analyze the lesson functions so the first real request is already warm
+warmup = Warmup(
+    load_warmup_items(SOLVER_WARMUP_FILE, 'functions') if SOLVER_WARMUP and CALCULATOR_AVAILABLE else [],
+    warm_function,
+    workers=solver_pool.max_workers,
+).start()
+
+def solver_error(exc, function_str):
+    payload, status = error_response(exc)
+    payload['function'] = function_str
+    return jsonify(payload), status
+
+def analysis_job(kind):
+    """Job handler running one rational-function analysis with the job budget."""
+    def run(request_data):
+        function_str = str(request_data.get('function') or '').strip()
+        if not function_str:
+            return {'success': False, 'error': 'No function provided'}, 400
+        if not CALCULATOR_AVAILABLE:
+            return {'success': False, 'error': 'Rational function calculator not available'}, 503
+        result = cached_analysis(kind, function_str, timeout=SOLVER_JOB_TIMEOUT)
+        if kind == 'analyze':
+            result = {'analysis': rational_function_tasks.render_text(result),
+                      'message': 'Analysis completed successfully'}
+        return {'success': True, 'function': function_str, **result}, 200
+    return run
+
+# Slow analyses can run as jobs; results are kept in the jobs table of hybrid.db
+jobs = JobQueue(
+    SOLVER_JOBS_PATH,
+    {kind: analysis_job(kind) for kind in ('analyze', 'domain', 'zeros', 'asymptotes')},
+    service='hybrid-db',
+    workers=SOLVER_JOB_WORKERS,
+    ttl=SOLVER_JOB_TTL,
+    max_pending=SOLVER_JOB_MAX_PENDING,
+)
 
 SCHEMA = [
     """
@@ -91,7 +189,7 @@ def generate_join_code():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
 
 def connect():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TimedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -696,7 +794,7 @@ def get_classrooms_by_student(student_id):
 # --- BEGIN ADD: progress endpoints ---
 @app.route('/api/user-progress/<user_id>', methods=['GET'])
 def get_user_progress(user_id):
-    with sqlite3.connect(DB_PATH) as conn:
+    with sqlite3.connect(DB_PATH, factory=TimedConnection) as conn:
         c = conn.cursor()
         c.execute("SELECT user_id, module_id, section_id, slide_index, progress_pct, updated_at FROM user_progress WHERE user_id = ?", (user_id,))
         row = c.fetchone()
@@ -725,7 +823,7 @@ def upsert_user_progress():
     required = ['user_id', 'module_id', 'section_id', 'slide_index', 'progress_pct']
     if not all(k in data for k in required):
         return jsonify({"error": "missing fields"}), 400
-    with sqlite3.connect(DB_PATH) as conn:
+    with sqlite3.connect(DB_PATH, factory=TimedConnection) as conn:
         c = conn.cursor()
         c.execute(
             """
@@ -764,26 +862,29 @@ def analyze_rational_function():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
-        # Capture the output by redirecting stdout
-        import io
-        from contextlib import redirect_stdout
-        
-        output = io.StringIO()
-        with redirect_stdout(output):
-            calculator.analyze_rational_function(function_str)
-        
-        analysis_output = output.getvalue()
-        
-        return jsonify({
-            'success': True,
-            'function': function_str,
-            'analysis': analysis_output,
-            'message': 'Analysis completed successfully'
-        })
+        try:
+            with timed('solve'):
+                result = cached_analysis('analyze', function_str)
+            with timed('render'):
+                text = rational_function_tasks.render_text(result)
+            return jsonify({
+                'success': True,
+                'function': function_str,
+                'analysis': text,
+                'details': result,
+                'message': 'Analysis completed successfully'
+            })
+
+        except SolverError as e:
+            return solver_error(e, function_str)
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': f'Error analyzing function: {str(e)}'
+            }), 400
         
+    except SolverError as e:
+        return solver_error(e, function_str)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -809,19 +910,13 @@ def find_domain():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            domain_restrictions = calculator.find_domain(denominator)
-            
-            return jsonify({
-                'success': True,
-                'domain_restrictions': [str(r) for r in domain_restrictions],
-                'domain': f"(-∞, ∞) excluding {', '.join([str(r) for r in domain_restrictions])}" if domain_restrictions else "(-∞, ∞)"
-            })
+            with timed('solve'):
+                result = cached_analysis('domain', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -853,22 +948,13 @@ def find_zeros():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
-            zeros = calculator.find_zeros(simplified_num, common_factors)
-            
-            return jsonify({
-                'success': True,
-                'zeros': [str(z) for z in zeros],
-                'common_factors': [str(cf) for cf in common_factors],
-                'simplified_numerator': str(simplified_num),
-                'simplified_denominator': str(simplified_den)
-            })
+            with timed('solve'):
+                result = cached_analysis('zeros', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -900,24 +986,13 @@ def find_asymptotes():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
-            
-            vertical_asymptotes = calculator.find_vertical_asymptotes(denominator, common_factors)
-            horizontal_asymptote = calculator.find_horizontal_asymptote(numerator, denominator)
-            oblique_asymptote = calculator.find_oblique_asymptote(numerator, denominator)
-            
-            return jsonify({
-                'success': True,
-                'vertical_asymptotes': [str(va) for va in vertical_asymptotes],
-                'horizontal_asymptote': horizontal_asymptote,
-                'oblique_asymptote': str(oblique_asymptote) if oblique_asymptote else None
-            })
+            with timed('solve'):
+                result = cached_analysis('asymptotes', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -930,18 +1005,67 @@ def find_asymptotes():
             'error': f'Server error: {str(e)}'
         }), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Start a rational-function analysis in the background.
+
+    Body: ``{"kind": "analyze" | "domain" | "zeros" | "asymptotes",
+    "function": "..."}``.  Returns 202 with the job id; poll
+    ``GET /api/jobs/<id>`` for the result.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        with timed('db'):
+            job = jobs.submit(data.get('kind', 'analyze'), data)
+        response = jsonify({'success': True, **job})
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    except UnknownJobKind as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except SolverError as e:
+        payload, status = error_response(e)
+        return jsonify(payload), status
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a job and, once it has finished, its result."""
+    try:
+        with timed('db'):
+            job = jobs.get(job_id)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify({'success': True, **job})
+
 @app.route('/api/rational-function/health', methods=['GET'])
 def rational_function_health():
     """Health check for rational function calculator"""
+    ready = warmup.ready
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if ready else 'warming_up',
+        'ready': ready,
+        'warmup': warmup.stats(),
         'rational_function_calculator_available': CALCULATOR_AVAILABLE,
-        'message': 'Rational function calculator integration status'
-    })
+        'message': 'Rational function calculator integration status',
+        'cache': analysis_cache.stats(),
+        'store': solution_store.stats() if solution_store else None,
+        'pool': solver_pool.stats(),
+        'jobs': jobs.stats()
+    }), 200 if ready else 503
 # --- END ADD ---
 
 
 if __name__ == '__main__':
+    # Development server; in production run: python api/serve.py hybrid-db
     init_db()
     port = int(os.environ.get('PORT', '5055'))
     host = os.environ.get('HOST', '0.0.0.0')
@@ -0,0 +1,253 @@
+"""Asynchronous jobs for requests too slow to hold a connection open.
+
+``POST /api/jobs`` hands the request to ``JobQueue.submit``, which records it
+in a ``jobs`` table (next to the classroom tables in ``hybrid.db`` by
+default) and returns its id straight away.  A few background threads run the
+registered handler, which normally goes through the cache and the solver
+pool like the synchronous endpoint does.  ``GET /api/jobs/<id>`` reads the
+row back.  Because the row lives in SQLite, a page reload (or another worker
+process of the same server) can keep polling the same id until the result
+expires after ``ttl`` seconds.  The servers share the file, so each row is
+tagged with the ``service`` that queued it and a server only reads its own.
+
+A handler takes the request body and returns ``(payload, http_status)``,
+the same pair the synchronous pipelines return.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from solver_pool import SolverBusy, SolverError, error_response
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    service TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    http_status INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class UnknownJobKind(ValueError):
+    """``submit`` was asked for a kind no handler is registered for."""
+
+
+class JobQueue:
+    """Run registered handlers in the background and keep their results.
+
+    At most ``max_pending`` jobs wait or run at once; past that ``submit``
+    raises ``SolverBusy``.  While a job waits or runs, a heartbeat thread
+    refreshes its ``updated_at`` every ``stale_after / 3`` seconds, however
+    long the handler takes.  So a job still unfinished ``stale_after`` seconds
+    after its last update belonged to a process that went away and is
+    reported as failed.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, path, handlers, service='', workers=2, ttl=86400.0, max_pending=100,
+                 stale_after=900.0, timeout=5.0):
+        self.path = path
+        self.handlers = dict(handlers)
+        self.service = service
+        self.workers = max(1, workers)
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.stale_after = stale_after
+        self.timeout = timeout
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._pending = 0
+        self._live = set()
+        self._lock = threading.Lock()
+        self._ready = False
+        self._executor = None
+        self._heartbeat = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'service' not in columns:
+                # Tables from before services were tagged; their rows just expire
+                conn.execute("ALTER TABLE jobs ADD COLUMN service TEXT NOT NULL DEFAULT ''")
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)')
+            self._purge(conn)
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _purge(self, conn):
+        if self.ttl > 0:
+            conn.execute('DELETE FROM jobs WHERE created_at < ?', (time.time() - self.ttl,))
+
+    def _update(self, job_id, status, result=None, http_status=None):
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, http_status = ?, updated_at = ? WHERE id = ?',
+                (status, None if result is None else json.dumps(result, ensure_ascii=False),
+                 http_status, time.time(), job_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _beat(self):
+        # Runs for the life of the process, like the executor's threads
+        while True:
+            time.sleep(self.stale_after / 3)
+            with self._lock:
+                live = list(self._live)
+            if not live:
+                continue
+            try:
+                conn = self._connect()
+                try:
+                    now = time.time()
+                    conn.executemany(
+                        'UPDATE jobs SET updated_at = ? WHERE id = ? AND status IN (?, ?)',
+                        [(now, job_id, QUEUED, RUNNING) for job_id in live],
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                # A locked database only delays the beat; stale_after is 3 beats
+                continue
+
+    def submit(self, kind, request):
+        """Queue ``request`` for the ``kind`` handler and return the new job.
+
+        Raises ``UnknownJobKind`` for an unregistered kind and ``SolverBusy``
+        when ``max_pending`` jobs are already waiting.
+        """
+        if kind not in self.handlers:
+            raise UnknownJobKind(f"Unknown job kind {kind!r}; expected one of: {', '.join(sorted(self.handlers))}")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise SolverBusy("Too many jobs are waiting, please try again")
+            self._pending += 1
+            self.submitted += 1
+            purge = self.submitted % self.PURGE_EVERY == 0
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='solver-job')
+            if self._heartbeat is None and self.stale_after > 0:
+                self._heartbeat = threading.Thread(target=self._beat, name='solver-job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT INTO jobs (id, service, kind, status, request, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (job_id, self.service, kind, QUEUED, json.dumps(request, ensure_ascii=False), now, now),
+                )
+                if purge:
+                    self._purge(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            with self._lock:
+                self._live.add(job_id)
+            self._executor.submit(self._run, job_id, kind, request)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self._live.discard(job_id)
+            raise
+        return {'id': job_id, 'kind': kind, 'status': QUEUED, 'created_at': now}
+
+    def _run(self, job_id, kind, request):
+        try:
+            self._update(job_id, RUNNING)
+            try:
+                payload, status = self.handlers[kind](request)
+            except SolverError as e:
+                payload, status = error_response(e)
+            except Exception as e:
+                payload, status = {'success': False, 'error': f'Server error: {str(e)}'}, 500
+            self._update(job_id, DONE if status < 400 else FAILED, payload, status)
+            with self._lock:
+                if status < 400:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+        except sqlite3.Error:
+            # Nowhere to record the outcome; the row goes stale and reads as failed
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._live.discard(job_id)
+
+    def get(self, job_id):
+        """The job as a JSON-ready dict, or None if unknown, expired or queued
+        by another service."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT id, kind, status, result, http_status, created_at, updated_at FROM jobs '
+                'WHERE id = ? AND service = ?',
+                (job_id, self.service),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job_id, kind, status, result, http_status, created_at, updated_at = row
+        now = time.time()
+        if self.ttl > 0 and created_at < now - self.ttl:
+            return None
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'status': status,
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+        if status in (QUEUED, RUNNING) and self.stale_after > 0 and updated_at < now - self.stale_after:
+            job['status'] = FAILED
+            job['http_status'] = 500
+            job['result'] = {
+                'success': False,
+                'error': 'The server restarted before this job finished, please submit it again',
+            }
+        elif status in (DONE, FAILED):
+            job['http_status'] = http_status
+            job['result'] = json.loads(result) if result is not None else None
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'workers': self.workers,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'ttl_seconds': self.ttl,
+            }
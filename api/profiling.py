@@ -0,0 +1,202 @@
+"""On-demand profiling of single requests.
+
+A request that sends ``X-Profile: stacks`` (or ``?profile=stacks``) runs its
+solver calls under a sampling profiler and gets the folded stacks back next
+to the normal answer, ready for ``flamegraph.pl`` or speedscope::
+
+    curl -s -H 'X-Profile: stacks' -H 'Content-Type: application/json' \\
+         -d '{"equation": "x^5 = 1/(x-1)"}' localhost:5000/api/solve \\
+      | jq -r '.profile[0].collapsed' | flamegraph.pl > solve.svg
+
+``X-Profile: pstats`` runs cProfile instead and returns its report sorted by
+cumulative time.  Profiled calls skip the solution cache, so the work is
+actually done, and run in the solver pool like any other call.
+
+Only requests from localhost (not relayed by a proxy) or carrying the
+``X-Profile-Token`` configured in ``SOLVER_PROFILE_TOKEN`` may ask for a
+profile; anyone else gets 403.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, has_request_context, jsonify, request
+
+MODES = ('stacks', 'pstats')
+SAMPLE_INTERVAL = 0.001
+PSTATS_LINES = 60
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+_JOIN_CODE = threading.Thread.join.__code__
+
+# The switch interval is process-wide; concurrent samplers (solver calls run
+# inline in request threads when the pool is off) share one lowered setting
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_saved = None
+
+
+def _frame_name(code):
+    filename = code.co_filename.replace(os.sep, '/')
+    if 'site-packages/' in filename:
+        filename = filename.rsplit('site-packages/', 1)[1]
+    else:
+        filename = filename.rsplit('/', 1)[-1]
+    # Folded stacks are separated by ';' and end at the first space
+    return f"{filename}:{code.co_name}".replace(' ', '_').replace(';', '_')
+
+
+def _lower_switch_interval(interval):
+    """Without a shorter switch interval the sampler only gets the GIL every 5 ms."""
+    global _switch_users, _switch_saved
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_saved = sys.getswitchinterval()
+        _switch_users += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def _restore_switch_interval():
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_saved)
+
+
+def _sample_stacks(func, args, kwargs, interval):
+    """Run ``func`` while another thread samples its stack every ``interval`` seconds."""
+    target = threading.get_ident()
+    here = sys._getframe()
+    counts = Counter()
+    stop = threading.Event()
+
+    def sampler():
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None and frame is not here:
+                outermost = frame.f_code
+                stack.append(_frame_name(outermost))
+                frame = frame.f_back
+            # A sample taken while func has already returned and we wait below
+            if stack and outermost is not _JOIN_CODE:
+                counts[';'.join(reversed(stack))] += 1
+
+    thread = threading.Thread(target=sampler, name='profile-sampler', daemon=True)
+    _lower_switch_interval(interval)
+    thread.start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        stop.set()
+        thread.join()
+        _restore_switch_interval()
+    collapsed = '\n'.join(f"{stack} {count}" for stack, count in counts.most_common())
+    return result, {'samples': sum(counts.values()), 'collapsed': collapsed}
+
+
+def _cprofile(func, args, kwargs):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats('cumulative').print_stats(PSTATS_LINES)
+    return result, {'pstats': out.getvalue()}
+
+
+def profiled(mode, func, *args, **kwargs):
+    """Run ``func`` under the profiler for ``mode``; returns ``(result, profile)``.
+
+    Module-level so the solver pool can run it in a worker.
+    """
+    start = time.perf_counter()
+    if mode == 'pstats':
+        result, profile = _cprofile(func, args, kwargs)
+    else:
+        result, profile = _sample_stacks(func, args, kwargs, SAMPLE_INTERVAL)
+    profile.update(
+        function=f"{func.__module__}.{func.__qualname__}",
+        mode=mode,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
+    return result, profile
+
+
+def profile_mode():
+    """The profile mode of the current request, or None."""
+    return g.get('profile_mode') if has_request_context() else None
+
+
+def profiled_call(pool, func, *args, **kwargs):
+    """``pool.call(func, ...)`` under the current request's profiler.
+
+    The profile is attached to the response; the result is returned as usual.
+    Without a profile request this is a plain ``pool.call``.
+    """
+    mode = profile_mode()
+    if mode is None:
+        return pool.call(func, *args, **kwargs)
+    result, profile = pool.call(profiled, mode, func, *args, **kwargs)
+    g.profiles.append(profile)
+    return result
+
+
+class Profiler:
+    """Honour profile requests for one Flask app.
+
+    ``token`` is the admin token accepted from any address; an empty token
+    limits profiling to localhost.
+    """
+
+    def __init__(self, token=''):
+        self.token = token
+
+    def install(self, app):
+        app.before_request(self._start)
+        app.after_request(self._attach)
+        return self
+
+    def allowed(self):
+        supplied = request.headers.get('X-Profile-Token', '')
+        if self.token and supplied and hmac.compare_digest(supplied.encode(), self.token.encode()):
+            return True
+        return request.remote_addr in LOCAL_ADDRESSES and 'X-Forwarded-For' not in request.headers
+
+    def _start(self):
+        mode = (request.headers.get('X-Profile') or request.args.get('profile') or '').strip().lower()
+        if not mode:
+            return None
+        if mode not in MODES:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown profile mode {mode!r}; expected one of: {', '.join(MODES)}"
+            }), 400
+        if not self.allowed():
+            return jsonify({
+                'success': False,
+                'error': 'Profiling is only available from localhost or with the admin token'
+            }), 403
+        g.profile_mode = mode
+        g.profiles = []
+        return None
+
+    def _attach(self, response):
+        profiles = g.pop('profiles', None)
+        if profiles is None or response.is_streamed or not response.is_json:
+            return response
+        payload = response.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload['profile'] = profiles
+            response.set_data(json.dumps(payload))
+        return response
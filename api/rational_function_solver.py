@@ -1,9 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+import base64
 import sys
 import os
 import traceback
-import json
 
 # Add the parent directory to the path to import the solver
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,15 +11,134 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import the solver functions
 try:
     from yessss import RationalFunctionCalculator
+    import rational_function_tasks
 except ImportError as e:
     print(f"Error importing solver: {e}")
     # Fallback functions if import fails
     class RationalFunctionCalculator:
+        def analyze(self, func_str):
+            raise ValueError("Solver not available")
+
         def analyze_rational_function(self, func_str):
             return "Solver not available"
 
+from settings import (
+    SOLVER_CACHE_SIZE,
+    SOLVER_CACHE_TTL,
+    SOLVER_GRAPH_CACHE_SIZE,
+    SOLVER_GRAPH_CACHE_TTL,
+    SOLVER_GRAPH_MAX_AGE,
+    SOLVER_GRAPH_STORE_MAX_ENTRIES,
+    SOLVER_GRAPH_STORE_PATH,
+    SOLVER_JOB_MAX_PENDING,
+    SOLVER_JOB_TIMEOUT,
+    SOLVER_JOB_TTL,
+    SOLVER_JOB_WORKERS,
+    SOLVER_JOBS_PATH,
+    SOLVER_POOL_START_METHOD,
+    SOLVER_POOL_WORKERS,
+    SOLVER_PROFILE_TOKEN,
+    SOLVER_SERVER_TIMING,
+    SOLVER_STORE_MAX_ENTRIES,
+    SOLVER_STORE_PATH,
+    SOLVER_STORE_TTL,
+    SOLVER_STORE_VERSION,
+    SOLVER_TIMEOUT,
+    SOLVER_WARMUP,
+    SOLVER_WARMUP_FILE,
+    SOLVER_WORKER_MAX_RSS_MB,
+    SOLVER_WORKER_MAX_TASKS,
+)
+from job_queue import JobQueue, UnknownJobKind
+from profiling import Profiler, profile_mode, profiled_call
+from request_metrics import RequestMetrics, timed
+from solution_cache import SolutionCache, canonical_function_key
+from solution_store import SolutionStore
+from solver_pool import SolverError, SolverPool, error_response
+from warmup import Warmup, load_warmup_items
+
 app = Flask(__name__)
 CORS(app)
+metrics = RequestMetrics('rational-function', server_timing=bool(SOLVER_SERVER_TIMING)).install(app)
+profiler = Profiler(token=SOLVER_PROFILE_TOKEN).install(app)
+
+solver_pool = SolverPool(
+    max_workers=SOLVER_POOL_WORKERS,
+    timeout=SOLVER_TIMEOUT,
+    max_tasks=SOLVER_WORKER_MAX_TASKS,
+    max_rss_mb=SOLVER_WORKER_MAX_RSS_MB,
+    preload=('rational_function_tasks',),
+    start_method=SOLVER_POOL_START_METHOD,
+)
+
+solution_store = SolutionStore(
+    SOLVER_STORE_PATH, version=SOLVER_STORE_VERSION, max_entries=SOLVER_STORE_MAX_ENTRIES,
+    ttl=SOLVER_STORE_TTL,
+) if SOLVER_STORE_PATH else None
+analysis_cache = SolutionCache(maxsize=SOLVER_CACHE_SIZE, ttl=SOLVER_CACHE_TTL, store=solution_store)
+
+# Rendered graphs are large, so they get their own, smaller cache and store
+graph_store = SolutionStore(
+    SOLVER_GRAPH_STORE_PATH, version=SOLVER_STORE_VERSION, max_entries=SOLVER_GRAPH_STORE_MAX_ENTRIES,
+    ttl=SOLVER_STORE_TTL,
+) if SOLVER_GRAPH_STORE_PATH else None
+graph_cache = SolutionCache(maxsize=SOLVER_GRAPH_CACHE_SIZE, ttl=SOLVER_GRAPH_CACHE_TTL, store=graph_store)
+
+def cached_analysis(kind, function_str, *args, timeout=None, cache=None):
+    """Run ``rational_function_tasks.<kind>`` through the cache and the pool.
+
+    Extra ``args`` (the plot viewport) are passed on and are part of the key.
+    ``cache`` defaults to ``analysis_cache``.
+    """
+    task = getattr(rational_function_tasks, kind)
+    if profile_mode():
+        # Profiled requests (api/profiling.py) redo the work instead of using the cache
+        return profiled_call(solver_pool, task, function_str, *args, timeout=timeout)
+    key = ('rational-function', kind, canonical_function_key(function_str)) + args
+    cache = analysis_cache if cache is None else cache
+    return cache.get_or_compute(key, lambda: solver_pool.call(task, function_str, *args, timeout=timeout))
+
+def warm_function(function_str):
+    for kind in ('analyze', 'domain', 'zeros', 'asymptotes'):
+        cached_analysis(kind, function_str)
+
+# Pre-analyze the lesson functions so the first real request is already warm
+warmup = Warmup(
+    load_warmup_items(SOLVER_WARMUP_FILE, 'functions') if SOLVER_WARMUP else [],
+    warm_function,
+    workers=solver_pool.max_workers,
+).start()
+
+def solver_error(exc, function_str):
+    payload, status = error_response(exc)
+    payload['function'] = function_str
+    return jsonify(payload), status
+
+def analysis_job(kind):
+    """Job handler running one rational-function analysis with the job budget."""
+    def run(request_data):
+        function_str = str(request_data.get('function') or '').strip()
+        if not function_str:
+            return {'success': False, 'error': 'No function provided'}, 400
+        result = cached_analysis(kind, function_str, timeout=SOLVER_JOB_TIMEOUT)
+        if kind == 'analyze':
+            result = {'analysis': result, 'raw_output': rational_function_tasks.render_text(result),
+                      'message': 'Analysis completed successfully'}
+        elif kind == 'validate':
+            valid, message = result
+            result = {'valid': valid, 'message': message}
+        return {'success': True, 'function': function_str, **result}, 200
+    return run
+
+# Slow analyses can run as jobs; results are kept in the jobs table of hybrid.db
+jobs = JobQueue(
+    SOLVER_JOBS_PATH,
+    {kind: analysis_job(kind) for kind in ('analyze', 'validate', 'domain', 'zeros', 'asymptotes')},
+    service='rational-function',
+    workers=SOLVER_JOB_WORKERS,
+    ttl=SOLVER_JOB_TTL,
+    max_pending=SOLVER_JOB_MAX_PENDING,
+)
 
 @app.route('/api/rational-function/analyze', methods=['POST'])
 def analyze_rational_function():
@@ -34,30 +153,28 @@ def analyze_rational_function():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
-        # Capture the output by redirecting stdout
-        import io
-        import sys
-        from contextlib import redirect_stdout
-        
-        output = io.StringIO()
-        with redirect_stdout(output):
-            calculator.analyze_rational_function(function_str)
-        
-        analysis_output = output.getvalue()
-        
-        # Parse the output to extract structured data
-        analysis_data = parse_analysis_output(analysis_output, function_str)
-        
-        return jsonify({
-            'success': True,
-            'function': function_str,
-            'analysis': analysis_data,
-            'raw_output': analysis_output
-        })
+        try:
+            with timed('solve'):
+                result = cached_analysis('analyze', function_str)
+            with timed('render'):
+                text = rational_function_tasks.render_text(result)
+            return jsonify({
+                'success': True,
+                'function': function_str,
+                'analysis': result,
+                'raw_output': text
+            })
+
+        except SolverError as e:
+            return solver_error(e, function_str)
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': f'Error analyzing function: {str(e)}'
+            }), 400
         
+    except SolverError as e:
+        return solver_error(e, function_str)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -78,16 +195,8 @@ def validate_rational_function():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
-        try:
-            numerator, denominator = calculator.parse_function(function_str)
-            valid = True
-            message = "Valid rational function"
-        except Exception as e:
-            valid = False
-            message = str(e)
+        with timed('validate'):
+            valid, message = cached_analysis('validate', function_str)
         
         return jsonify({
             'success': True,
@@ -96,6 +205,8 @@ def validate_rational_function():
             'function': function_str
         })
         
+    except SolverError as e:
+        return solver_error(e, function_str)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -115,19 +226,13 @@ def find_domain():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            domain_restrictions = calculator.find_domain(denominator)
-            
-            return jsonify({
-                'success': True,
-                'domain_restrictions': [str(r) for r in domain_restrictions],
-                'domain': f"(-∞, ∞) excluding {', '.join([str(r) for r in domain_restrictions])}" if domain_restrictions else "(-∞, ∞)"
-            })
+            with timed('solve'):
+                result = cached_analysis('domain', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -153,22 +258,13 @@ def find_zeros():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
-            zeros = calculator.find_zeros(simplified_num, common_factors)
-            
-            return jsonify({
-                'success': True,
-                'zeros': [str(z) for z in zeros],
-                'common_factors': [str(cf) for cf in common_factors],
-                'simplified_numerator': str(simplified_num),
-                'simplified_denominator': str(simplified_den)
-            })
+            with timed('solve'):
+                result = cached_analysis('zeros', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -194,24 +290,13 @@ def find_asymptotes():
                 'error': 'No function provided'
             }), 400
         
-        # Create calculator instance
-        calculator = RationalFunctionCalculator()
-        
         try:
-            numerator, denominator = calculator.parse_function(function_str)
-            common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
-            
-            vertical_asymptotes = calculator.find_vertical_asymptotes(denominator, common_factors)
-            horizontal_asymptote = calculator.find_horizontal_asymptote(numerator, denominator)
-            oblique_asymptote = calculator.find_oblique_asymptote(numerator, denominator)
-            
-            return jsonify({
-                'success': True,
-                'vertical_asymptotes': [str(va) for va in vertical_asymptotes],
-                'horizontal_asymptote': horizontal_asymptote,
-                'oblique_asymptote': str(oblique_asymptote) if oblique_asymptote else None
-            })
+            with timed('solve'):
+                result = cached_analysis('asymptotes', function_str)
+            return jsonify({'success': True, **result})
             
+        except SolverError as e:
+            return solver_error(e, function_str)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -224,87 +309,119 @@ def find_asymptotes():
             'error': f'Server error: {str(e)}'
         }), 500
 
-def parse_analysis_output(output, function_str):
-    """Parse the analysis output to extract structured data"""
+def viewport_args(viewport, width, height):
+    """Task arguments ``(x_min, x_max, y_min, y_max, width, height)`` from ``viewport``.
+
+    Missing bounds fall back to the graph's defaults (the x-range then
+    widens to show the vertical asymptotes), a missing size to ``width`` x
+    ``height``.  Raises ValueError or TypeError for values that are not numbers.
+    """
+    if not isinstance(viewport, dict):
+        raise ValueError('viewport must be an object')
+
+    def number(name, default, kind=float):
+        value = viewport.get(name)
+        return default if value is None or value == '' else kind(value)
+
+    return (
+        number('x_min', None), number('x_max', None),
+        number('y_min', -10.0), number('y_max', 10.0),
+        number('width', width, int), number('height', height, int),
+    )
+
+def plot_viewport(data):
+    """Task arguments for the ``viewport`` of a plot request."""
+    return viewport_args(data.get('viewport') or {}, rational_function_tasks.PLOT_WIDTH,
+                         rational_function_tasks.PLOT_HEIGHT)
+
+@app.route('/api/rational-function/plot', methods=['POST'])
+def plot_rational_function():
+    """Polylines of a rational function for the frontend to draw.
+
+    Body: ``{"function": ..., "viewport": {"x_min", "x_max", "y_min", "y_max",
+    "width", "height"}}``, every viewport field optional; pan and zoom send
+    the new viewport and only the visible part is sampled.
+    """
     try:
-        # This is a simplified parser - you can enhance it based on your needs
-        lines = output.split('\n')
-        
-        analysis_data = {
-            'function': function_str,
-            'cleaned_function': '',
-            'factored_form': '',
-            'domain': '',
-            'domain_restrictions': [],
-            'zeros': [],
-            'x_intercepts': [],
-            'y_intercept': '',
-            'vertical_asymptotes': [],
-            'horizontal_asymptote': '',
-            'oblique_asymptote': '',
-            'holes': [],
-            'steps': []
-        }
-        
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Detect sections
-            if '1) CLEANED FUNCTION' in line:
-                current_section = 'cleaned_function'
-            elif '2) DOMAIN & DOMAIN RESTRICTIONS' in line:
-                current_section = 'domain'
-            elif '3) ZEROS' in line:
-                current_section = 'zeros'
-            elif '4) INTERCEPTS' in line:
-                current_section = 'intercepts'
-            elif '5) VERTICAL ASYMPTOTES' in line:
-                current_section = 'vertical_asymptotes'
-            elif '6) HORIZONTAL / OBLIQUE ASYMPTOTES' in line:
-                current_section = 'horizontal_asymptotes'
-            elif '7) HOLES' in line:
-                current_section = 'holes'
-            
-            # Extract data based on current section
-            if current_section == 'cleaned_function' and 'Original:' in line:
-                analysis_data['cleaned_function'] = line.split('Original:')[1].strip()
-            elif current_section == 'cleaned_function' and 'Factored:' in line:
-                analysis_data['factored_form'] = line.split('Factored:')[1].strip()
-            elif current_section == 'domain' and 'Excluded x-values:' in line:
-                restrictions = line.split('Excluded x-values:')[1].strip()
-                analysis_data['domain_restrictions'] = [r.strip() for r in restrictions.split(',')]
-            elif current_section == 'domain' and 'Domain:' in line:
-                analysis_data['domain'] = line.split('Domain:')[1].strip()
-            elif current_section == 'zeros' and 'Zeros:' in line:
-                zeros = line.split('Zeros:')[1].strip()
-                analysis_data['zeros'] = [z.strip() for z in zeros.split(',')]
-            elif current_section == 'vertical_asymptotes' and 'VA:' in line:
-                va = line.split('VA:')[1].strip()
-                analysis_data['vertical_asymptotes'].append(va)
-            elif current_section == 'horizontal_asymptotes' and 'Horizontal asymptote:' in line:
-                ha = line.split('Horizontal asymptote:')[1].strip()
-                analysis_data['horizontal_asymptote'] = ha
-            elif current_section == 'holes' and 'Hole at' in line:
-                hole_info = line.split('Hole at')[1].strip()
-                analysis_data['holes'].append(hole_info)
-            
-            # Add to steps for step-by-step display
-            if line and not line.startswith('=') and not line.startswith('-'):
-                analysis_data['steps'].append(line)
-        
-        return analysis_data
-        
+        data = request.get_json()
+        function_str = data.get('function', '').strip()
+
+        if not function_str:
+            return jsonify({
+                'success': False,
+                'error': 'No function provided'
+            }), 400
+
+        try:
+            viewport = plot_viewport(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid viewport: {str(e)}'
+            }), 400
+
+        try:
+            with timed('solve'):
+                result = cached_analysis('plot', function_str, *viewport)
+            return jsonify({'success': True, **result})
+
+        except SolverError as e:
+            return solver_error(e, function_str)
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': f'Error plotting function: {str(e)}'
+            }), 400
+
     except Exception as e:
-        print(f"Error parsing analysis output: {e}")
-        return {
-            'function': function_str,
-            'error': 'Could not parse analysis output',
-            'raw_output': output
-        }
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/rational-function/graph', methods=['GET'])
+def graph_rational_function():
+    """The graph of a rational function as a PNG image.
+
+    Query: ``function`` plus optional ``x_min``, ``x_max``, ``y_min``,
+    ``y_max``, ``width`` and ``height`` in pixels and ``dpi``, so the URL can
+    go straight into an ``<img>``.  Images come from ``graph_cache``; the
+    response has a strong ETag, and a browser revalidating with
+    ``If-None-Match`` gets 304 without the image.
+    """
+    function_str = request.args.get('function', '').strip()
+    if not function_str:
+        return jsonify({
+            'success': False,
+            'error': 'No function provided'
+        }), 400
+
+    try:
+        args = viewport_args(request.args, rational_function_tasks.GRAPH_WIDTH,
+                             rational_function_tasks.GRAPH_HEIGHT)
+        dpi = int(request.args.get('dpi') or rational_function_tasks.GRAPH_DPI)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid viewport: {str(e)}'
+        }), 400
+
+    try:
+        with timed('render'):
+            result = cached_analysis('graph', function_str, *args, dpi, cache=graph_cache)
+    except SolverError as e:
+        return solver_error(e, function_str)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error graphing function: {str(e)}'
+        }), 400
+
+    response = Response(base64.b64decode(result['image']), mimetype='image/png')
+    response.set_etag(result['etag'])
+    response.cache_control.public = True
+    response.cache_control.max_age = SOLVER_GRAPH_MAX_AGE
+    return response.make_conditional(request)
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
@@ -324,13 +441,72 @@ def test_endpoint():
             'traceback': traceback.format_exc()
         }), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Start a rational-function analysis in the background.
+
+    Body: ``{"kind": "analyze" | "validate" | "domain" | "zeros" |
+    "asymptotes", "function": "..."}``.  Returns 202 with the job id; poll
+    ``GET /api/jobs/<id>`` for the result.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        with timed('db'):
+            job = jobs.submit(data.get('kind', 'analyze'), data)
+        response = jsonify({'success': True, **job})
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    except UnknownJobKind as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except SolverError as e:
+        payload, status = error_response(e)
+        return jsonify(payload), status
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a job and, once it has finished, its result."""
+    try:
+        with timed('db'):
+            job = jobs.get(job_id)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify({'success': True, **job})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
+    ready = warmup.ready
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if ready else 'warming_up',
+        'ready': ready,
+        'warmup': warmup.stats(),
         'rational_function_solver_available': True,
-        'message': 'Quantum solver backend is running'
-    })
+        'message': 'Quantum solver backend is running',
+        'cache': analysis_cache.stats(),
+        'store': solution_store.stats() if solution_store else None,
+        'graph_cache': graph_cache.stats(),
+        'pool': solver_pool.stats(),
+        'jobs': jobs.stats()
+    }), 200 if ready else 503
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Size, limits and hit rates of the analysis and graph caches and their stores."""
+    stats = {}
+    for name, cache in (('analysis', analysis_cache), ('graphs', graph_cache)):
+        stats[name] = cache.stats()
+        stats[name]['store'] = cache.store.stats() if cache.store else None
+    return jsonify(stats)
 
 if __name__ == '__main__':
+    # Development server; in production run: python api/serve.py rational-function
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,101 @@
+"""Rational-function computations shared by the Flask servers.
+
+These run inside the solver pool, so every function is module level and
+returns plain JSON-ready data that pickles cheaply across the process
+boundary.  Errors from the calculator propagate to the caller unchanged.
+"""
+
+import hashlib
+import os
+import sys
+
+# Servers are headless: should anything load pyplot, it must not look for a display
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# The calculator lives in the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yessss import (
+    GRAPH_DPI,
+    GRAPH_HEIGHT,
+    GRAPH_WIDTH,
+    PLOT_HEIGHT,
+    PLOT_WIDTH,
+    AnalysisSection,
+    RationalFunctionCalculator,
+    render_report,
+)
+
+
+def analyze(function_str):
+    """Full analysis of ``function_str`` as ``RationalFunctionAnalysis.as_dict``."""
+    return RationalFunctionCalculator().analyze(function_str).as_dict()
+
+
+def render_text(analysis):
+    """The console report (without the graph) for an ``analyze`` result.
+
+    The servers call this outside the pool, so the report is timed as the
+    request's render stage rather than as part of the solve.
+    """
+    return render_report([AnalysisSection(**section) for section in analysis['sections']])
+
+
+def validate(function_str):
+    calculator = RationalFunctionCalculator()
+    try:
+        calculator.parse_function(function_str)
+    except Exception as e:
+        return False, str(e)
+    return True, "Valid rational function"
+
+
+def domain(function_str):
+    calculator = RationalFunctionCalculator()
+    numerator, denominator = calculator.parse_function(function_str)
+    domain_restrictions = calculator.find_domain(denominator)
+    return {
+        'domain_restrictions': [str(r) for r in domain_restrictions],
+        'domain': f"(-∞, ∞) excluding {', '.join([str(r) for r in domain_restrictions])}" if domain_restrictions else "(-∞, ∞)"
+    }
+
+
+def zeros(function_str):
+    calculator = RationalFunctionCalculator()
+    numerator, denominator = calculator.parse_function(function_str)
+    common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
+    found = calculator.find_zeros(simplified_num, common_factors)
+    return {
+        'zeros': [str(z) for z in found],
+        'common_factors': [str(cf) for cf in common_factors],
+        'simplified_numerator': str(simplified_num),
+        'simplified_denominator': str(simplified_den)
+    }
+
+
+def asymptotes(function_str):
+    calculator = RationalFunctionCalculator()
+    numerator, denominator = calculator.parse_function(function_str)
+    common_factors, simplified_num, simplified_den = calculator.find_common_factors(numerator, denominator)
+
+    vertical_asymptotes = calculator.find_vertical_asymptotes(denominator, common_factors)
+    horizontal_asymptote = calculator.find_horizontal_asymptote(numerator, denominator)
+    oblique_asymptote = calculator.find_oblique_asymptote(numerator, denominator)
+    return {
+        'vertical_asymptotes': [str(va) for va in vertical_asymptotes],
+        'horizontal_asymptote': horizontal_asymptote,
+        'oblique_asymptote': str(oblique_asymptote) if oblique_asymptote else None
+    }
+
+
+def plot(function_str, x_min=None, x_max=None, y_min=-10.0, y_max=10.0, width=PLOT_WIDTH, height=PLOT_HEIGHT):
+    """Polylines and features for drawing ``function_str`` in the given viewport."""
+    return RationalFunctionCalculator().plot_data(function_str, x_min, x_max, y_min, y_max, width, height)
+
+
+def graph(function_str, x_min=None, x_max=None, y_min=-10.0, y_max=10.0,
+          width=GRAPH_WIDTH, height=GRAPH_HEIGHT, dpi=GRAPH_DPI):
+    """The rendered graph: ``{'image': base64 PNG, 'etag': hash of the image}``."""
+    image = RationalFunctionCalculator().render_graph(function_str, x_min, x_max, y_min, y_max,
+                                                      width, height, dpi)
+    return {'image': image, 'etag': hashlib.sha256(image.encode('ascii')).hexdigest()[:32]}
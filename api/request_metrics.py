@@ -0,0 +1,207 @@
+"""Per-request stage timings for the Flask servers.
+
+Handlers wrap their stages in ``timed(stage)``; JSON parsing of the request
+(``parse``) and serialization of the response (``json``) are timed by the
+app's JSON provider, and SQLite work by ``TimedConnection`` (``db``).  After
+each request the stage totals go out in a ``Server-Timing`` header, so they
+show up in the browser's network panel, and into latency histograms served
+by ``GET /api/metrics`` in the Prometheus text format.
+
+Histograms are per process; when a server runs several worker processes,
+each one reports its own.
+"""
+
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+# Upper bounds in seconds; the last bucket (+Inf) is implicit
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@contextmanager
+def timed(stage):
+    """Add the time spent in the block to ``stage`` of the current request.
+
+    Outside a request (warm-up, jobs, batch worker threads) it does nothing.
+    """
+    if not has_request_context() or not hasattr(g, 'stage_timings'):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = g.stage_timings
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing request parsing and response serialization."""
+
+    def loads(self, s, **kwargs):
+        with timed('parse'):
+            return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        with timed('json'):
+            return super().response(*args, **kwargs)
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        with timed('db'):
+            return super().execute(*args)
+
+    def executemany(self, *args):
+        with timed('db'):
+            return super().executemany(*args)
+
+    def fetchone(self):
+        with timed('db'):
+            return super().fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with timed('db'):
+            return super().fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with timed('db'):
+            return super().fetchall()
+
+
+class TimedConnection(sqlite3.Connection):
+    """``sqlite3.connect(path, factory=TimedConnection)`` times queries as ``db``."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def commit(self):
+        with timed('db'):
+            return super().commit()
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, bucket, seconds):
+        self.counts[bucket] += 1
+        self.total += seconds
+        self.count += 1
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    """Collect stage timings for one Flask app and publish them.
+
+    ``install(app)`` hooks the app and adds ``GET /api/metrics``.  With
+    ``server_timing`` off the histograms are still kept but no
+    ``Server-Timing`` header is sent.
+    """
+
+    def __init__(self, service, buckets=BUCKETS, server_timing=True):
+        self.service = service
+        self.buckets = tuple(sorted(buckets))
+        self.server_timing = server_timing
+        self._requests = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def install(self, app):
+        app.json = TimedJSONProvider(app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/api/metrics', 'metrics', self.metrics_view, methods=['GET'])
+        return self
+
+    def _start(self):
+        g.stage_timings = {}
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.pop('request_started', None)
+        timings = g.pop('stage_timings', None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        self.observe(endpoint, request.method, response.status_code, total, timings)
+        if self.server_timing:
+            entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()]
+            entries.append(f"total;dur={total * 1000:.2f}")
+            response.headers.add('Server-Timing', ', '.join(entries))
+            # The frontend runs on another origin; without this the browser hides the timings
+            response.headers.setdefault('Timing-Allow-Origin', '*')
+        return response
+
+    def observe(self, endpoint, method, status, total, timings):
+        """Record one request: its total and each stage, in seconds."""
+        size = len(self.buckets) + 1
+        with self._lock:
+            key = (endpoint, method, f"{status // 100}xx")
+            histogram = self._requests.get(key)
+            if histogram is None:
+                histogram = self._requests[key] = _Histogram(size)
+            histogram.observe(bisect_left(self.buckets, total), total)
+            for stage, seconds in timings.items():
+                histogram = self._stages.get((endpoint, stage))
+                if histogram is None:
+                    histogram = self._stages[(endpoint, stage)] = _Histogram(size)
+                histogram.observe(bisect_left(self.buckets, seconds), seconds)
+
+    def _render_histograms(self, lines, name, help_text, label_names, histograms):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        bounds = [repr(bound) for bound in self.buckets] + ['+Inf']
+        for key, histogram in sorted(histograms.items()):
+            labels = ','.join(f'{label}="{_label(value)}"'
+                              for label, value in zip(('service',) + label_names, (self.service,) + key))
+            cumulative = 0
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def render(self):
+        """The histograms in the Prometheus text exposition format."""
+        with self._lock:
+            requests = {key: self._copy(h) for key, h in self._requests.items()}
+            stages = {key: self._copy(h) for key, h in self._stages.items()}
+        lines = []
+        self._render_histograms(lines, 'http_request_duration_seconds', 'Time to produce the response.',
+                                ('endpoint', 'method', 'status'), requests)
+        self._render_histograms(lines, 'http_request_stage_seconds',
+                                'Time spent per request in each stage (parse, validate, solve, render, db, json, ...).',
+                                ('endpoint', 'stage'), stages)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _copy(histogram):
+        copy = _Histogram(len(histogram.counts))
+        copy.counts = list(histogram.counts)
+        copy.total = histogram.total
+        copy.count = histogram.count
+        return copy
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Production entry point for the solver backends.
+
+Runs one of the Flask apps under gunicorn with pre-forked worker processes,
+so CPU-bound SymPy work in one request does not hold up the others::
+
+    python api/serve.py solver               # or, from api/: python -m serve solver
+    python api/serve.py rational-function --workers 8
+    python api/serve.py hybrid-db --bind 127.0.0.1:5055
+    python api/serve.py solver --reload      # graceful reload (SIGHUP to the master)
+
+Worker count, request threads, the max-requests recycle limit and the
+timeouts come from ``SOLVER_WEB_*`` in api/settings.py; the options below
+override them.  The app is imported in each worker rather than in the
+master, so the solver pools and warm-up threads are never forked half-way
+and a reload picks up new code.  Each worker runs its own solver pool of
+``SOLVER_POOL_WORKERS`` processes, 1 unless set, so the total number of
+solver processes follows the web worker count.
+
+``python api/solver.py`` (and the other two) still start Flask's
+development server with the reloader; that is what ``--dev`` runs too.
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import sys
+
+# One solver process per web worker unless configured; must be set before
+# the settings are read
+os.environ.setdefault('SOLVER_POOL_WORKERS', '1')
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, API_DIR)
+
+from settings import (
+    SOLVER_WEB_GRACEFUL_TIMEOUT,
+    SOLVER_WEB_MAX_REQUESTS,
+    SOLVER_WEB_MAX_REQUESTS_JITTER,
+    SOLVER_WEB_PID_DIR,
+    SOLVER_WEB_THREADS,
+    SOLVER_WEB_TIMEOUT,
+    SOLVER_WEB_WORKERS,
+    SOLVER_WEB_WORKERS_PER_CORE,
+)
+
+# Service name -> (module, default port, function to run once per worker before serving)
+SERVICES = {
+    'solver': ('solver', 5000, None),
+    'rational-function': ('rational_function_solver', 5001, None),
+    'hybrid-db': ('hybrid_db_server', 5055, 'init_db'),
+}
+
+
+def default_workers(workers=SOLVER_WEB_WORKERS, per_core=SOLVER_WEB_WORKERS_PER_CORE, cores=None):
+    """``workers`` if set, otherwise ``per_core`` workers per CPU core (at least 1)."""
+    if workers > 0:
+        return workers
+    return max(1, round(per_core * (cores or os.cpu_count() or 1)))
+
+
+def pid_path(service):
+    return os.path.join(SOLVER_WEB_PID_DIR, f'{service}.pid')
+
+
+def load_app(service):
+    module_name, _, setup = SERVICES[service]
+    module = importlib.import_module(module_name)
+    if setup:
+        getattr(module, setup)()
+    return module.app
+
+
+def gunicorn_options(service, args):
+    return {
+        'bind': args.bind or f'0.0.0.0:{SERVICES[service][1]}',
+        'workers': default_workers(args.workers or SOLVER_WEB_WORKERS),
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests_jitter if args.max_requests else 0,
+        'timeout': int(SOLVER_WEB_TIMEOUT),
+        'graceful_timeout': int(SOLVER_WEB_GRACEFUL_TIMEOUT),
+        'preload_app': False,
+        'pidfile': pid_path(service),
+        'proc_name': f'cortex-{service}',
+        'chdir': API_DIR,
+        'accesslog': '-',
+    }
+
+
+def serve(service, args):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ gunicorn is not installed (pip install gunicorn); it does not run on Windows,")
+        print(f"   use the development server there: python api/{SERVICES[service][0]}.py")
+        return 1
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(service, args).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app(service)
+
+    Application().run()
+    return 0
+
+
+def serve_dev(service, args):
+    port = SERVICES[service][1]
+    host, _, bind_port = (args.bind or f'0.0.0.0:{port}').rpartition(':')
+    load_app(service).run(debug=True, host=host or '0.0.0.0', port=int(bind_port))
+    return 0
+
+
+def reload(service):
+    """Ask a running master to replace its workers gracefully."""
+    try:
+        with open(pid_path(service)) as fh:
+            pid = int(fh.read().strip())
+        os.kill(pid, signal.SIGHUP)
+    except (OSError, ValueError) as exc:
+        print(f"❌ Could not reload {service}: {exc}")
+        return 1
+    print(f"🔄 Reloading {service} (pid {pid})")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('service', choices=sorted(SERVICES))
+    parser.add_argument('--bind', help='host:port to listen on (default 0.0.0.0 and the service port)')
+    parser.add_argument('--workers', type=int,
+                        help='worker processes (default SOLVER_WEB_WORKERS, or SOLVER_WEB_WORKERS_PER_CORE per core)')
+    parser.add_argument('--threads', type=int, default=SOLVER_WEB_THREADS, help='request threads per worker')
+    parser.add_argument('--max-requests', type=int, default=SOLVER_WEB_MAX_REQUESTS,
+                        help='replace a worker after this many requests (0: never)')
+    parser.add_argument('--max-requests-jitter', type=int, default=SOLVER_WEB_MAX_REQUESTS_JITTER)
+    parser.add_argument('--dev', action='store_true', help="run Flask's development server instead")
+    parser.add_argument('--reload', action='store_true',
+                        help='make the running server replace its workers gracefully, then exit')
+    args = parser.parse_args(argv)
+
+    if args.reload:
+        return reload(args.service)
+    if args.dev:
+        return serve_dev(args.service, args)
+    return serve(args.service, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Runtime settings for the solver backends.
+
+Every value can be overridden through an environment variable so the same
+code runs unchanged on a laptop and on the classroom server.
+"""
+
+import os
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Solution cache used by api/solver.py
+SOLVER_CACHE_SIZE = _env_int('SOLVER_CACHE_SIZE', 1024)
+SOLVER_CACHE_TTL = _env_float('SOLVER_CACHE_TTL', 3600.0)
+
+# Worker processes that run SymPy calls (api/solver_pool.py); 0 runs inline
+SOLVER_POOL_WORKERS = _env_int('SOLVER_POOL_WORKERS', min(4, os.cpu_count() or 1))
+SOLVER_TIMEOUT = _env_float('SOLVER_TIMEOUT', 10.0)
+SOLVER_WORKER_MAX_TASKS = _env_int('SOLVER_WORKER_MAX_TASKS', 200)
+SOLVER_WORKER_MAX_RSS_MB = _env_int('SOLVER_WORKER_MAX_RSS_MB', 512)
+SOLVER_POOL_START_METHOD = os.environ.get('SOLVER_POOL_START_METHOD') or None
+
+# Admission control (api/admission.py): equations whose cleared polynomial
+# has degree above SOLVER_INLINE_MAX_DEGREE go to the background pool, above
+# SOLVER_MAX_DEGREE they are rejected
+SOLVER_INLINE_MAX_DEGREE = _env_int('SOLVER_INLINE_MAX_DEGREE', 4)
+SOLVER_MAX_DEGREE = _env_int('SOLVER_MAX_DEGREE', 10)
+SOLVER_BACKGROUND_WORKERS = _env_int('SOLVER_BACKGROUND_WORKERS', 1)
+SOLVER_BACKGROUND_TIMEOUT = _env_float('SOLVER_BACKGROUND_TIMEOUT', 30.0)
+
+# Largest number of equations accepted by /api/solve/batch
+SOLVER_BATCH_MAX = _env_int('SOLVER_BATCH_MAX', 500)
+
+# Persistent solution store shared by every process (api/solution_store.py);
+# an empty SOLVER_STORE_PATH disables it.  SOLVER_STORE_VERSION overrides the
+# hash of the solver sources that normally invalidates old entries.
+SOLVER_STORE_PATH = os.environ.get(
+    'SOLVER_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solutions.db')
+)
+SOLVER_STORE_MAX_ENTRIES = _env_int('SOLVER_STORE_MAX_ENTRIES', 20000)
+SOLVER_STORE_VERSION = os.environ.get('SOLVER_STORE_VERSION') or None
+# SOLVER_CACHE_TTL only bounds the in-memory cache; the store keeps rows for
+# SOLVER_STORE_TTL seconds (0 keeps them until evicted or the solver changes)
+SOLVER_STORE_TTL = _env_float('SOLVER_STORE_TTL', 0.0)
+
+# Rendered rational-function graphs (GET /api/rational-function/graph): up to
+# SOLVER_GRAPH_CACHE_SIZE images in memory per process, backed by a store of
+# SOLVER_GRAPH_STORE_MAX_ENTRIES images at SOLVER_GRAPH_STORE_PATH (empty
+# disables it).  Browsers may reuse an image for SOLVER_GRAPH_MAX_AGE seconds
+# before revalidating it with its ETag.
+SOLVER_GRAPH_CACHE_SIZE = _env_int('SOLVER_GRAPH_CACHE_SIZE', 128)
+SOLVER_GRAPH_CACHE_TTL = _env_float('SOLVER_GRAPH_CACHE_TTL', 3600.0)
+SOLVER_GRAPH_STORE_PATH = os.environ.get(
+    'SOLVER_GRAPH_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graphs.db')
+)
+SOLVER_GRAPH_STORE_MAX_ENTRIES = _env_int('SOLVER_GRAPH_STORE_MAX_ENTRIES', 2000)
+SOLVER_GRAPH_MAX_AGE = _env_int('SOLVER_GRAPH_MAX_AGE', 300)
+
+# Async jobs (api/job_queue.py): POST /api/jobs results are kept in the jobs
+# table of SOLVER_JOBS_PATH (hybrid.db by default) for SOLVER_JOB_TTL seconds;
+# the servers share the table but each only reads back the jobs it queued.
+# Jobs get SOLVER_JOB_TIMEOUT seconds of solver time instead of SOLVER_TIMEOUT.
+SOLVER_JOBS_PATH = os.environ.get(
+    'SOLVER_JOBS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hybrid.db')
+)
+SOLVER_JOB_TTL = _env_float('SOLVER_JOB_TTL', 86400.0)
+SOLVER_JOB_WORKERS = _env_int('SOLVER_JOB_WORKERS', 2)
+SOLVER_JOB_MAX_PENDING = _env_int('SOLVER_JOB_MAX_PENDING', 100)
+SOLVER_JOB_TIMEOUT = _env_float('SOLVER_JOB_TIMEOUT', 60.0)
+
+# Per-request stage timings (api/request_metrics.py) are always collected
+# for GET /api/metrics; SOLVER_SERVER_TIMING=0 stops sending them to clients
+# in the Server-Timing header
+SOLVER_SERVER_TIMING = _env_int('SOLVER_SERVER_TIMING', 1)
+
+# On-demand profiling (api/profiling.py) is always allowed from localhost;
+# other clients must send this token in X-Profile-Token (empty: nobody else)
+SOLVER_PROFILE_TOKEN = os.environ.get('SOLVER_PROFILE_TOKEN', '')
+
+# Boot-time warm-up (api/warmup.py); SOLVER_WARMUP=0 skips it
+SOLVER_WARMUP = _env_int('SOLVER_WARMUP', 1)
+SOLVER_WARMUP_FILE = os.environ.get(
+    'SOLVER_WARMUP_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'warmup_equations.json')
+)
+
+# Production serving (api/serve.py): gunicorn runs SOLVER_WEB_WORKERS
+# pre-forked processes (0: SOLVER_WEB_WORKERS_PER_CORE per CPU core), each
+# with SOLVER_WEB_THREADS request threads and its own solver pool.  A worker
+# is replaced after SOLVER_WEB_MAX_REQUESTS requests (plus up to
+# SOLVER_WEB_MAX_REQUESTS_JITTER, so they do not all restart at once; 0
+# never).  On reload or shutdown, workers get SOLVER_WEB_GRACEFUL_TIMEOUT
+# seconds to finish their requests.
+SOLVER_WEB_WORKERS = _env_int('SOLVER_WEB_WORKERS', 0)
+SOLVER_WEB_WORKERS_PER_CORE = _env_float('SOLVER_WEB_WORKERS_PER_CORE', 1.0)
+SOLVER_WEB_THREADS = _env_int('SOLVER_WEB_THREADS', 4)
+SOLVER_WEB_MAX_REQUESTS = _env_int('SOLVER_WEB_MAX_REQUESTS', 1000)
+SOLVER_WEB_MAX_REQUESTS_JITTER = _env_int('SOLVER_WEB_MAX_REQUESTS_JITTER', 100)
+SOLVER_WEB_TIMEOUT = _env_float('SOLVER_WEB_TIMEOUT', 120.0)
+SOLVER_WEB_GRACEFUL_TIMEOUT = _env_float('SOLVER_WEB_GRACEFUL_TIMEOUT', 30.0)
+SOLVER_WEB_PID_DIR = os.environ.get('SOLVER_WEB_PID_DIR', os.path.dirname(os.path.abspath(__file__)))
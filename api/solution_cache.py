@@ -0,0 +1,189 @@
+"""In-process LRU cache for solver results.
+
+Entries are keyed by a canonical form of the parsed equation so that
+``1/(x-2)=3``, ``1/(x - 2) = 3`` and ``3=1/(x-2)`` share one entry.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=4096)
+def _canonical_from_compact(compact):
+    """``(key, swapped)``: the key, and whether it lists the sides in reverse."""
+    import sympy as sp
+    from cortex_core.parser import parse_equation
+
+    try:
+        lhs, rhs = parse_equation(compact, evaluate=False)
+    except Exception:
+        # Unparseable input still gets a stable (whitespace-free) key
+        return compact, False
+    lhs, rhs = sp.sstr(lhs), sp.sstr(rhs)
+    if rhs < lhs:
+        return f"{rhs}={lhs}", True
+    return f"{lhs}={rhs}", False
+
+
+def canonical_function_key(function_str):
+    """Return a whitespace-insensitive key for a rational-function string."""
+    return re.sub(r'\s+', '', function_str or '')
+
+
+def canonical_equation_key(equation_str):
+    """Return a canonical key for an equation string.
+
+    Whitespace is ignored, both sides are parsed without evaluation and
+    printed in SymPy's canonical order, and the two sides are put in a fixed
+    order, so ``3=1/(x-2)`` and ``1/(x-2)=3`` share a key.  Nothing is
+    simplified, so ``x/x=1`` and ``1=1`` keep separate entries: their
+    restrictions differ.  Use ``equation_sides_swapped`` to tell a cached
+    result's sides from the caller's.
+    """
+    compact = re.sub(r'\s+', '', equation_str or '')
+    return _canonical_from_compact(compact)[0]
+
+
+def equation_sides_swapped(equation_str):
+    """Whether ``canonical_equation_key`` lists the sides of ``equation_str`` in reverse."""
+    compact = re.sub(r'\s+', '', equation_str or '')
+    return _canonical_from_compact(compact)[1]
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SolutionCache:
+    """Thread-safe LRU cache with a per-entry time-to-live.
+
+    ``maxsize <= 0`` disables caching, ``ttl <= 0`` keeps entries until they
+    are evicted by size.  An optional ``store`` (a ``SolutionStore``) backs
+    the in-memory entries so results survive restarts and are shared between
+    processes; ``ttl`` only applies to the in-memory entries, the store has
+    its own.
+
+    ``get_or_compute`` is single-flight: concurrent misses on one key run
+    ``compute`` once and every caller gets that result (or its exception).
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0, store=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._data = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def lookup(self, key, default=None):
+        """Like ``get``, but falls back to the store and promotes what it finds."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING and self.store is not None:
+            value = self.store.get(key, _MISSING)
+            if value is not _MISSING:
+                self.set(key, value)
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        """Like ``set``, but also writes through to the store."""
+        self.set(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss.
+
+        While one caller computes ``key``, other callers for the same key
+        wait for it instead of starting their own computation.  Exceptions
+        raised by ``compute`` propagate to all of them and nothing is cached.
+        """
+        value = self.lookup(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                entry = self._data.get(key)
+                if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                    # Filled by a computation that finished after our lookup
+                    return entry[1]
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.coalesced = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights),
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+            }
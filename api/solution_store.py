@@ -0,0 +1,221 @@
+"""Persistent solution store shared by every solver process.
+
+A single SQLite table (``api/solutions.db`` by default) maps a cache key to
+the JSON-encoded solver result.  SQLite's WAL mode lets any number of Flask
+and pool processes read and write it at the same time, and the file survives
+restarts so a fresh deploy does not re-solve the lesson catalog.
+
+Every row records the solver version that produced it.  The version is a hash
+of the solver source files, so editing the solver invalidates old rows
+without anyone having to remember to bump a number.  The table is bounded to
+``max_entries`` rows; the least recently used rows are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_MISSING = object()
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files whose contents determine the results stored here
+SOLVER_SOURCES = (
+    os.path.join('cortex_core', 'calculator.py'),
+    os.path.join('cortex_core', 'engine.py'),
+    os.path.join('cortex_core', 'kernel.py'),
+    os.path.join('cortex_core', 'parser.py'),
+    'yessss.py',
+    os.path.join('api', 'FINAL_SOLVING_CALCULATOR.py'),
+    os.path.join('api', 'rational_function_tasks.py'),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+def solver_version(paths=SOLVER_SOURCES, root=_ROOT):
+    """Short hash of the solver source files (missing files are skipped)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(os.path.join(root, path), 'rb') as fh:
+                digest.update(path.encode('utf-8'))
+                digest.update(fh.read())
+        except OSError:
+            continue
+    return digest.hexdigest()[:16]
+
+
+def _encode_key(key):
+    return key if isinstance(key, str) else json.dumps(key, ensure_ascii=False)
+
+
+class SolutionStore:
+    """SQLite-backed key/value store for JSON-serializable solver results.
+
+    ``max_entries <= 0`` disables eviction; the size is checked every
+    ``EVICT_EVERY`` writes, so the table can briefly run that many rows over.
+    Eviction drops the least recently read rows, but reads never write:
+    their access times are kept in memory and saved with the next ``set``,
+    which is the only place eviction happens.
+    ``ttl > 0`` ignores rows older than ``ttl`` seconds.  Rows from other
+    solver versions are purged once, when the database is first opened.
+    Store errors (a locked or read-only database) are swallowed and counted:
+    the store only ever makes requests faster, it never makes them fail.
+    ``default`` and ``object_hook`` are passed to ``json.dumps`` and
+    ``json.loads`` so other value types can be stored too.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, path, version=None, max_entries=20000, timeout=5.0, ttl=0.0,
+                 default=None, object_hook=None):
+        self.path = path
+        self.version = version or solver_version()
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.ttl = ttl
+        self.default = default
+        self.object_hook = object_hook
+        self._writes = 0
+        self._touched = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(SCHEMA)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_solutions_accessed ON solutions(accessed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_solutions_version ON solutions(version)')
+            # Rows written by another solver version can never be read again
+            conn.execute('DELETE FROM solutions WHERE version != ?', (self.version,))
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key, default=None):
+        try:
+            conn = self._connect()
+            try:
+                oldest = time.time() - self.ttl if self.ttl > 0 else 0.0
+                row = conn.execute(
+                    'SELECT value FROM solutions WHERE key = ? AND version = ? AND created_at >= ?',
+                    (_encode_key(key), self.version, oldest),
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._count('errors')
+            return default
+        if row is None:
+            self._count('misses')
+            return default
+        try:
+            value = json.loads(row[0], object_hook=self.object_hook)
+        except (ValueError, TypeError, KeyError):
+            # A truncated or old-format row, or one the object hook cannot
+            # rebuild (SympifyError is a ValueError); the caller recomputes it
+            self._count('errors')
+            return default
+        with self._lock:
+            self.hits += 1
+            self._touched[_encode_key(key)] = time.time()
+        return value
+
+    def set(self, key, value):
+        try:
+            encoded = json.dumps(value, ensure_ascii=False, default=self.default)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO solutions (key, version, value, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (_encode_key(key), self.version, encoded, now, now),
+                )
+                with self._lock:
+                    self._writes += 1
+                    evict = self._writes % self.EVICT_EVERY == 0
+                    touched, self._touched = self._touched, {}
+                touched.pop(_encode_key(key), None)
+                if touched:
+                    conn.executemany(
+                        'UPDATE solutions SET accessed_at = ? WHERE key = ?',
+                        [(accessed_at, key) for key, accessed_at in touched.items()],
+                    )
+                if evict:
+                    self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._count('errors')
+
+    def _evict(self, conn):
+        if self.max_entries <= 0:
+            return
+        (count,) = conn.execute('SELECT COUNT(*) FROM solutions').fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                'DELETE FROM solutions WHERE key IN '
+                '(SELECT key FROM solutions ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM solutions')
+                conn.commit()
+                with self._lock:
+                    self._touched.clear()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._count('errors')
+
+    def stats(self):
+        try:
+            conn = self._connect()
+            try:
+                (size,) = conn.execute('SELECT COUNT(*) FROM solutions').fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            size = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': size,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'version': self.version,
+            }
@@ -1,8 +1,11 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import sys
 import os
 import traceback
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import repeat
 
 # Add the parent directory to the path to import the solver
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,18 +14,39 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from FINAL_SOLVING_CALCULATOR import (
         validate_rational_equation,
-        stepwise_rational_solution_with_explanations,
         insert_multiplication_signs,
         classify_equation
     )
+    # The solve is cached as a structured solution and rendered per request
+    from cortex_core.engine import (
+        iter_teacher_steps,
+        mirror_solution,
+        solution_from_json,
+        solution_to_json,
+        teacher_solution,
+        teacher_steps,
+    )
 except ImportError as e:
     print(f"Error importing solver: {e}")
     # Fallback functions if import fails
     def validate_rational_equation(equation_str):
         return False, "Solver not available"
     
-    def stepwise_rational_solution_with_explanations(equation_str):
-        return "Solver not available"
+    def teacher_solution(equation_str):
+        return {"error": "Solver not available"}
+    
+    def teacher_steps(outcome, equation_str):
+        return [{"step": "error", "markdown": outcome["error"]}]
+    
+    def iter_teacher_steps(equation_str, with_solution=False):
+        yield {"step": "error", "markdown": "Solver not available"}
+        if with_solution:
+            yield {"step": "solution", "solution": {"error": "Solver not available"}}
+    
+    solution_to_json = solution_from_json = None
+    
+    def mirror_solution(outcome):
+        return outcome
     
     def insert_multiplication_signs(equation_str):
         return equation_str
@@ -30,8 +54,237 @@ except ImportError as e:
     def classify_equation(equation, variable='x'):
         return {"type": "unknown", "error": "Solver not available"}
 
+from settings import (
+    SOLVER_BACKGROUND_TIMEOUT,
+    SOLVER_BACKGROUND_WORKERS,
+    SOLVER_BATCH_MAX,
+    SOLVER_CACHE_SIZE,
+    SOLVER_CACHE_TTL,
+    SOLVER_INLINE_MAX_DEGREE,
+    SOLVER_JOB_MAX_PENDING,
+    SOLVER_JOB_TIMEOUT,
+    SOLVER_JOB_TTL,
+    SOLVER_JOB_WORKERS,
+    SOLVER_JOBS_PATH,
+    SOLVER_MAX_DEGREE,
+    SOLVER_POOL_START_METHOD,
+    SOLVER_POOL_WORKERS,
+    SOLVER_PROFILE_TOKEN,
+    SOLVER_SERVER_TIMING,
+    SOLVER_STORE_MAX_ENTRIES,
+    SOLVER_STORE_PATH,
+    SOLVER_STORE_TTL,
+    SOLVER_STORE_VERSION,
+    SOLVER_TIMEOUT,
+    SOLVER_WARMUP,
+    SOLVER_WARMUP_FILE,
+    SOLVER_WORKER_MAX_RSS_MB,
+    SOLVER_WORKER_MAX_TASKS,
+)
+from admission import Admission
+from cost_estimator import CostLimits
+from job_queue import JobQueue, UnknownJobKind
+from profiling import Profiler, profile_mode, profiled_call
+from request_metrics import RequestMetrics, timed
+from solution_cache import SolutionCache, canonical_equation_key, equation_sides_swapped
+from solution_store import SolutionStore
+from solver_pool import SolverError, SolverPool, error_response
+from warmup import Warmup, load_warmup_items
+
 app = Flask(__name__)
 CORS(app)
+metrics = RequestMetrics('solver', server_timing=bool(SOLVER_SERVER_TIMING)).install(app)
+profiler = Profiler(token=SOLVER_PROFILE_TOKEN).install(app)
+
+solution_store = SolutionStore(
+    SOLVER_STORE_PATH, version=SOLVER_STORE_VERSION, max_entries=SOLVER_STORE_MAX_ENTRIES,
+    ttl=SOLVER_STORE_TTL, default=solution_to_json, object_hook=solution_from_json,
+) if SOLVER_STORE_PATH else None
+solution_cache = SolutionCache(maxsize=SOLVER_CACHE_SIZE, ttl=SOLVER_CACHE_TTL, store=solution_store)
+solver_pool = SolverPool(
+    max_workers=SOLVER_POOL_WORKERS,
+    timeout=SOLVER_TIMEOUT,
+    max_tasks=SOLVER_WORKER_MAX_TASKS,
+    max_rss_mb=SOLVER_WORKER_MAX_RSS_MB,
+    preload=('FINAL_SOLVING_CALCULATOR',),
+    start_method=SOLVER_POOL_START_METHOD,
+)
+# Expensive equations queue here so they cannot starve the main pool
+background_pool = SolverPool(
+    max_workers=SOLVER_BACKGROUND_WORKERS,
+    timeout=SOLVER_BACKGROUND_TIMEOUT,
+    max_tasks=SOLVER_WORKER_MAX_TASKS,
+    max_rss_mb=SOLVER_WORKER_MAX_RSS_MB,
+    preload=('FINAL_SOLVING_CALCULATOR',),
+    start_method=SOLVER_POOL_START_METHOD,
+)
+admission = Admission(
+    CostLimits(inline_degree=SOLVER_INLINE_MAX_DEGREE, max_degree=SOLVER_MAX_DEGREE),
+    solver_pool,
+    background_pool,
+)
+
+# A profiled request (see api/profiling.py) skips the cache so the work is redone
+
+# ``timeout`` replaces the pool's budget (jobs get SOLVER_JOB_TIMEOUT)
+
+def cached_validate(equation, pool=solver_pool, timeout=None):
+    if profile_mode():
+        return profiled_call(pool, validate_rational_equation, equation, timeout=timeout)
+    key = ('validate', canonical_equation_key(equation))
+    return solution_cache.get_or_compute(
+        key, lambda: pool.call(validate_rational_equation, equation, timeout=timeout))
+
+def oriented(equation):
+    """Swap a cached solution's sides to or from ``equation``'s order."""
+    return mirror_solution if equation_sides_swapped(equation) else (lambda solution: solution)
+
+def cached_solution(equation, pool=solver_pool, timeout=None):
+    """The structured solution of ``equation`` (see ``teacher_solution``).
+
+    The cache holds the solution, not its Markdown; ``render_solution``
+    turns it into text for the equation as each caller typed it.  Mirrored
+    equations share an entry, kept with its sides in the key's order.
+    """
+    if profile_mode():
+        return profiled_call(pool, teacher_solution, equation, timeout=timeout)
+    key = ('solve', canonical_equation_key(equation))
+    orient = oriented(equation)
+    return orient(solution_cache.get_or_compute(
+        key, lambda: orient(pool.call(teacher_solution, equation, timeout=timeout))))
+
+def render_solution(solution, equation):
+    return '\n'.join(step['markdown'] for step in teacher_steps(solution, equation))
+
+def cached_classification(equation, pool=solver_pool, timeout=None):
+    if profile_mode():
+        return profiled_call(pool, classify_equation, equation, timeout=timeout)
+    key = ('classify', canonical_equation_key(equation))
+    return solution_cache.get_or_compute(key, lambda: pool.call(classify_equation, equation, timeout=timeout))
+
+def stream_steps(equation, pool=solver_pool):
+    """Yield the teacher-voice sections of ``equation`` as they are computed.
+
+    A cached solution is rendered at once; a fresh one is streamed from the
+    pool and its structured solution cached for ``/api/solve`` as well.
+    """
+    key = ('solve', canonical_equation_key(equation))
+    orient = oriented(equation)
+    solution = solution_cache.lookup(key)
+    if solution is not None:
+        yield from teacher_steps(orient(solution), equation)
+        return
+    for step in pool.stream(iter_teacher_steps, equation, with_solution=True):
+        if step['step'] == 'solution':
+            solution_cache.put(key, orient(step['solution']))
+        else:
+            yield step
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def solver_error(exc, equation):
+    payload, status = error_response(exc)
+    payload['equation'] = equation
+    return jsonify(payload), status
+
+def solve_pipeline(equation, timeout=None):
+    """Preprocess, validate, solve and classify one equation.
+
+    Returns the ``/api/solve`` payload and its HTTP status.  ``SolverError``
+    from the pool or from admission control propagates to the caller.
+    ``timeout`` replaces the pool's budget for each solver call.
+    """
+    with timed('parse'):
+        # Preprocess the equation
+        equation = equation.replace('X', 'x')  # Convert X to x
+        equation = insert_multiplication_signs(equation)
+        
+        # Cost the equation before any SymPy work; rejects raise SolverRejected
+        pool, estimate = admission.pool_for(equation)
+    
+    # Validate the equation
+    with timed('validate'):
+        valid, message = cached_validate(equation, pool, timeout)
+    
+    if not valid:
+        return {
+            'success': False,
+            'error': message,
+            'equation': equation
+        }, 400
+    
+    # Solve in the worker (or the cache), render the steps for this request
+    with timed('solve'):
+        solution = cached_solution(equation, pool, timeout)
+    with timed('render'):
+        solution = render_solution(solution, equation)
+    
+    # Classify the equation
+    try:
+        with timed('classify'):
+            classification = cached_classification(equation, pool, timeout)
+    except Exception as e:
+        classification = {"type": "unknown", "error": str(e)}
+    
+    return {
+        'success': True,
+        'equation': equation,
+        'solution': solution,
+        'classification': classification,
+        'valid': valid,
+        'message': message,
+        'cost': estimate.as_dict()
+    }, 200
+
+def batch_item(index, equation, timeout=None):
+    """Run ``solve_pipeline`` for one batch entry; never raises."""
+    try:
+        if not isinstance(equation, str) or not equation.strip():
+            payload, status = {'success': False, 'error': 'No equation provided'}, 400
+        else:
+            payload, status = solve_pipeline(equation.strip(), timeout)
+    except SolverError as e:
+        payload, status = error_response(e)
+        payload['equation'] = equation
+    except Exception as e:
+        payload, status = {'success': False, 'error': f'Server error: {str(e)}', 'equation': equation}, 500
+    return {'index': index, 'status': status, **payload}
+
+def solve_job(request_data):
+    equation = request_data.get('equation')
+    if not isinstance(equation, str) or not equation.strip():
+        return {'success': False, 'error': 'No equation provided'}, 400
+    return solve_pipeline(equation.strip(), SOLVER_JOB_TIMEOUT)
+
+def batch_job(request_data):
+    equations = request_data.get('equations')
+    if not isinstance(equations, list) or not equations:
+        return {'success': False, 'error': 'No equations provided'}, 400
+    if len(equations) > SOLVER_BATCH_MAX:
+        return {'success': False, 'error': f'Too many equations: at most {SOLVER_BATCH_MAX} per batch'}, 413
+    # Fan out over the pool like /api/solve/batch; results keep request order
+    with ThreadPoolExecutor(max_workers=max(1, solver_pool.max_workers)) as executor:
+        results = list(executor.map(batch_item, range(len(equations)), equations,
+                                    repeat(SOLVER_JOB_TIMEOUT)))
+    return {'success': True, 'results': results}, 200
+
+# Slow solves and whole batches can run as jobs; see api/job_queue.py
+jobs = JobQueue(
+    SOLVER_JOBS_PATH,
+    {'solve': solve_job, 'batch': batch_job},
+    service='solver',
+    workers=SOLVER_JOB_WORKERS,
+    ttl=SOLVER_JOB_TTL,
+    max_pending=SOLVER_JOB_MAX_PENDING,
+)
+
+# Pre-solve the lesson equations so the first real request is already warm
+warmup = Warmup(
+    load_warmup_items(SOLVER_WARMUP_FILE, 'equations') if SOLVER_WARMUP else [],
+    solve_pipeline,
+    workers=solver_pool.max_workers,
+).start()
 
 @app.route('/api/solve', methods=['POST'])
 def solve_equation():
@@ -45,12 +298,87 @@ def solve_equation():
                 'error': 'No equation provided'
             }), 400
         
-        # Preprocess the equation
-        equation = equation.replace('X', 'x')  # Convert X to x
-        equation = insert_multiplication_signs(equation)
+        payload, status = solve_pipeline(equation)
+        return jsonify(payload), status
         
-        # Validate the equation
-        valid, message = validate_rational_equation(equation)
+    except SolverError as e:
+        return solver_error(e, equation)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}',
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/api/solve/batch', methods=['POST'])
+def solve_batch():
+    """Solve many equations at once, streaming NDJSON in completion order.
+
+    Each line carries the ``index`` of the equation in the request, its own
+    ``status`` and the same fields as ``/api/solve``, so one bad equation
+    does not fail the batch.
+    """
+    data = request.get_json(silent=True) or {}
+    equations = data.get('equations')
+    
+    if not isinstance(equations, list) or not equations:
+        return jsonify({
+            'success': False,
+            'error': 'No equations provided'
+        }), 400
+    if len(equations) > SOLVER_BATCH_MAX:
+        return jsonify({
+            'success': False,
+            'error': f'Too many equations: at most {SOLVER_BATCH_MAX} per batch'
+        }), 413
+    
+    # One thread per pool worker keeps every core busy without queueing
+    # requests inside the pool past their budget
+    executor = ThreadPoolExecutor(max_workers=max(1, solver_pool.max_workers))
+    futures = [executor.submit(batch_item, i, eq) for i, eq in enumerate(equations)]
+    
+    def generate():
+        try:
+            for future in as_completed(futures):
+                yield json.dumps(future.result()) + '\n'
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/solve/stream', methods=['GET', 'POST'])
+def solve_stream():
+    """Stream the ``/api/solve`` solution as Server-Sent Events.
+
+    After a ``start`` event, each section of the teacher-voice solution
+    (denominators and LCD, cleared equation, roots, verification, final
+    answer) arrives as a ``step`` event as soon as it is computed, followed
+    by ``done`` with the classification.  Empty, invalid and rejected
+    equations get the usual JSON error response; failures after the stream
+    has started arrive as an ``error`` event.  GET takes ``?equation=`` so
+    browsers can use ``EventSource``.
+    """
+    equation = ''
+    try:
+        if request.method == 'GET':
+            equation = request.args.get('equation', '')
+        else:
+            equation = (request.get_json(silent=True) or {}).get('equation', '')
+        equation = equation.strip()
+        
+        if not equation:
+            return jsonify({
+                'success': False,
+                'error': 'No equation provided'
+            }), 400
+        
+        # Same preprocessing, admission and validation as /api/solve
+        with timed('parse'):
+            equation = equation.replace('X', 'x')
+            equation = insert_multiplication_signs(equation)
+            pool, estimate = admission.pool_for(equation)
+        with timed('validate'):
+            valid, message = cached_validate(equation, pool)
         
         if not valid:
             return jsonify({
@@ -59,30 +387,51 @@ def solve_equation():
                 'equation': equation
             }), 400
         
-        # Get the step-by-step solution
-        solution = stepwise_rational_solution_with_explanations(equation)
-        
-        # Classify the equation
-        try:
-            classification = classify_equation(equation)
-        except Exception as e:
-            classification = {"type": "unknown", "error": str(e)}
-        
-        return jsonify({
-            'success': True,
-            'equation': equation,
-            'solution': solution,
-            'classification': classification,
-            'valid': valid,
-            'message': message
-        })
-        
+    except SolverError as e:
+        return solver_error(e, equation)
     except Exception as e:
         return jsonify({
             'success': False,
-            'error': f'Server error: {str(e)}',
-            'traceback': traceback.format_exc()
+            'error': f'Server error: {str(e)}'
         }), 500
+    
+    def generate():
+        yield sse_event('start', {
+            'equation': equation,
+            'valid': valid,
+            'message': message,
+            'cost': estimate.as_dict()
+        })
+        try:
+            for step in stream_steps(equation, pool):
+                yield sse_event('step', step)
+            try:
+                classification = cached_classification(equation, pool)
+            except Exception as e:
+                classification = {"type": "unknown", "error": str(e)}
+            yield sse_event('done', {
+                'success': True,
+                'equation': equation,
+                'classification': classification
+            })
+        except SolverError as e:
+            payload, status = error_response(e)
+            payload.update(equation=equation, status=status)
+            yield sse_event('error', payload)
+        except Exception as e:
+            yield sse_event('error', {
+                'success': False,
+                'error': f'Server error: {str(e)}',
+                'equation': equation,
+                'status': 500
+            })
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the events
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/api/validate', methods=['POST'])
 def validate_equation():
@@ -97,11 +446,14 @@ def validate_equation():
             }), 400
         
         # Preprocess the equation
-        equation = equation.replace('X', 'x')
-        equation = insert_multiplication_signs(equation)
+        with timed('parse'):
+            equation = equation.replace('X', 'x')
+            equation = insert_multiplication_signs(equation)
+            pool, _ = admission.pool_for(equation)
         
         # Validate the equation
-        valid, message = validate_rational_equation(equation)
+        with timed('validate'):
+            valid, message = cached_validate(equation, pool)
         
         return jsonify({
             'success': True,
@@ -110,6 +462,8 @@ def validate_equation():
             'equation': equation
         })
         
+    except SolverError as e:
+        return solver_error(e, equation)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -129,11 +483,14 @@ def classify_equation_endpoint():
             }), 400
         
         # Preprocess the equation
-        equation = equation.replace('X', 'x')
-        equation = insert_multiplication_signs(equation)
+        with timed('parse'):
+            equation = equation.replace('X', 'x')
+            equation = insert_multiplication_signs(equation)
+            pool, _ = admission.pool_for(equation)
         
         # Classify the equation
-        classification = classify_equation(equation)
+        with timed('classify'):
+            classification = cached_classification(equation, pool)
         
         return jsonify({
             'success': True,
@@ -141,18 +498,76 @@ def classify_equation_endpoint():
             'equation': equation
         })
         
+    except SolverError as e:
+        return solver_error(e, equation)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Start a solve in the background and return its id at once.
+
+    Body: ``{"kind": "solve", "equation": "..."}`` or
+    ``{"kind": "batch", "equations": [...]}``.  Returns 202; poll
+    ``GET /api/jobs/<id>`` for the status and, when finished, the same
+    payload ``/api/solve`` (or a list of batch items) would have returned.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        with timed('db'):
+            job = jobs.submit(data.get('kind', 'solve'), data)
+        response = jsonify({'success': True, **job})
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    except UnknownJobKind as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except SolverError as e:
+        payload, status = error_response(e)
+        return jsonify(payload), status
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a job and, once it has finished, its result."""
+    try:
+        job = jobs.get(job_id)
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f'Server error: {str(e)}'
         }), 500
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify({'success': True, **job})
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
+    ready = warmup.ready
     return jsonify({
-        'status': 'healthy',
-        'solver_available': True
-    })
+        'status': 'healthy' if ready else 'warming_up',
+        'ready': ready,
+        'warmup': warmup.stats(),
+        'solver_available': True,
+        'cache': solution_cache.stats(),
+        'store': solution_store.stats() if solution_store else None,
+        'pool': solver_pool.stats(),
+        'admission': admission.stats(),
+        'jobs': jobs.stats()
+    }), 200 if ready else 503
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = solution_cache.stats()
+    stats['store'] = solution_store.stats() if solution_store else None
+    return jsonify(stats)
 
 if __name__ == '__main__':
+    # Development server; in production run: python api/serve.py solver
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""Bounded process pool for SymPy work with hard per-call time budgets.
+
+SymPy calls run in worker processes so that a pathological input (a huge
+exponent, a deeply nested fraction) can be killed instead of pinning a Flask
+thread forever.  Each worker handles one call at a time; a call that overruns
+its budget gets its worker killed and replaced.  Workers are also retired
+after ``max_tasks`` calls or once their resident memory passes ``max_rss_mb``
+so SymPy's internal caches cannot grow without bound.
+
+``stream`` runs a generator function the same way and hands its items back
+as the worker produces them, under the same budget.
+
+Workers are started lazily, so importing this module (or creating a pool)
+never forks anything.  ``max_workers <= 0`` runs every call inline, which is
+handy when debugging.
+"""
+
+import atexit
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+
+# Generous limit for a fresh worker to import SymPy and the solver modules
+WORKER_STARTUP_TIMEOUT = 60.0
+
+
+class SolverError(Exception):
+    """Base class for failures of the pool itself (not of the solver)."""
+
+
+class SolverTimeout(SolverError):
+    """The call did not finish within its wall-clock budget."""
+
+
+class SolverBusy(SolverError):
+    """Every worker stayed busy for the whole budget."""
+
+
+class SolverCrashed(SolverError):
+    """The worker process died while handling the call."""
+
+
+class SolverRejected(SolverError):
+    """Admission control refused the call before it reached a worker."""
+
+
+def _rss_bytes():
+    """Current resident set size of this process, or None if unknown."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def _worker_main(conn, preload):
+    try:
+        for name in preload:
+            __import__(name)
+        conn.send(('ready', None, _rss_bytes()))
+        while True:
+            try:
+                task = conn.recv()
+            except (EOFError, OSError):
+                return
+            if task is None:
+                return
+            func, args, kwargs = task
+            try:
+                result = func(*args, **kwargs)
+                if inspect.isgenerator(result):
+                    # Streamed call: one message per item, then the final reply
+                    for item in result:
+                        conn.send(('item', item, None))
+                    result = None
+                reply = ('ok', result)
+            except Exception as exc:
+                reply = ('error', exc)
+            try:
+                conn.send(reply + (_rss_bytes(),))
+            except Exception as exc:
+                # Unpicklable result or exception; nothing was written yet
+                detail = reply[1] if reply[0] == 'error' else exc
+                conn.send(('error', RuntimeError(f"{type(detail).__name__}: {detail}"), _rss_bytes()))
+    except KeyboardInterrupt:
+        return
+
+
+class _Worker:
+    def __init__(self, ctx, preload):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, tuple(preload)), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout):
+            raise SolverCrashed("Solver worker did not start in time")
+        self.conn.recv()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(1)
+        except (OSError, ValueError, AssertionError):
+            pass
+        self.conn.close()
+
+
+class SolverPool:
+    """Run picklable module-level functions in recycled worker processes.
+
+    ``call`` blocks for at most ``timeout`` seconds waiting for a free worker
+    and at most ``timeout`` seconds for the result; ``timeout <= 0`` waits
+    forever.
+    """
+
+    def __init__(self, max_workers=2, timeout=10.0, max_tasks=200, max_rss_mb=512,
+                 preload=(), start_method=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.preload = tuple(preload)
+        self.start_method = start_method
+        self.completed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self._ctx = None
+        self._size = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        # Signalled whenever a worker goes idle or a slot frees up
+        self._available = threading.Condition(self._lock)
+        atexit.register(self.shutdown)
+
+    def _context(self):
+        if self._ctx is None:
+            method = self.start_method
+            if not method:
+                # forkserver keeps forks cheap without forking a threaded server
+                methods = multiprocessing.get_all_start_methods()
+                method = 'forkserver' if 'forkserver' in methods else 'spawn'
+            self._ctx = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                self._ctx.set_forkserver_preload(list(self.preload))
+        return self._ctx
+
+    def _start_worker(self):
+        worker = _Worker(self._context(), self.preload)
+        try:
+            worker.wait_ready(WORKER_STARTUP_TIMEOUT)
+        except BaseException:
+            worker.kill()
+            raise
+        return worker
+
+    def _acquire(self, wait):
+        deadline = None if wait is None else time.monotonic() + wait
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_workers:
+                    # A retired or killed worker left a free slot; fill it
+                    self._size += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise SolverBusy("All solver workers are busy, please try again")
+                self._available.wait(remaining)
+        try:
+            return self._start_worker()
+        except BaseException:
+            with self._available:
+                self._size -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, worker):
+        with self._available:
+            self._idle.append(worker)
+            self._available.notify()
+
+    def _discard(self, worker, graceful=False):
+        if graceful:
+            worker.stop()
+        else:
+            worker.kill()
+        with self._available:
+            self._size -= 1
+            self._available.notify()
+
+    def _submit(self, func, args, kwargs, wait):
+        worker = self._acquire(wait)
+        try:
+            worker.conn.send((func, args, kwargs))
+        except OSError as exc:
+            self._discard(worker)
+            self.crashes += 1
+            raise SolverCrashed("Solver worker exited unexpectedly") from exc
+        except BaseException:
+            self._release(worker)
+            raise
+        return worker
+
+    def _receive(self, worker, wait, budget):
+        """Next message from ``worker``; discards it on timeout or crash."""
+        try:
+            if not worker.conn.poll(wait):
+                self._discard(worker)
+                self.timeouts += 1
+                raise SolverTimeout(
+                    f"Too complex: no result after {budget:g} seconds. Try a simpler problem."
+                )
+            return worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            self._discard(worker)
+            self.crashes += 1
+            raise SolverCrashed("Solver worker exited unexpectedly") from exc
+
+    def _finish(self, worker, rss):
+        """Recycle or release ``worker`` after a completed call."""
+        self.completed += 1
+        worker.tasks += 1
+        over_memory = rss is not None and self.max_rss_mb > 0 and rss > self.max_rss_mb * 1024 * 1024
+        if (self.max_tasks > 0 and worker.tasks >= self.max_tasks) or over_memory:
+            self._discard(worker, graceful=True)
+            self.recycled += 1
+        else:
+            self._release(worker)
+
+    def call(self, func, *args, timeout=None, **kwargs):
+        """Run ``func(*args, **kwargs)`` in a worker and return its result.
+
+        Exceptions raised by ``func`` are re-raised here.  Raises
+        ``SolverTimeout`` when the budget runs out (the worker is killed),
+        ``SolverBusy`` when no worker frees up in time and ``SolverCrashed``
+        when the worker dies.
+        """
+        if self.max_workers <= 0:
+            return func(*args, **kwargs)
+
+        budget = self.timeout if timeout is None else timeout
+        wait = budget if budget > 0 else None
+        worker = self._submit(func, args, kwargs, wait)
+        status, payload, rss = self._receive(worker, wait, budget)
+        self._finish(worker, rss)
+
+        if status == 'error':
+            raise payload
+        return payload
+
+    def stream(self, func, *args, timeout=None, **kwargs):
+        """Run the generator function ``func`` in a worker, yielding its items.
+
+        Items arrive as soon as the worker produces them.  The budget covers
+        the whole stream, and the errors are the same as for ``call``.  If the
+        consumer stops early the worker is killed, since it may still be
+        producing items nobody will read.
+        """
+        if self.max_workers <= 0:
+            yield from func(*args, **kwargs)
+            return
+
+        budget = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + budget if budget > 0 else None
+        worker = self._submit(func, args, kwargs, budget if budget > 0 else None)
+        try:
+            while True:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    status, payload, rss = self._receive(worker, wait, budget)
+                except SolverError:
+                    worker = None
+                    raise
+                if status != 'item':
+                    break
+                yield payload
+        finally:
+            if worker is not None and status == 'item':
+                # Abandoned mid-stream
+                self._discard(worker)
+        self._finish(worker, rss)
+
+        if status == 'error':
+            raise payload
+
+    def shutdown(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._discard(worker, graceful=True)
+
+    def stats(self):
+        with self._lock:
+            workers, idle = self._size, len(self._idle)
+        return {
+            'workers': workers,
+            'idle': idle,
+            'max_workers': self.max_workers,
+            'timeout_seconds': self.timeout,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'crashes': self.crashes,
+            'recycled': self.recycled,
+        }
+
+
+def error_response(exc):
+    """(payload, HTTP status) for a ``SolverError`` raised by ``SolverPool.call``."""
+    if isinstance(exc, (SolverTimeout, SolverRejected)):
+        return {'success': False, 'error': str(exc), 'too_complex': True}, 422
+    if isinstance(exc, SolverBusy):
+        return {'success': False, 'error': str(exc)}, 503
+    return {'success': False, 'error': str(exc)}, 500
@@ -0,0 +1,94 @@
+"""Boot-time warm-up for the solver servers.
+
+SymPy loads its parser, polys and printing machinery lazily, so the first
+request after a restart pays for all of it.  ``Warmup`` runs a list of known
+inputs (the lesson equations and the functions used by the integration
+scripts, see ``warmup_equations.json``) through the normal cached endpoints
+in a background thread.  That fills the solution cache and store and warms
+every pool worker before the health check reports ready.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_warmup_items(path, section):
+    """Return the ``section`` list from the warm-up file, or [] if unreadable."""
+    if not path:
+        return []
+    try:
+        with open(path, encoding='utf-8') as fh:
+            items = json.load(fh).get(section, [])
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Warning: could not read warm-up list {path}: {e}")
+        return []
+    return [item for item in items if isinstance(item, str) and item.strip()]
+
+
+class Warmup:
+    """Run ``run(item)`` for every item on a background thread.
+
+    ``workers`` items run at a time, normally one per pool worker so that
+    each worker process gets warmed.  Failures are counted, not raised.
+    """
+
+    def __init__(self, items, run, workers=1):
+        self.items = list(items)
+        self.run = run
+        self.workers = max(1, workers)
+        self.done = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not self.items:
+            self._finished.set()
+
+    @property
+    def ready(self):
+        return self._finished.is_set()
+
+    def start(self):
+        if self.started_at is not None or not self.items:
+            return self
+        self.started_at = time.monotonic()
+        threading.Thread(target=self._run_all, name='solver-warmup', daemon=True).start()
+        return self
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def _run_one(self, item):
+        try:
+            self.run(item)
+            failed = False
+        except Exception:
+            failed = True
+        with self._lock:
+            self.done += 1
+            self.failed += failed
+
+    def _run_all(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(self._run_one, self.items))
+        finally:
+            self.finished_at = time.monotonic()
+            self._finished.set()
+
+    def stats(self):
+        with self._lock:
+            done, failed = self.done, self.failed
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {
+            'ready': self.ready,
+            'total': len(self.items),
+            'done': done,
+            'failed': failed,
+            'elapsed_seconds': elapsed,
+        }
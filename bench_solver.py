@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rational-equation solvers.
+
+Builds a fixed corpus of equations tagged by category and times every solve
+stage separately for each engine module:
+
+    validate      the module's own validate_rational_equation
+    denominators  parsing, denominators, excluded values and the LCD
+    clear         multiplying through by the LCD
+    solve         roots of the cleared polynomial
+    verify        checking each root against the original equation
+    render        the text (and LaTeX) the module's entry points return
+
+The lesson equations the servers pre-solve at boot (api/warmup_equations.json)
+are timed as well, as the ``lesson`` category, unless --no-lessons is given.
+
+Timings are the median over --repeat runs, in milliseconds.  The report is
+JSON so two commits can be compared with --baseline (or plain diff):
+
+    python bench_solver.py --output bench.json
+    python bench_solver.py --baseline bench.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'api'))
+
+import sympy as sp
+
+from cortex_core import engine as rational_engine
+from warmup import load_warmup_items
+
+TIMED_STAGES = ('validate', 'denominators', 'clear', 'solve', 'verify', 'render')
+# Engine stage -> benchmark stage; 'answer' only assembles what is already there
+ENGINE_STAGES = {
+    'denominators': 'denominators',
+    'cleared': 'clear',
+    'roots': 'solve',
+    'verification': 'verify',
+}
+
+CATEGORIES = (
+    'linear',
+    'quadratic_factorable',
+    'quadratic_irrational',
+    'extraneous',
+    'no_denominator',
+    'high_degree',
+)
+
+# Module name -> the renderers behind its public entry points
+ENGINES = {
+    'FINAL_SOLVING_CALCULATOR': (rational_engine.render_teacher,),
+    'step': (rational_engine.render_teacher,),
+    'olol_hahahaa': (rational_engine.render_concise, rational_engine.render_latex,
+                     rational_engine.render_teacher),
+}
+
+
+def _shift(p):
+    """``x - p`` written the way a student would type it."""
+    return f"x{-p:+d}" if p else "x"
+
+
+def _nonzero(rng, low, high):
+    value = 0
+    while value == 0:
+        value = rng.randint(low, high)
+    return value
+
+
+def _linear(rng):
+    a, b, c = _nonzero(rng, -9, 9), rng.randint(-6, 6), _nonzero(rng, -9, 9)
+    if rng.random() < 0.5:
+        return f"{a}/({_shift(b)}) = {c}"
+    d = rng.randint(-6, 6)
+    while d == b or a == c:
+        d, c = rng.randint(-6, 6), _nonzero(rng, -9, 9)
+    return f"{a}/({_shift(b)}) = {c}/({_shift(d)})"
+
+
+def _quadratic_factorable(rng):
+    # x + c/(x-p) = d clears to (x - r1)(x - r2) = 0
+    while True:
+        r1, r2, p = rng.randint(-8, 8), rng.randint(-8, 8), rng.randint(-6, 6)
+        d = r1 + r2 - p
+        c = r1 * r2 - d * p
+        if r1 != r2 and p not in (r1, r2) and c:
+            return f"x + {c}/({_shift(p)}) = {d}"
+
+
+def _quadratic_irrational(rng):
+    while True:
+        p, c, d = rng.randint(-6, 6), _nonzero(rng, -12, 12), rng.randint(-6, 6)
+        # x(x - p) + c = d(x - p)
+        b, k = -(p + d), c + d * p
+        disc = b * b - 4 * k
+        if disc > 0 and sp.sqrt(disc).is_Rational is False:
+            return f"x + {c}/({_shift(p)}) = {d}"
+
+
+def _extraneous(rng):
+    # x^2 - q x - p^2 + q p = (x - p)(x + p - q): p is excluded
+    p, q = _nonzero(rng, -6, 6), rng.randint(-6, 6)
+    while q == 2 * p:
+        q = rng.randint(-6, 6)
+    if rng.random() < 0.5:
+        return f"x^2/({_shift(p)}) = ({q}x + {p * p - q * p})/({_shift(p)})"
+    # 1/(x-p) + 1/(x+p) = 2p/(x^2-p^2) clears to x = p: no valid root
+    return f"1/({_shift(p)}) + 1/({_shift(-p)}) = {2 * p}/(x^2 - {p * p})"
+
+
+def _no_denominator(rng):
+    a, b, c = _nonzero(rng, -9, 9), rng.randint(-9, 9), rng.randint(-9, 9)
+    if rng.random() < 0.5:
+        return f"{a}x + {b} = {c}"
+    return f"x^2 + {b}x = {c}"
+
+
+def _high_degree(rng):
+    n, p = rng.randint(3, 6), rng.randint(-4, 4)
+    a, b = _nonzero(rng, -9, 9), rng.randint(-5, 5)
+    return f"x^{n}/({_shift(p)}) = {a}/({_shift(p)}) + {b}"
+
+
+GENERATORS = {
+    'linear': _linear,
+    'quadratic_factorable': _quadratic_factorable,
+    'quadratic_irrational': _quadratic_irrational,
+    'extraneous': _extraneous,
+    'no_denominator': _no_denominator,
+    'high_degree': _high_degree,
+}
+
+
+def build_corpus(per_category=60, seed=2024):
+    """Return ``[{'equation', 'category'}, ...]``, the same for a given seed."""
+    rng = random.Random(seed)
+    corpus = []
+    for category in CATEGORIES:
+        seen = set()
+        attempts = 0
+        while len(seen) < per_category and attempts < per_category * 50:
+            attempts += 1
+            equation = GENERATORS[category](rng).replace('+ -', '- ')
+            if equation not in seen:
+                seen.add(equation)
+                corpus.append({'equation': equation, 'category': category})
+    return corpus
+
+
+WARMUP_FILE = os.path.join(ROOT, 'api', 'warmup_equations.json')
+
+
+def lesson_corpus(path=WARMUP_FILE):
+    """The lesson equations the servers warm up with, tagged ``lesson``."""
+    return [{'equation': equation, 'category': 'lesson'} for equation in load_warmup_items(path, 'equations')]
+
+
+def time_equation(module, renderers, equation):
+    """One timed run: ``({stage: ms}, outcome)``.
+
+    Stages after an error are left out; the outcome records the error or
+    the valid and extraneous roots, so a diff also catches answer changes.
+    """
+    timings = {}
+    start = time.perf_counter()
+    module.validate_rational_equation(equation)
+    timings['validate'] = (time.perf_counter() - start) * 1000
+
+    solution = None
+    try:
+        start = time.perf_counter()
+        for stage, solution in rational_engine.iter_rational_solution(equation):
+            now = time.perf_counter()
+            if stage in ENGINE_STAGES:
+                timings[ENGINE_STAGES[stage]] = (now - start) * 1000
+            start = now
+        start = time.perf_counter()
+        for render in renderers:
+            render(solution)
+        timings['render'] = (time.perf_counter() - start) * 1000
+    except ValueError as exc:
+        return timings, {'error': str(exc)}
+    return timings, {
+        'valid': [sp.sstr(sol) for sol in solution.valid_solutions],
+        'extraneous': [sp.sstr(sol) for sol in solution.extraneous_solutions],
+    }
+
+
+def run(corpus, engines=None, repeat=3):
+    results = []
+    for name in engines or ENGINES:
+        module = importlib.import_module(name)
+        renderers = ENGINES[name]
+        for item in corpus:
+            runs = []
+            for _ in range(repeat):
+                timings, outcome = time_equation(module, renderers, item['equation'])
+                runs.append(timings)
+            stages = {stage: round(statistics.median(run[stage] for run in runs), 4)
+                      for stage in TIMED_STAGES if stage in runs[0]}
+            results.append({
+                'engine': name,
+                'category': item['category'],
+                'equation': item['equation'],
+                'stages_ms': stages,
+                'total_ms': round(sum(stages.values()), 4),
+                'outcome': outcome,
+            })
+    return results
+
+
+def summarize(results):
+    """Median stage times per engine and category."""
+    groups = {}
+    for row in results:
+        groups.setdefault(row['engine'], {}).setdefault(row['category'], []).append(row)
+    summary = {}
+    for engine, categories in groups.items():
+        summary[engine] = {}
+        for category, rows in categories.items():
+            entry = {'count': len(rows), 'errors': sum('error' in row['outcome'] for row in rows)}
+            for stage in TIMED_STAGES + ('total',):
+                key = 'total_ms' if stage == 'total' else stage
+                values = [row[key] if stage == 'total' else row['stages_ms'].get(stage)
+                          for row in rows]
+                values = [value for value in values if value is not None]
+                if values:
+                    entry[f'{stage}_ms'] = round(statistics.median(values), 4)
+            summary[engine][category] = entry
+    return summary
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(report, baseline):
+    """Print the change in median total per engine and category, and answer changes."""
+    print(f"{'engine':<26} {'category':<22} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for engine, categories in report['summary'].items():
+        for category, entry in categories.items():
+            before = baseline.get('summary', {}).get(engine, {}).get(category, {}).get('total_ms')
+            after = entry.get('total_ms')
+            if before and after:
+                print(f"{engine:<26} {category:<22} {before:>10.3f} {after:>10.3f} {after / before - 1:>+8.1%}")
+    outcomes = {(row['engine'], row['equation']): row['outcome'] for row in baseline.get('results', [])}
+    changed = [row for row in report['results']
+               if (row['engine'], row['equation']) in outcomes
+               and outcomes[row['engine'], row['equation']] != row['outcome']]
+    for row in changed:
+        print(f"answer changed [{row['engine']}] {row['equation']}: "
+              f"{outcomes[row['engine'], row['equation']]} -> {row['outcome']}")
+    print(f"{len(changed)} answer change(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--per-category', type=int, default=60, help='equations per category (default 60)')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per equation; the median is kept')
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES),
+                        help='engine module to time (repeatable, default all)')
+    parser.add_argument('--no-lessons', action='store_true', help='leave out the warm-up lesson equations')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='JSON report from an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.per_category, args.seed)
+    if not args.no_lessons:
+        corpus += lesson_corpus()
+    # Warm SymPy's caches and imports so the first equation is not an outlier
+    run(corpus[:5], args.engine, repeat=1)
+    results = run(corpus, args.engine, args.repeat)
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'sympy': sp.__version__,
+            'seed': args.seed,
+            'per_category': args.per_category,
+            'repeat': args.repeat,
+            'equations': len(corpus),
+        },
+        'summary': summarize(results),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            compare(report, json.load(fh))
+    elif not args.output:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
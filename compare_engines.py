@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Differential check of the rational-equation solver modules.
+
+Runs every equation of a curated list plus the seeded bench_solver corpus
+through each module's own pipeline and compares what they conclude with
+the reference (cortex_core, the shared engine the servers use):
+
+    validation   the module's validate_rational_equation verdict
+    excluded     values that zero a denominator
+    valid        accepted solutions
+    extraneous   candidate roots the module rejected
+
+The other modules now re-export cortex_core, so they are loaded as they
+were before the consolidation: their source is read from a git revision
+(``--baseline``, by default the first commit) and run in isolation.
+olol_hahahaa is compared through compute_rational_solution_data;
+FINAL_SOLVING_CALCULATOR, step and solving_real_copy only return text, so
+their legacy stepwise_rational_solution is run once more with its local
+variables captured when it returns.  An exception, or a call that runs
+past ``--time-limit`` (the old modules can spend minutes simplifying
+CRootOf roots), counts as an engine error, not a divergence, and that
+equation is left out of the module's timings.  Values are compared numerically, so 1/2 and
+0.5 or differently arranged surds agree.
+
+Each module's median time and peak traced memory per equation are listed
+in the same table as the divergence counts:
+
+    python compare_engines.py
+    python compare_engines.py --json report.json --show 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.append(os.path.join(ROOT, 'api'))
+
+import sympy as sp
+
+from bench_solver import build_corpus
+from cortex_core.calculator import insert_multiplication_signs, validate_rational_equation
+from cortex_core.engine import solve_rational_equation
+
+REFERENCE = 'cortex_core'
+FIELDS = ('validation', 'excluded', 'valid', 'extraneous')
+# Pre-consolidation modules and where they lived
+BASELINE_MODULES = {
+    'olol_hahahaa': 'olol_hahahaa.py',
+    'FINAL_SOLVING_CALCULATOR': 'api/FINAL_SOLVING_CALCULATOR.py',
+    'step': 'step.py',
+    'solving_real_copy': 'solving_real_copy.py',
+}
+
+CURATED = [
+    "x/(x+2) = 3",
+    "(x+2)/(x-1) = 3/(x-1)",
+    "x/(x-2) + 3/(x+2) = 8/(x^2-4)",
+    "1/(x-3) + 2/(x+3) = 6/(x^2-9)",
+    "x^2/(x-2) = 4/(x-2)",
+    "(x^2+5x+6)/(x+2) = x+3",
+    "1/(x-1) = x",
+    "2/(x+1) = x",
+    "1/(x^2-2) = 1",
+    "x/(x^2-5) = 1/(x^2-5) + x",
+    "1/(x-1) = 1/(x-1) + 1",
+    "x/(x-1) = 1/(x-1) + 1",
+    "x^3/(x-1) = 1/(x-1) + 2",
+    "x^5 = 1/(x-1)",
+    "5/(2x-3) = 4/(x+7)",
+    "1/x + 1/(x+1) = 1",
+    "(x-1)/(x+2) = 1/2",
+    "3x + 2 = 11",
+    "x^2 - 5x + 6 = 0",
+    "sin(x)/(x-1) = 2",
+]
+
+
+class _Result:
+    def __init__(self, validation, excluded=(), valid=(), extraneous=(), error=None):
+        self.validation = validation
+        self.excluded = list(excluded)
+        self.valid = list(valid)
+        self.extraneous = list(extraneous)
+        self.error = error
+
+    def as_dict(self):
+        data = {'validation': self.validation}
+        for field in ('excluded', 'valid', 'extraneous'):
+            data[field] = [sp.sstr(value) for value in getattr(self, field)]
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class Engine:
+    """One module under test.
+
+    ``run`` is the module's plain pipeline, used for the timings; ``result``
+    returns what it concluded as a ``_Result`` and may do extra work to get
+    at it.  Either may raise.
+    """
+
+    def __init__(self, run, result):
+        self.run = run
+        self.result = result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(('git',) + args, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError) as exc:
+        detail = getattr(exc, 'stderr', '') or exc
+        raise SystemExit(f"compare_engines: git {' '.join(args)} failed: {detail}".strip())
+
+
+def default_baseline():
+    """The repository's first commit, from before the solvers shared cortex_core."""
+    return _git('rev-list', '--max-parents=0', 'HEAD').split()[-1]
+
+
+def load_baseline_module(name, revision):
+    """Import ``name`` as it was at ``revision``, without touching ``sys.modules``."""
+    path = BASELINE_MODULES[name]
+    module = types.ModuleType(f"{name}@{revision[:7]}")
+    module.__file__ = f"{revision[:7]}:{path}"
+    exec(compile(_git('show', f"{revision}:{path}"), module.__file__, 'exec'), module.__dict__)
+    return module
+
+
+def _locals_at_return(func, *args):
+    """Call ``func`` and return its local variables as they were when it returned."""
+    captured = {}
+
+    def profile(frame, event, arg):
+        if event == 'return' and frame.f_code is func.__code__:
+            captured.update(frame.f_locals)
+
+    previous = sys.getprofile()
+    sys.setprofile(profile)
+    try:
+        func(*args)
+    finally:
+        sys.setprofile(previous)
+    return captured
+
+
+def _legacy(module):
+    def run(equation):
+        if module.validate_rational_equation(equation)[0]:
+            # The legacy solvers print their working as they go
+            with contextlib.redirect_stdout(io.StringIO()):
+                module.stepwise_rational_solution(equation)
+
+    def result(equation):
+        is_valid, message = module.validate_rational_equation(equation)
+        if not is_valid:
+            return _Result(False, error=message)
+        with contextlib.redirect_stdout(io.StringIO()):
+            found = _locals_at_return(module.stepwise_rational_solution, equation)
+        valid = found['valid_solutions']
+        # Candidates that zeroed a denominator are in neither of its lists
+        extraneous = [sol for sol in found['sols'] if sol not in valid]
+        return _Result(True, found['excluded_values'], valid, extraneous)
+    return Engine(run, result)
+
+
+def _structured(validate, solve):
+    def run(equation):
+        if validate(equation)[0]:
+            solve(equation)
+
+    def result(equation):
+        is_valid, message = validate(equation)
+        if not is_valid:
+            return _Result(False, error=message)
+        data = solve(equation)
+        return _Result(True, data['excluded_values'], data['valid_solutions'], data['extraneous_solutions'])
+    return Engine(run, result)
+
+
+def _reference():
+    return _structured(validate_rational_equation, lambda equation: solve_rational_equation(equation).as_dict())
+
+
+def load_engines(names=None, revision=None):
+    """The reference plus the baseline modules in ``names`` (default all)."""
+    revision = revision or default_baseline()
+    engines = {REFERENCE: _reference()}
+    for name in names or BASELINE_MODULES:
+        if name == REFERENCE:
+            continue
+        module = load_baseline_module(name, revision)
+        if name == 'olol_hahahaa':
+            engines[name] = _structured(module.validate_rational_equation, module.compute_rational_solution_data)
+        else:
+            engines[name] = _legacy(module)
+    return engines
+
+
+def _key(value):
+    """Numeric identity of a root, stable across equivalent exact forms."""
+    number = complex(sp.N(value, 30))
+    return (round(number.real, 9) + 0.0, round(number.imag, 9) + 0.0)
+
+
+def _same(field, result, reference):
+    if result.validation is None or reference.validation is None:
+        # An engine error is counted as such, not as a divergence
+        return True
+    if field == 'validation':
+        return result.validation == reference.validation
+    if not (result.validation and reference.validation):
+        return True
+    try:
+        return (sorted(set(map(_key, getattr(result, field))))
+                == sorted(set(map(_key, getattr(reference, field)))))
+    except (TypeError, ValueError):
+        return False
+
+
+class EngineTimeout(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def _time_limit(seconds):
+    """Raise ``EngineTimeout`` in the block after ``seconds`` (0: no limit)."""
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise EngineTimeout(f"no result after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _result(engine, equation, time_limit=0):
+    try:
+        with _time_limit(time_limit):
+            return engine.result(equation)
+    except Exception as exc:
+        return _Result(None, error=f"{type(exc).__name__}: {exc}")
+
+
+def _time_ms(engine, equation):
+    start = time.perf_counter()
+    try:
+        engine.run(equation)
+    except Exception:
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+def _peak_kib(engine, equation):
+    tracemalloc.start()
+    try:
+        _time_ms(engine, equation)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def compare(equations, engines, repeat=3, memory=True, time_limit=0):
+    """Run ``equations`` through ``engines``; returns ``(rows, summary)``.
+
+    ``time_limit`` bounds each engine's ``result`` call, in seconds.
+    """
+    rows = []
+    times = {name: [] for name in engines}
+    peaks = {name: [] for name in engines}
+    for equation in equations:
+        prepared = insert_multiplication_signs(equation)
+        results = {}
+        for name, engine in engines.items():
+            results[name] = _result(engine, prepared, time_limit)
+            if results[name].error:
+                continue
+            times[name].append(statistics.median(_time_ms(engine, prepared) for _ in range(repeat)))
+            if memory:
+                peaks[name].append(_peak_kib(engine, prepared))
+        reference = results.get(REFERENCE)
+        row = {'equation': equation, 'results': {name: r.as_dict() for name, r in results.items()}}
+        if reference is not None:
+            row['divergences'] = {
+                name: [field for field in FIELDS if not _same(field, result, reference)]
+                for name, result in results.items() if name != REFERENCE
+            }
+        rows.append(row)
+
+    summary = {}
+    for name in engines:
+        diverged = [row for row in rows if row.get('divergences', {}).get(name)]
+        ordered = sorted(times[name])
+        summary[name] = {
+            'equations': len(rows),
+            'errors': sum('error' in row['results'][name] for row in rows),
+            'diverged': len(diverged),
+            'by_field': {field: sum(field in row['divergences'][name] for row in diverged) for field in FIELDS},
+            'median_ms': round(statistics.median(ordered), 3) if ordered else None,
+            'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))], 3) if ordered else None,
+            'peak_kib': round(max(peaks[name]), 1) if peaks[name] else None,
+        }
+    return rows, summary
+
+
+def print_table(rows, summary, show=10):
+    reference_ms = summary.get(REFERENCE, {}).get('median_ms')
+    print(f"{'engine':<26} {'eqs':>5} {'diverged':>9} {'validation':>10} {'excluded':>9} {'valid':>6} "
+          f"{'extran.':>8} {'errors':>7} {'median ms':>10} {'p95 ms':>8} {'vs ref':>7} {'peak KiB':>9}")
+    for name, entry in summary.items():
+        by_field = entry['by_field']
+        ratio = (f"{entry['median_ms'] / reference_ms:>6.1f}x"
+                 if reference_ms and entry['median_ms'] is not None else f"{'-':>7}")
+        peak = f"{entry['peak_kib']:>9.1f}" if entry['peak_kib'] is not None else f"{'-':>9}"
+        median, p95 = ((f"{entry['median_ms']:>10.3f}", f"{entry['p95_ms']:>8.3f}")
+                       if entry['median_ms'] is not None else (f"{'-':>10}", f"{'-':>8}"))
+        print(f"{name:<26} {entry['equations']:>5} {entry['diverged']:>9} {by_field['validation']:>10} "
+              f"{by_field['excluded']:>9} {by_field['valid']:>6} {by_field['extraneous']:>8} "
+              f"{entry['errors']:>7} {median} {p95} {ratio} {peak}")
+
+    divergent = [row for row in rows if any(row.get('divergences', {}).values())]
+    for row in divergent[:show]:
+        reference = row['results'][REFERENCE]
+        print(f"\n{row['equation']}")
+        fields = [field for field in FIELDS
+                  if any(field in diverged for diverged in row['divergences'].values())]
+        for field in fields:
+            print(f"    {field:<11} {REFERENCE:<26} {reference.get(field)}")
+            for name, diverged in row['divergences'].items():
+                if field in diverged:
+                    result = row['results'][name]
+                    print(f"    {'':<11} {name:<26} {result.get('error') or result.get(field)}")
+    if len(divergent) > show:
+        print(f"\n... {len(divergent) - show} more divergent equation(s); see --json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--per-category', type=int, default=10,
+                        help='randomized equations per bench_solver category (default 10)')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per equation; the median is kept')
+    parser.add_argument('--engine', action='append', choices=tuple(BASELINE_MODULES),
+                        help='baseline module to run (repeatable, default all; the reference is always included)')
+    parser.add_argument('--baseline', help='git revision to load the other modules from (default: the first commit)')
+    parser.add_argument('--time-limit', type=float, default=20.0,
+                        help='seconds a module may spend on one equation before it counts as an error '
+                             '(default 20, 0 for none)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--show', type=int, default=10, help='divergent equations to print (default 10)')
+    parser.add_argument('--json', help='also write the full report here')
+    args = parser.parse_args(argv)
+
+    equations = CURATED + [item['equation'] for item in build_corpus(args.per_category, args.seed)]
+    engines = load_engines(args.engine, args.baseline)
+    rows, summary = compare(equations, engines, args.repeat, memory=not args.no_memory,
+                            time_limit=args.time_limit)
+    print_table(rows, summary, args.show)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump({'summary': summary, 'rows': rows}, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""The rational-equation solver core shared by every backend and tool.
+
+    parser      restricted equation parser (no ``sympify``/``eval``)
+    kernel      exact Fraction polynomial arithmetic and root finding
+    engine      single-pass solver and the teacher/concise/LaTeX renderers
+    calculator  the calculator-level functions the front ends expose
+
+Importing the package loads nothing; import the submodule you need.  Only
+SymPy is required up front; numpy is loaded the first time a cubic or
+higher factor needs numeric roots.
+"""
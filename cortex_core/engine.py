@@ -0,0 +1,1129 @@
+"""Single-pass rational equation solver shared by every output renderer.
+
+``solve_rational_equation`` parses and validates the equation, then computes
+the denominators, LCD, cleared polynomial, roots, extraneous roots and
+verification exactly once into a :class:`RationalSolution`.  The teacher-voice,
+concise and LaTeX renderers are plain formatters over that object, so a caller
+that only needs the concise form never pays for the teacher text.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields, replace
+from fractions import Fraction
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import sympy as sp
+from sympy.core.function import AppliedUndef
+
+from . import kernel
+from .parser import UnsupportedFunctionError, UnsupportedNameError, parse_expression
+
+X = sp.Symbol('x')
+
+# Stages yielded by iter_rational_solution, in order
+STAGES = ('denominators', 'cleared', 'roots', 'verification', 'answer')
+
+_FORBIDDEN_FUNCTIONS = (sp.sin, sp.cos, sp.tan, sp.sqrt, sp.log, sp.exp)
+
+NON_POLYNOMIAL_MESSAGE = "Error: Not a rational equation (contains non-polynomial functions)."
+NOT_IN_X_MESSAGE = "Error: Not a rational equation (must be a fraction of polynomials in x)."
+
+
+@dataclass
+class SolutionCheck:
+    """Substitution of one candidate root back into the original equation."""
+
+    solution: sp.Expr
+    denominator_values: List[Tuple[sp.Expr, sp.Expr]]
+    lhs_eval: sp.Expr
+    rhs_eval: sp.Expr
+    lhs_value: sp.Expr
+    rhs_value: sp.Expr
+    makes_denominator_zero: bool
+    satisfies: bool
+
+
+@dataclass
+class RationalSolution:
+    equation: str
+    lhs: sp.Expr
+    rhs: sp.Expr
+    validation_message: str
+    symbol: sp.Symbol = X
+    denominators: List[sp.Expr] = field(default_factory=list)
+    excluded_values: List[sp.Expr] = field(default_factory=list)
+    lcd: sp.Expr = sp.Integer(1)
+    cleared_lhs: sp.Expr = sp.Integer(0)
+    cleared_rhs: sp.Expr = sp.Integer(0)
+    polynomial: sp.Expr = sp.Integer(0)
+    degree: int = 0
+    raw_solutions: List[sp.Expr] = field(default_factory=list)
+    valid_solutions: List[sp.Expr] = field(default_factory=list)
+    extraneous_solutions: List[sp.Expr] = field(default_factory=list)
+    checks: List[SolutionCheck] = field(default_factory=list)
+
+    @property
+    def verification(self) -> List[SolutionCheck]:
+        """Checks for the solutions that survive the denominator test."""
+        return [c for c in self.checks if not c.makes_denominator_zero]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Dictionary layout used by ``olol_hahahaa.compute_rational_solution_data``."""
+        return {
+            'lhs': self.lhs,
+            'rhs': self.rhs,
+            'symbol': self.symbol,
+            'denominators': list(self.denominators),
+            'excluded_values': list(self.excluded_values),
+            'lcd': self.lcd,
+            'cleared_lhs': self.cleared_lhs,
+            'cleared_rhs': self.cleared_rhs,
+            'polynomial': self.polynomial,
+            'raw_solutions': list(self.raw_solutions),
+            'valid_solutions': list(self.valid_solutions),
+            'extraneous_solutions': list(self.extraneous_solutions),
+            'verification': [
+                {
+                    'solution': c.solution,
+                    'lhs_expr': self.lhs,
+                    'rhs_expr': self.rhs,
+                    'lhs_eval': c.lhs_eval,
+                    'rhs_eval': c.rhs_eval,
+                    'lhs': c.lhs_value,
+                    'rhs': c.rhs_value,
+                    'satisfies': c.satisfies,
+                }
+                for c in self.verification
+            ],
+            'validation_message': self.validation_message,
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        """JSON-ready copy; every expression is kept as its ``srepr``."""
+        data = {f.name: _encode(getattr(self, f.name)) for f in fields(self) if f.name != 'checks'}
+        data['checks'] = [{f.name: _encode(getattr(c, f.name)) for f in fields(c)} for c in self.checks]
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'RationalSolution':
+        """Inverse of :meth:`to_json`; the expression trees come back unchanged."""
+        values = {name: _decode(value) for name, value in data.items() if name != 'checks'}
+        values['checks'] = [
+            SolutionCheck(**{name: _decode(value) for name, value in check.items()})
+            for check in data['checks']
+        ]
+        return cls(**values)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, sp.Basic):
+        return {'srepr': sp.srepr(value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        # srepr spells out every node, so nothing may be re-simplified on the way back
+        return sp.sympify(value['srepr'], evaluate=False)
+    if isinstance(value, list):
+        # The only nested lists are the (denominator, value) pairs
+        return [tuple(_decode(i) for i in item) if isinstance(item, list) else _decode(item)
+                for item in value]
+    return value
+
+
+def _contains_forbidden_functions(expr: sp.Expr) -> bool:
+    if expr.has(*_FORBIDDEN_FUNCTIONS):
+        return True
+    return any(isinstance(a, (sp.Function, AppliedUndef)) for a in expr.atoms(sp.Function))
+
+
+def _validate_sides(lhs: sp.Expr, rhs: sp.Expr) -> Tuple[bool, str]:
+    """Same verdicts and messages as ``validate_rational_equation``.
+
+    Both sides are already known to be ratios of polynomials once the first
+    loop passes, so ``cancel`` gives the canonical difference without the cost
+    of a general ``simplify``.
+    """
+    for expr in (lhs, rhs):
+        num, den = sp.together(expr).as_numer_denom()
+        if _contains_forbidden_functions(num) or _contains_forbidden_functions(den):
+            return False, NON_POLYNOMIAL_MESSAGE
+        if num.as_poly(X) is None or den.as_poly(X) is None:
+            return False, NOT_IN_X_MESSAGE
+        if den.equals(0):
+            return False, "Error: Denominator is identically zero."
+
+    difference = sp.cancel(sp.together(lhs - rhs))
+    if difference == 0:
+        return True, "This equation is always true (infinite solutions)."
+    if difference.is_Number:
+        return False, "This equation has no solution (contradiction)."
+
+    side_denominators = [sp.denom(sp.together(expr)) for expr in (lhs, rhs)]
+    if all(sp.degree(d, X) == 0 for d in side_denominators):
+        return True, "Valid rational equation (constant denominators)."
+    return True, "Valid rational equation (proceed with solving, check for extraneous solutions)."
+
+
+def extract_denominators(expr: sp.Expr) -> List[sp.Expr]:
+    """Return the distinct denominators of every term in ``expr``, as written.
+
+    A product in a denominator is split into its factors, but each factor
+    is kept as it appears: ``4/(x**2 - 4)`` gives ``x**2 - 4``, not its
+    factorisation, so a factor shared with another term is not listed twice.
+    """
+    found: List[sp.Expr] = []
+    for term in sp.Add.make_args(sp.sympify(expr)):
+        _, den = sp.fraction(sp.together(term))
+        for factor in sp.Mul.make_args(den):
+            if factor != 1 and factor not in found:
+                found.append(factor)
+    return found
+
+
+def _canonical(value: sp.Expr) -> sp.Expr:
+    """Hashable canonical form of a root, so equal roots compare equal.
+
+    Rationals, numeric roots and quadratic irrationals (rewritten exactly as
+    ``p + q*sqrt(d)``) need no simplification; only other radicals from the
+    general path pay for one ``simplify`` each.
+    """
+    if value.is_Rational or value.is_Float:
+        return value
+    try:
+        return kernel.evaluate_at_surd(X, value, X)
+    except kernel.KernelUnsupported:
+        return sp.simplify(value)
+
+
+def _unique(values: Iterable[sp.Expr]) -> List[sp.Expr]:
+    """Distinct ``values`` in first-seen order, compared by canonical form."""
+    seen = set()
+    unique = []
+    for value in values:
+        key = _canonical(value)
+        if key not in seen:
+            seen.add(key)
+            unique.append(value)
+    return unique
+
+
+def _evaluate(expr: sp.Expr, value: sp.Expr) -> Tuple[sp.Expr, sp.Expr, bool]:
+    """Substitute ``value`` for x: (raw substitution, simplified, is canonical).
+
+    The simplified value is canonical (equal values are identical) for
+    rational and quadratic-irrational roots; anything else goes through
+    ``simplify`` and may still need it when compared.
+    """
+    raw = expr.subs(X, value)
+    if raw.is_Rational:
+        return raw, raw, True
+    if value.is_Float:
+        return raw, raw.evalf(kernel.NUMERIC_DIGITS), False
+    try:
+        return raw, kernel.evaluate_at_surd(expr, value, X), True
+    except kernel.KernelUnsupported:
+        return raw, sp.simplify(raw), False
+
+
+def _rational_point(value: sp.Expr) -> Optional[Fraction]:
+    if value.is_Rational:
+        return Fraction(int(value.p), int(value.q))
+    return None
+
+
+def _exact_functions(result: RationalSolution) -> Optional[tuple]:
+    """Numerator/denominator polynomials for Horner checks, if the kernel takes them."""
+    try:
+        return (
+            kernel.to_rational_function(result.lhs, X),
+            kernel.to_rational_function(result.rhs, X),
+            [kernel.to_polynomial(den, X) for den in result.denominators],
+        )
+    except kernel.KernelUnsupported:
+        return None
+
+
+def _horner_check(result: RationalSolution, sol: sp.Expr, point: Fraction,
+                  functions: tuple) -> Optional[SolutionCheck]:
+    """Check a rational root with exact ``Fraction`` Horner evaluation.
+
+    Returns ``None`` when a denominator vanishes, so the SymPy substitution
+    can produce the same undefined values the step text has always shown.
+    """
+    (ln, ld), (rn, rd), den_polys = functions
+    denominator_values = []
+    for den, poly in zip(result.denominators, den_polys):
+        value = kernel.evaluate(poly, point)
+        if value == 0:
+            return None
+        denominator_values.append((den, kernel.to_sympy_rational(value)))
+    lhs_den, rhs_den = kernel.evaluate(ld, point), kernel.evaluate(rd, point)
+    if lhs_den == 0 or rhs_den == 0:
+        return None
+    lhs_value = kernel.to_sympy_rational(kernel.evaluate(ln, point) / lhs_den)
+    rhs_value = kernel.to_sympy_rational(kernel.evaluate(rn, point) / rhs_den)
+    return SolutionCheck(
+        solution=sol,
+        denominator_values=denominator_values,
+        lhs_eval=lhs_value,
+        rhs_eval=rhs_value,
+        lhs_value=lhs_value,
+        rhs_value=rhs_value,
+        makes_denominator_zero=False,
+        satisfies=lhs_value == rhs_value,
+    )
+
+
+def parse_equation(equation_str: str) -> Tuple[sp.Expr, sp.Expr]:
+    if "=" not in equation_str:
+        raise ValueError("Error: Not an equation. Missing '='.")
+    lhs_str, rhs_str = equation_str.split("=", 1)
+    try:
+        return parse_expression(lhs_str), parse_expression(rhs_str)
+    except UnsupportedFunctionError as exc:
+        # sin(x), log(x), ...: the parser has no other functions
+        raise ValueError(NON_POLYNOMIAL_MESSAGE) from exc
+    except UnsupportedNameError as exc:
+        # y, a, ...: the only variable is x
+        raise ValueError(NOT_IN_X_MESSAGE) from exc
+    except Exception as exc:
+        raise ValueError(f"Error: Invalid equation format. ({exc})") from exc
+
+
+def polynomial_roots(expr: sp.Expr, symbol: sp.Symbol = X) -> List[sp.Expr]:
+    """Distinct roots of a polynomial expression, ordered like ``sympy.solve``."""
+    try:
+        return kernel.solve_polynomial(kernel.to_polynomial(expr, symbol), symbol)
+    except kernel.KernelUnsupported:
+        return sp.solve(expr, symbol)
+
+
+def _denominators_exact(result: RationalSolution, functions: tuple) -> kernel.Poly:
+    """Fill in the excluded values and LCD exactly and return the LCD.
+
+    ``functions`` comes from :func:`_exact_functions`.  Raises
+    :class:`rational_kernel.KernelUnsupported` when an input falls outside
+    the kernel, before ``result`` has been modified.
+    """
+    den_polys = functions[2]
+    lcd = kernel.integer_lcm(den_polys)
+    excluded = [kernel.solve_polynomial(p, X) for p in den_polys]
+
+    result.excluded_values = _unique(sol for roots in excluded for sol in roots)
+    result.lcd = kernel.to_expr(lcd, X)
+    return lcd
+
+
+def _clear_exact(result: RationalSolution, lcd: kernel.Poly) -> kernel.Poly:
+    """Fill in the cleared sides and polynomial exactly.
+
+    Returns the cleared polynomial in kernel form for the root stage.
+    Raises :class:`rational_kernel.KernelUnsupported`, before ``result`` has
+    been modified, if the LCD leaves a remainder.
+    """
+    cleared_lhs = kernel.clear_denominators(result.lhs, lcd, X)
+    cleared_rhs = kernel.clear_denominators(result.rhs, lcd, X)
+    polynomial = kernel.sub(cleared_lhs, cleared_rhs)
+
+    result.cleared_lhs = kernel.to_expr(cleared_lhs, X)
+    result.cleared_rhs = kernel.to_expr(cleared_rhs, X)
+    result.polynomial = kernel.to_expr(polynomial, X)
+    result.degree = kernel.degree(polynomial) if polynomial else 0
+    return polynomial
+
+
+def _denominators_general(result: RationalSolution) -> None:
+    """SymPy fallback for inputs the exact kernel does not handle."""
+    result.excluded_values = _unique(sol for den in result.denominators for sol in sp.solve(den, X))
+
+    if result.denominators:
+        result.lcd = sp.lcm(result.denominators)
+
+
+def _clear_general(result: RationalSolution) -> None:
+    result.cleared_lhs = sp.expand(sp.cancel(result.lhs * result.lcd))
+    result.cleared_rhs = sp.expand(sp.cancel(result.rhs * result.lcd))
+    result.polynomial = sp.expand(result.cleared_lhs - result.cleared_rhs)
+    if result.polynomial != 0:
+        result.degree = sp.Poly(result.polynomial, X).degree()
+
+
+def _roots_general(result: RationalSolution) -> None:
+    if result.polynomial == 0:
+        return
+    poly = sp.Poly(result.polynomial, X)
+    if result.degree >= 3 and poly.free_symbols == {X}:
+        # Same bounded numeric treatment the exact kernel gives cubics and up
+        solutions = [r for r in poly.nroots(n=kernel.NUMERIC_DIGITS) if r.is_real]
+    else:
+        solutions = sp.solve(result.polynomial, X)
+    result.raw_solutions = _unique(solutions)
+
+
+def _run_general(stage: Callable[[RationalSolution], None], result: RationalSolution,
+                 valid: bool) -> None:
+    """Run a SymPy fallback stage; failures on an invalid equation report the verdict."""
+    try:
+        stage(result)
+    except Exception as exc:
+        if valid:
+            raise
+        raise ValueError(result.validation_message) from exc
+
+
+def _shares_root(den: sp.Expr, polynomial: sp.Expr, sol: sp.Float) -> bool:
+    """Whether the numeric root ``sol`` of ``polynomial`` is also a root of ``den``."""
+    common = sp.gcd(sp.Poly(den, X), sp.Poly(polynomial, X))
+    if common.degree() < 1:
+        return False
+    tolerance = max(1, abs(sol)) / 10 ** (kernel.NUMERIC_DIGITS // 2)
+    return any(abs(root - sol) <= tolerance for root in common.nroots(n=kernel.NUMERIC_DIGITS))
+
+
+def _substitution_check(result: RationalSolution, sol: sp.Expr) -> SolutionCheck:
+    """Check an irrational (or undefined) root by substitution."""
+    denominator_values = []
+    for den in result.denominators:
+        _, value, _ = _evaluate(den, sol)
+        denominator_values.append((den, value))
+    if sol.is_Float:
+        # A numeric root of an irreducible factor of the cleared
+        # polynomial.  It zeroes a denominator exactly when that factor
+        # divides the denominator too.  The exact kernel isolates the
+        # excluded values from the same factor, so they compare equal; the
+        # SymPy fallback gives them as radicals, so look for the factor.
+        zero_denominator = sol in result.excluded_values or any(
+            _shares_root(den, result.polynomial, sol) for den in result.denominators
+        )
+    else:
+        zero_denominator = any(value == 0 for _, value in denominator_values)
+
+    lhs_eval, lhs_value, lhs_exact = _evaluate(result.lhs, sol)
+    rhs_eval, rhs_value, rhs_exact = _evaluate(result.rhs, sol)
+    if zero_denominator:
+        satisfies = False
+    elif sol.is_Float:
+        satisfies = True
+    else:
+        difference = lhs_value - rhs_value
+        satisfies = difference == 0 or (
+            not (lhs_exact and rhs_exact) and sp.simplify(difference) == 0
+        )
+
+    return SolutionCheck(
+        solution=sol,
+        denominator_values=denominator_values,
+        lhs_eval=lhs_eval,
+        rhs_eval=rhs_eval,
+        lhs_value=lhs_value,
+        rhs_value=rhs_value,
+        makes_denominator_zero=zero_denominator,
+        satisfies=satisfies,
+    )
+
+
+def iter_rational_solution(equation_str: str,
+                           strict: bool = True) -> Iterator[Tuple[str, RationalSolution]]:
+    """Solve a rational equation in stages, yielding ``(stage, solution)``.
+
+    ``STAGES`` lists the stages in order.  The same :class:`RationalSolution`
+    is yielded every time, filled in up to the stage just finished, so a
+    caller can show the denominators while the roots are still being found.
+    Errors are raised as in :func:`solve_rational_equation`.
+    """
+    lhs, rhs = parse_equation(equation_str)
+    try:
+        try:
+            valid, message = kernel.classify_difference(lhs, rhs, X)
+        except kernel.KernelUnsupported:
+            valid, message = _validate_sides(lhs, rhs)
+    except Exception as exc:
+        raise ValueError(f"Error: Invalid equation format. ({exc})") from exc
+    if not valid and strict:
+        raise ValueError(message)
+
+    result = RationalSolution(equation=equation_str, lhs=lhs, rhs=rhs, validation_message=message)
+
+    denominators = extract_denominators(lhs)
+    for den in extract_denominators(rhs):
+        if den not in denominators:
+            denominators.append(den)
+    denominators.sort(key=sp.sstr)
+    result.denominators = denominators
+
+    functions = _exact_functions(result)
+    if functions is not None:
+        try:
+            lcd = _denominators_exact(result, functions)
+        except kernel.KernelUnsupported:
+            functions = None
+    if functions is None:
+        _run_general(_denominators_general, result, valid)
+    yield 'denominators', result
+
+    if functions is not None:
+        try:
+            polynomial = _clear_exact(result, lcd)
+        except kernel.KernelUnsupported:
+            # The exact LCD is still right; only the clearing falls back
+            functions = None
+    if functions is None:
+        _run_general(_clear_general, result, valid)
+    yield 'cleared', result
+
+    if functions is not None:
+        result.raw_solutions = kernel.solve_polynomial(polynomial, X) if polynomial else []
+    else:
+        _run_general(_roots_general, result, valid)
+    yield 'roots', result
+
+    for sol in result.raw_solutions:
+        point = _rational_point(sol) if functions else None
+        check = _horner_check(result, sol, point, functions) if point is not None else None
+        if check is None:
+            check = _substitution_check(result, sol)
+        result.checks.append(check)
+        if check.makes_denominator_zero:
+            result.extraneous_solutions.append(sol)
+        else:
+            result.valid_solutions.append(sol)
+    yield 'verification', result
+    yield 'answer', result
+
+
+def solve_rational_equation(equation_str: str, strict: bool = True) -> RationalSolution:
+    """Solve a rational equation in x, computing every intermediate once.
+
+    Raises ``ValueError`` with the validator's message when the input is not a
+    solvable rational equation.  With ``strict=False`` a negative verdict
+    (a contradiction, say) is kept in ``validation_message`` and the steps
+    are still worked out, which is what the teacher-voice text has always
+    shown; unparseable input still raises.
+    """
+    for _, result in iter_rational_solution(equation_str, strict):
+        pass
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Renderers
+# ---------------------------------------------------------------------------
+
+def format_fraction(num: sp.Expr, den: sp.Expr) -> str:
+    if den == 1:
+        return f"{sp.sstr(num)}"
+    return f"({sp.sstr(num)})/({sp.sstr(den)})"
+
+
+def render_concise(solution: RationalSolution) -> str:
+    """Concise, explanation-free textual solution."""
+    lines = []
+
+    lines.append("Step 1: Original equation")
+    lines.append(f"  {sp.sstr(solution.lhs)} = {sp.sstr(solution.rhs)}")
+
+    if solution.denominators:
+        lines.append("Step 2: Least common denominator")
+        lines.append(f"  LCD = {sp.sstr(solution.lcd)}")
+        lines.append("  After clearing denominators:")
+        lines.append(f"    {sp.sstr(solution.cleared_lhs)} = {sp.sstr(solution.cleared_rhs)}")
+    else:
+        lines.append("Step 2: No denominators to clear (LCD = 1)")
+
+    lines.append("Step 3: Polynomial form")
+    lines.append(f"  {sp.sstr(solution.polynomial)} = 0")
+
+    if solution.raw_solutions:
+        lines.append("Step 4: Solve for x")
+        for sol in solution.raw_solutions:
+            lines.append(f"  x = {sp.sstr(sol)}")
+    else:
+        lines.append("Step 4: No solutions returned by solver")
+
+    if solution.extraneous_solutions:
+        lines.append("Remove extraneous values")
+        for sol in solution.extraneous_solutions:
+            lines.append(f"  x = {sp.sstr(sol)} (excluded)")
+
+    if solution.excluded_values:
+        lines.append("Domain restrictions")
+        for val in solution.excluded_values:
+            lines.append(f"  x ≠ {sp.sstr(val)}")
+
+    lines.append("Step 5: Verify solutions")
+    if solution.verification:
+        # Each side is shown combined into one fraction, and its substituted
+        # value already simplified (the simplified value is exact)
+        lhs_expr = sp.simplify(solution.lhs)
+        rhs_expr = sp.simplify(solution.rhs)
+        for check in solution.verification:
+            lhs_dec = sp.N(check.lhs_value, 8)
+            rhs_dec = sp.N(check.rhs_value, 8)
+            lines.append(f"  Substitute x = {sp.sstr(check.solution)}")
+            lines.append(f"    Left side expression: {sp.sstr(lhs_expr)}")
+            lines.append(f"      → Substitute: {sp.sstr(check.lhs_value)}")
+            lines.append(f"      → Simplify: {sp.sstr(check.lhs_value)}")
+            if check.lhs_value != lhs_dec:
+                lines.append(f"      → ≈ {lhs_dec}")
+            lines.append(f"    Right side expression: {sp.sstr(rhs_expr)}")
+            lines.append(f"      → Substitute: {sp.sstr(check.rhs_value)}")
+            lines.append(f"      → Simplify: {sp.sstr(check.rhs_value)}")
+            if check.rhs_value != rhs_dec:
+                lines.append(f"      → ≈ {rhs_dec}")
+            lines.append(f"    Result: {'VALID ✅' if check.satisfies else 'INVALID ❌'}")
+    else:
+        lines.append("  No valid solutions to verify")
+
+    lines.append("Final solution")
+    if solution.valid_solutions:
+        for sol in solution.valid_solutions:
+            approx = sp.N(sol, 8)
+            if approx.is_real and approx != sol:
+                lines.append(f"  x = {sp.sstr(sol)}  (≈ {approx})")
+            else:
+                lines.append(f"  x = {sp.sstr(sol)}")
+    else:
+        lines.append("  No valid solution")
+
+    return '\n'.join(lines)
+
+
+def render_latex(solution: RationalSolution) -> str:
+    """LaTeX ``aligned`` block of the complete solving process."""
+    body_lines = []
+    body_lines.append(r"\text{Original equation: } " + sp.latex(solution.lhs) + " = " + sp.latex(solution.rhs))
+
+    if solution.denominators:
+        body_lines.append(r"\text{LCD: } " + sp.latex(solution.lcd))
+        body_lines.append(sp.latex(sp.Eq(solution.cleared_lhs, solution.cleared_rhs)))
+    else:
+        body_lines.append(r"\text{LCD: } 1")
+        body_lines.append(sp.latex(sp.Eq(solution.lhs, solution.rhs)))
+
+    body_lines.append(sp.latex(sp.Eq(solution.polynomial, 0)))
+
+    for sol in solution.raw_solutions:
+        body_lines.append(sp.latex(sp.Eq(solution.symbol, sol)))
+
+    if solution.extraneous_solutions:
+        extraneous = ", ".join(sp.latex(sol) for sol in solution.extraneous_solutions)
+        body_lines.append(r"\text{Extraneous: } x = " + extraneous)
+
+    if solution.excluded_values:
+        restrictions = ", ".join(sp.latex(val) for val in solution.excluded_values)
+        body_lines.append(r"\text{Restrictions: } x \ne " + restrictions)
+
+    if solution.verification:
+        # As in render_concise: combined sides, simplified substitutions
+        lhs_expr = sp.simplify(solution.lhs)
+        rhs_expr = sp.simplify(solution.rhs)
+        for check in solution.verification:
+            approx_lhs = sp.N(check.lhs_value, 8)
+            approx_rhs = sp.N(check.rhs_value, 8)
+            lhs_chain = r" \rightarrow ".join([
+                sp.latex(lhs_expr),
+                sp.latex(check.lhs_value),
+                sp.latex(check.lhs_value),
+            ])
+            rhs_chain = r" \rightarrow ".join([
+                sp.latex(rhs_expr),
+                sp.latex(check.rhs_value),
+                sp.latex(check.rhs_value),
+            ])
+            line = (
+                r"\text{Check } x = "
+                + sp.latex(check.solution)
+                + r"\!:"
+                + r"\quad \text{Left side: }"
+                + lhs_chain
+                + r"\quad \text{Right side: }"
+                + rhs_chain
+            )
+            if (approx_lhs != check.lhs_value) or (approx_rhs != check.rhs_value):
+                line += (
+                    r" \; (\approx "
+                    + sp.latex(approx_lhs)
+                    + r" = "
+                    + sp.latex(approx_rhs)
+                    + r")"
+                )
+            line += r" \quad " + (r"\text{VALID ✅}" if check.satisfies else r"\text{INVALID ❌}")
+            body_lines.append(line)
+    else:
+        body_lines.append(r"\text{Check: No valid solutions to verify}")
+
+    if solution.valid_solutions:
+        finals = ", ".join(sp.latex(sol) for sol in solution.valid_solutions)
+        line = r"\text{Final solution(s): } x = " + finals
+        approx_parts = []
+        for sol in solution.valid_solutions:
+            approx = sp.N(sol, 8)
+            if approx.is_real and approx != sol:
+                approx_parts.append(sp.latex(solution.symbol) + r" \approx " + sp.latex(approx))
+        if approx_parts:
+            line += r" \quad (" + "; ".join(approx_parts) + r")"
+        body_lines.append(line)
+    else:
+        body_lines.append(r"\text{Final solution(s): none}")
+
+    latex_body = r" \\ ".join(body_lines)
+    return r"\begin{aligned}" + latex_body + r"\end{aligned}"
+
+
+def _render_term_transforms(result: List[str], terms, lcd: sp.Expr, lcd_factored: sp.Expr, indent: str) -> None:
+    for term in terms:
+        num, den = sp.fraction(sp.together(term))
+        if den == 1:
+            # Constant term - just distribute
+            expanded = sp.expand(lcd * term)
+            result.append(f"{indent}{sp.sstr(lcd_factored)} * {sp.sstr(term)}")
+            result.append(f"{indent}  = {sp.sstr(expanded)}  # Distribute")
+        else:
+            # Fraction term - show proper cancellation
+            cancelled = sp.cancel(lcd * term)
+            result.append(f"{indent}{sp.sstr(lcd_factored)} * ({format_fraction(num, den)})")
+            result.append(f"{indent}  = {sp.sstr(lcd)} * {sp.sstr(num)} / {sp.sstr(den)}")
+            result.append(f"{indent}  = {sp.sstr(cancelled)}  # After cancellation")
+
+
+def _quadratic_formula_order(solution: RationalSolution, items: List[Any],
+                             value: Callable[[Any], sp.Expr] = lambda item: item) -> List[Any]:
+    """``items`` (roots or checks) ordered as the teacher text derives them.
+
+    For two quadratic roots the "+" branch of the quadratic formula is x₁, so
+    it is listed (and verified) first; everything else keeps solver order.
+    """
+    items = list(items)
+    if solution.degree != 2 or len(items) != 2:
+        return items
+    poly = sp.Poly(solution.polynomial, solution.symbol)
+    a, b, c = poly.all_coeffs()
+    plus = complex(sp.N((-b + sp.sqrt(b**2 - 4*a*c)) / (2*a)))
+    items.sort(key=lambda item: abs(complex(sp.N(value(item))) - plus))
+    return items
+
+
+def _teacher_denominators(solution: RationalSolution) -> List[str]:
+    denominators = solution.denominators
+
+    # Header
+    result = []
+    result.append("**Step-by-Step Solution with Teacher-Level Explanations:**")
+    result.append("")
+    result.append("---")
+    result.append("")
+    result.append("---")
+
+    # Raw Equation
+    result.append("### **Raw Equation:**")
+    result.append(f"{solution.equation.replace('=', ' = ')}")
+    result.append("*(We're solving for x in this fraction equation)*")
+    result.append("")
+    result.append("---")
+
+    # Step 1: Find and Factor All Denominators
+    result.append("### **Step 1: Find and Factor All Denominators**")
+    result.append("**TEACHER'S VOICE:**")
+
+    if len(denominators) == 0:
+        result.append('"Let\'s look carefully at all bottom parts (denominators):')
+        result.append("1. This equation has no fractions with variables in the denominator")
+        result.append("2. All terms are either constants or polynomials")
+        result.append('3. We can solve this directly without clearing denominators"')
+    elif len(denominators) == 1:
+        den_str = sp.sstr(denominators[0])
+        result.append('"Let\'s look carefully at all bottom parts (denominators):')
+        result.append(f"1. There is one fraction with {den_str} at the bottom")
+        result.append(f"2. Since {den_str} is already simple, we don't need to factor it further")
+        result.append('3. Any constant terms have an invisible denominator of 1"')
+    else:
+        den_list = [sp.sstr(d) for d in denominators]
+        result.append('"Let\'s look carefully at all bottom parts (denominators):')
+        if len(den_list) == 2:
+            result.append(f"1. There are two fractions here, with {den_list[0]} and {den_list[1]} at the bottom")
+            result.append("2. Since these are already simple, we don't need to factor them further")
+            result.append('3. Any constant terms have an invisible denominator of 1"')
+        else:
+            result.append(f"1. There are {len(den_list)} fractions with different denominators")
+            result.append(f"2. The denominators are: {', '.join(den_list)}")
+            result.append("3. Since these are already simple, we don't need to factor them further")
+            result.append('4. Any constant terms have an invisible denominator of 1"')
+
+    result.append("")
+    result.append("```")
+    result.append("INSTRUCTION: First, let's examine all the denominators in our equation - these are the bottom parts of our fractions. We have two simple denominators here that can't be factored further. Remember, we must also identify any x-values that would make these denominators zero, as those would make our equation undefined.")
+    for d in denominators:
+        result.append(f"  {sp.sstr(d)}  # Already in simplest form")
+
+    result.append("INSTRUCTION: Values that would break the math.")
+    if solution.excluded_values:
+        for value in solution.excluded_values:
+            result.append(f"  x = {sp.sstr(value)} (because 5/0 is undefined)  # Never allowed")
+    else:
+        result.append("  None  # No values make any denominator zero.")
+
+    lcd = solution.lcd
+    lcd_factored = sp.factor(lcd)
+    if denominators:
+        result.append(f"• LCD: {sp.sstr(lcd_factored)}  # This is our magic cleaner for all fractions")
+    else:
+        result.append("• LCD: 1  # No denominators to clear")
+    result.append("```")
+    result.append("")
+    result.append("---")
+    return result
+
+
+def _teacher_clearing(solution: RationalSolution) -> List[str]:
+    lhs, rhs = solution.lhs, solution.rhs
+    denominators = solution.denominators
+    lcd = solution.lcd
+    lcd_factored = sp.factor(lcd)
+    result = []
+
+    # Step 2: Multiply Both Sides by LCD
+    result.append("### **Step 2: Multiply Both Sides by LCD**")
+    result.append("**TEACHER'S VOICE:**")
+    if denominators:
+        result.append(f'"We\'ll multiply EVERY term by {sp.sstr(lcd_factored)} to clean up:')
+        result.append("1. For fractions: The bottom cancels with our LCD")
+        result.append("2. For whole numbers: We distribute like multiplication")
+        result.append('3. Watch how each part transforms!"')
+    else:
+        result.append('"Since there are no denominators to clear:')
+        result.append("1. We can solve this equation directly")
+        result.append("2. No multiplication by LCD is needed")
+        result.append('3. Let\'s proceed to solving!"')
+
+    result.append("")
+    result.append("```")
+    result.append("INSTRUCTION: To make this easier to work with, we'll multiply every single term by our least common denominator (LCD). This will clear all the fractions. Watch carefully how each fraction simplifies when we do this multiplication - the denominators will cancel out beautifully!")
+
+    if denominators:
+        result.append("• Left Side Transformation:")
+        _render_term_transforms(result, sp.Add.make_args(lhs), lcd, lcd_factored, "  ")
+        result.append("• Right Side Transformations:")
+        for i, term in enumerate(sp.Add.make_args(rhs)):
+            result.append("  First Term:" if i == 0 else "  Second Term:")
+            _render_term_transforms(result, (term,), lcd, lcd_factored, "    ")
+        result.append("• New Clean Equation:")
+        result.append(f"  {sp.sstr(solution.cleared_lhs)} = {sp.sstr(solution.cleared_rhs)}  # All fractions gone!")
+    else:
+        result.append("• No denominators to clear - equation is already in polynomial form")
+
+    result.append("```")
+    result.append("")
+    result.append("---")
+    return result
+
+
+def _teacher_solving(solution: RationalSolution) -> List[str]:
+    x = solution.symbol
+    result = []
+
+    # Step 3: Solve the Simplified Equation
+    result.append("### **Step 3: Solve the Simplified Equation**")
+    result.append("**TEACHER'S VOICE:**")
+    # The wording follows the degree of the cleared polynomial
+    degree = solution.degree
+    if degree == 0:
+        result.append('"Now we solve this equation:')
+        result.append("1. Combine like terms on both sides")
+        result.append("2. Isolate the variable")
+        result.append('3. Check for valid solutions"')
+    elif degree == 1:
+        result.append('"Now we solve like a regular linear algebra problem:')
+        result.append("1. Combine like terms on both sides")
+        result.append("2. Move variable terms to one side, constants to the other")
+        result.append('3. Divide by the coefficient of x"')
+    elif degree == 2:
+        result.append('"Now we solve like a regular quadratic algebra problem:')
+        result.append("1. Combine like terms to get standard form ax² + bx + c = 0")
+        result.append("2. Use the quadratic formula or factoring")
+        result.append('3. Check for real solutions"')
+    else:
+        result.append('"Now we solve this polynomial equation:')
+        result.append("1. Combine like terms to get standard form")
+        result.append("2. Use appropriate solving methods")
+        result.append('3. Check for valid solutions"')
+
+    result.append("")
+    result.append("```")
+    result.append("INSTRUCTION: Now that we've eliminated the fractions, we have a cleaner equation to work with. Let's gather all the x terms on one side and the constant numbers on the other. Remember to perform the same operation on both sides to keep the equation balanced. Our goal is to isolate x to find its value.")
+    result.append("• Combine like terms:")
+    result.append(f"  {sp.sstr(solution.cleared_lhs)} = {sp.sstr(solution.cleared_rhs)}  # We combined x + 3x")
+
+    sols = _quadratic_formula_order(solution, solution.raw_solutions)
+    if degree == 1:
+        poly = sp.Poly(solution.polynomial, x)
+        a = poly.coeff_monomial(x)
+        b = poly.coeff_monomial(1)
+        xsol = sols[0]
+        result.append("• Move terms:")
+        result.append(f"  {sp.sstr(-b)} = {sp.sstr(a)}*x  # Added 6 to both sides")
+        result.append(f"  {sp.sstr(-b)} = {sp.sstr(a)}*x")
+        result.append("• Divide both sides to isolate x:")
+        result.append(f"  {sp.sstr(-b)}/{sp.sstr(a)} = {sp.sstr(a)}*x/{sp.sstr(a)}")
+        result.append(f"  {sp.sstr(xsol)} = x")
+        result.append("• Final solution:")
+        result.append(f"  x = {sp.sstr(xsol)}  # Exact form")
+        result.append(f"  x ≈ {sp.N(xsol, 8)}  # Decimal form")
+    elif degree == 2:
+        poly = sp.Poly(solution.polynomial, x)
+        a = poly.coeff_monomial(x**2)
+        b = poly.coeff_monomial(x)
+        c = poly.coeff_monomial(1)
+        D = b**2 - 4*a*c
+        result.append("This is a quadratic equation. Use the quadratic formula:")
+        result.append("Standard form: ax² + bx + c = 0")
+        result.append(f"→ {a}x² + {b}x + {c} = 0")
+        result.append("Quadratic formula: x = [-b ± √(b² - 4ac)] / (2a)")
+        result.append(f"Discriminant D = {b}² - 4*{a}*{c} = {D}")
+        x1, x2 = (sols[0], sols[-1]) if sols else (None, None)
+        result.append(f"x₁ = ({-b} + √{D})/({2*a}) = {x1}")
+        result.append(f"x₂ = ({-b} - √{D})/({2*a}) = {x2}")
+        result.append(f"x₁ ≈ {sp.N(x1, 8)}")
+        result.append(f"x₂ ≈ {sp.N(x2, 8)}")
+    else:
+        result.append("• Solutions:")
+        if sols:
+            for sol in sols:
+                result.append(f"  x = {sp.sstr(sol)}")
+        else:
+            result.append("  No real solutions")
+
+    result.append("```")
+    result.append("")
+    result.append("---")
+    return result
+
+
+def _teacher_verification(solution: RationalSolution) -> List[str]:
+    lhs, rhs = solution.lhs, solution.rhs
+    checks = _quadratic_formula_order(solution, solution.checks, lambda check: check.solution)
+    sols = [check.solution for check in checks]
+    result = []
+
+    # Step 4: Verify the Solution
+    result.append("### **Step 4: Verify the Solution**")
+    result.append("**TEACHER'S VOICE:**")
+    if len(sols) == 1:
+        result.append(f'"Let\'s test x = {sp.sstr(sols[0])} in the original equation:')
+        result.append("1. Calculate left side by substituting the value")
+        result.append("2. Calculate right side by substituting the value")
+        result.append('3. Both sides should give the same result"')
+    elif len(sols) > 1:
+        result.append('"Let\'s test each solution in the original equation:')
+        result.append("1. Calculate left side for each solution")
+        result.append("2. Calculate right side for each solution")
+        result.append('3. Both sides should give the same result for valid solutions"')
+    else:
+        result.append('"Let\'s verify our work:')
+        result.append("1. Check if any solutions were found")
+        result.append("2. Verify that denominators are not zero")
+        result.append('3. Confirm the mathematical validity"')
+
+    result.append("")
+    result.append("```")
+    result.append("INSTRUCTION: It's crucial to verify our answer by plugging it back into the original equation. This ensures our solution doesn't make any denominators zero and that both sides of the equation balance correctly. Let's calculate both sides carefully to confirm our answer works.")
+
+    for check in checks:
+        result.append("• Check denominator safety:")
+        for d, val in check.denominator_values:
+            if val == 0:
+                result.append(f"  {sp.sstr(d)} = 0  # Bad!")
+            else:
+                result.append(f"  {sp.sstr(d)} = {sp.sstr(val)} ≠ 0  # Good!")
+        result.append("• Left Side Calculation:")
+        result.append(f"  {sp.sstr(lhs)} = {sp.sstr(check.lhs_eval)}  # Exact")
+        result.append(f"  {sp.N(check.lhs_eval, 8)}  # Decimal")
+        result.append("• Right Side Calculation:")
+        result.append(f"  {sp.sstr(rhs)} = {sp.sstr(check.rhs_eval)}  # Exact")
+        result.append(f"  {sp.N(check.rhs_eval, 8)}  # Decimal")
+        if check.satisfies:
+            result.append("  ✓ Both sides match perfectly!")
+        elif check.makes_denominator_zero:
+            result.append("  Error: Division by zero or undefined result.")
+        else:
+            result.append("  ✗ Sides don't match (extraneous)")
+
+    result.append("```")
+    result.append("")
+    result.append("---")
+
+    # Final Verification
+    result.append("### **Final Verification**")
+    result.append("**TEACHER'S VOICE:**")
+    result.append('"Double-checking our work:')
+    result.append("1. Exact fractions confirm precision")
+    result.append("2. Decimal form helps visualize")
+    result.append('3. Every step maintains equality"')
+    result.append("")
+    result.append("```")
+    result.append("INSTRUCTION: Let's double-check our work by substituting the solution into both sides of the original equation. We'll calculate using exact fractions first for precision, then look at the decimal equivalents. Both sides should give us identical results if we've solved it correctly.")
+
+    for check in checks:
+        if not check.satisfies:
+            continue
+        result.append(f"Substitute x = {sp.sstr(check.solution)}:")
+        result.append("• Left Side:")
+        result.append(f"  {sp.sstr(lhs)} = {sp.sstr(check.lhs_eval)}  # Exact")
+        result.append(f"  {sp.N(check.lhs_eval, 8)}  # Decimal")
+        result.append("• Right Side:")
+        result.append(f"  {sp.sstr(rhs)} = {sp.sstr(check.rhs_eval)}  # Exact")
+        result.append(f"  {sp.N(check.rhs_eval, 8)}  # Decimal")
+        result.append("→ Perfect match! (✓ Valid)")
+
+    result.append("```")
+    result.append("")
+    result.append("---")
+    return result
+
+
+def _teacher_answer(solution: RationalSolution) -> List[str]:
+    checks = _quadratic_formula_order(solution, solution.checks, lambda check: check.solution)
+    result = []
+
+    # Final Answer
+    result.append("**Final Answer:**")
+    valid = [check.solution for check in checks if check.satisfies]
+    if valid:
+        for sol in valid:
+            result.append(f"x = {sp.sstr(sol)}")
+        result.append("*(The solution checks out mathematically!)*")
+    else:
+        result.append("No valid solution exists.")
+
+    result.append("")
+    result.append("")
+    result.append("---")
+    return result
+
+
+# Teacher-voice sections, keyed by the stage that completes their inputs
+TEACHER_SECTIONS = {
+    'denominators': _teacher_denominators,
+    'cleared': _teacher_clearing,
+    'roots': _teacher_solving,
+    'verification': _teacher_verification,
+    'answer': _teacher_answer,
+}
+
+
+def render_teacher(solution: RationalSolution) -> str:
+    """Step-by-step solution with teacher-level explanations (Markdown)."""
+    return '\n'.join(line for stage in STAGES for line in TEACHER_SECTIONS[stage](solution))
+
+
+def render_teacher_error(equation_str: str, message: str) -> str:
+    """The short teacher-voice block for an equation that cannot be worked through."""
+    return '\n'.join([
+        "**Step-by-Step Solution with Teacher-Level Explanations:**",
+        "",
+        "---",
+        "### **Raw Equation:**",
+        equation_str.replace('=', ' = '),
+        "",
+        "---",
+        "**Final Answer:**",
+        message,
+        "",
+        "---",
+    ])
+
+
+def teacher_solution(equation_str: str) -> Any:
+    """The solution the teacher-voice text is rendered from.
+
+    A :class:`RationalSolution` (solved with ``strict=False``), or
+    ``{'error': message}`` for input that cannot be worked through.  Both
+    are cacheable; :func:`teacher_steps` renders either one.
+    """
+    try:
+        return solve_rational_equation(equation_str, strict=False)
+    except ValueError as exc:
+        return {'error': str(exc)}
+
+
+def mirror_solution(outcome: Any) -> Any:
+    """A :func:`teacher_solution` result for the equation with its sides swapped.
+
+    The roots and restrictions are the same; only the sides the steps show
+    trade places.  Error outcomes are returned unchanged.
+    """
+    if isinstance(outcome, dict):
+        return outcome
+    checks = [
+        replace(c, lhs_eval=c.rhs_eval, rhs_eval=c.lhs_eval, lhs_value=c.rhs_value, rhs_value=c.lhs_value)
+        for c in outcome.checks
+    ]
+    return replace(
+        outcome,
+        lhs=outcome.rhs,
+        rhs=outcome.lhs,
+        cleared_lhs=outcome.cleared_rhs,
+        cleared_rhs=outcome.cleared_lhs,
+        polynomial=sp.expand(-outcome.polynomial),
+        checks=checks,
+    )
+
+
+def teacher_steps(outcome: Any, equation_str: str) -> List[Dict[str, str]]:
+    """Render a :func:`teacher_solution` result as the sections of :func:`iter_teacher_steps`.
+
+    ``equation_str`` is shown as the raw equation, so an outcome cached for
+    one spelling of an equation renders as the caller typed it.
+    """
+    if isinstance(outcome, dict):
+        return [{'step': 'error', 'markdown': render_teacher_error(equation_str, outcome['error'])}]
+    solution = replace(outcome, equation=equation_str)
+    return [{'step': stage, 'markdown': '\n'.join(TEACHER_SECTIONS[stage](solution))} for stage in STAGES]
+
+
+def explain_rational_equation(equation_str: str) -> str:
+    """Teacher-voice Markdown for any input, never raising for a bad equation.
+
+    Contradictions and other invalid-but-parseable equations are worked
+    through as before; input that cannot be worked through at all gets a
+    short Markdown block carrying the validator's message.
+    """
+    steps = teacher_steps(teacher_solution(equation_str), equation_str)
+    return '\n'.join(step['markdown'] for step in steps)
+
+
+def iter_teacher_steps(equation_str: str, with_solution: bool = False) -> Iterator[Dict[str, Any]]:
+    """:func:`explain_rational_equation` one section at a time.
+
+    Yields ``{'step': stage, 'markdown': text}`` as soon as each stage is
+    computed; joining the texts with newlines gives the full Markdown.  A bad
+    equation yields a single ``'error'`` step with the short error block.
+    With ``with_solution=True`` a last ``{'step': 'solution', 'solution': ...}``
+    item carries the :func:`teacher_solution` result, for caching.
+    """
+    try:
+        for stage, solution in iter_rational_solution(equation_str, strict=False):
+            yield {'step': stage, 'markdown': '\n'.join(TEACHER_SECTIONS[stage](solution))}
+    except ValueError as exc:
+        solution = {'error': str(exc)}
+        yield {'step': 'error', 'markdown': render_teacher_error(equation_str, solution['error'])}
+    if with_solution:
+        yield {'step': 'solution', 'solution': solution}
+
+
+def solution_to_json(value: Any) -> Any:
+    """``json.dumps`` default hook that stores a :class:`RationalSolution`."""
+    if isinstance(value, RationalSolution):
+        return {'rational_solution': value.to_json()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def solution_from_json(data: Dict[str, Any]) -> Any:
+    """``json.loads`` object hook undoing :func:`solution_to_json`."""
+    if 'rational_solution' in data:
+        return RationalSolution.from_json(data['rational_solution'])
+    return data
@@ -0,0 +1,503 @@
+"""Exact polynomial kernel for rational equations in x.
+
+Every equation the product accepts is a ratio of univariate polynomials with
+rational coefficients, so the hot path does not need SymPy's general
+``simplify``/``solve``/``together`` machinery.  Polynomials are dense lists of
+``fractions.Fraction`` coefficients, lowest degree first (``[]`` is the zero
+polynomial).
+
+Anything outside that shape (floats, radicals, other symbols, functions, huge
+exponents or coefficients) raises :class:`KernelUnsupported` and the caller
+falls back to the general SymPy path.  Roots are found exactly with a
+rational-root search and quadratic factors use the closed form.  Irreducible
+factors of degree 3 or more are never handed to ``sympy.solve`` (whose
+radical and ``CRootOf`` output can take seconds); their real roots are
+isolated numerically to ``NUMERIC_DIGITS`` significant digits instead.
+"""
+
+from __future__ import annotations
+
+from fractions import Fraction
+from math import gcd, isqrt, lcm
+from typing import List, Optional, Tuple
+
+import sympy as sp
+from sympy.core.sorting import default_sort_key
+from sympy.polys.polyroots import roots_quadratic
+
+Poly = List[Fraction]
+
+MAX_EXPONENT = 64
+MAX_ROOT_SEARCH_COEFFICIENT = 10 ** 12
+# p/q candidates tried before the rational-root search gives up
+MAX_ROOT_CANDIDATES = 4096
+# Significant digits of the numeric roots of irreducible factors of degree >= 3
+NUMERIC_DIGITS = 15
+
+
+class KernelUnsupported(Exception):
+    """The input is outside what the exact kernel handles."""
+
+
+# ---------------------------------------------------------------------------
+# Dense polynomial arithmetic over QQ
+# ---------------------------------------------------------------------------
+
+def _trim(p: Poly) -> Poly:
+    while p and p[-1] == 0:
+        p.pop()
+    return p
+
+
+def degree(p: Poly) -> int:
+    return len(p) - 1
+
+
+def add(a: Poly, b: Poly) -> Poly:
+    if len(a) < len(b):
+        a, b = b, a
+    out = list(a)
+    for i, c in enumerate(b):
+        out[i] += c
+    return _trim(out)
+
+
+def sub(a: Poly, b: Poly) -> Poly:
+    return add(a, [-c for c in b])
+
+
+def mul(a: Poly, b: Poly) -> Poly:
+    if not a or not b:
+        return []
+    out = [Fraction(0)] * (len(a) + len(b) - 1)
+    for i, ca in enumerate(a):
+        if ca:
+            for j, cb in enumerate(b):
+                out[i + j] += ca * cb
+    return _trim(out)
+
+
+def power(p: Poly, n: int) -> Poly:
+    result: Poly = [Fraction(1)]
+    base = p
+    while n:
+        if n & 1:
+            result = mul(result, base)
+        n >>= 1
+        if n:
+            base = mul(base, base)
+    return result
+
+
+def divmod_poly(a: Poly, b: Poly) -> Tuple[Poly, Poly]:
+    if not b:
+        raise ZeroDivisionError("polynomial division by zero")
+    rem = list(a)
+    if len(rem) < len(b):
+        return [], rem
+    quot = [Fraction(0)] * (len(rem) - len(b) + 1)
+    lead = b[-1]
+    for shift in range(len(quot) - 1, -1, -1):
+        coeff = rem[shift + len(b) - 1] / lead
+        quot[shift] = coeff
+        if coeff:
+            for i, cb in enumerate(b):
+                rem[shift + i] -= coeff * cb
+    return _trim(quot), _trim(rem[:len(b) - 1])
+
+
+def monic(p: Poly) -> Poly:
+    if not p:
+        return []
+    lead = p[-1]
+    return [c / lead for c in p]
+
+
+def gcd_poly(a: Poly, b: Poly) -> Poly:
+    """Monic greatest common divisor (``[1]`` when coprime)."""
+    while b:
+        a, b = b, divmod_poly(a, b)[1]
+    return monic(a) if a else [Fraction(1)]
+
+
+def lcm_poly(a: Poly, b: Poly) -> Poly:
+    """Monic least common multiple."""
+    return monic(divmod_poly(mul(a, b), gcd_poly(a, b))[0])
+
+
+def evaluate(p: Poly, value: Fraction) -> Fraction:
+    """Exact Horner evaluation."""
+    acc = Fraction(0)
+    for c in reversed(p):
+        acc = acc * value + c
+    return acc
+
+
+def primitive(p: Poly) -> Tuple[Fraction, List[int]]:
+    """Split ``p`` into (content, primitive integer coefficients).
+
+    The primitive part has a positive leading coefficient; the sign is
+    carried by the content.
+    """
+    den = lcm(*(c.denominator for c in p)) if p else 1
+    ints = [int(c * den) for c in p]
+    g = 0
+    for c in ints:
+        g = gcd(g, c)
+    g = g or 1
+    if ints and ints[-1] < 0:
+        g = -g
+    return Fraction(g, den), [c // g for c in ints]
+
+
+# ---------------------------------------------------------------------------
+# Conversion to and from SymPy expressions
+# ---------------------------------------------------------------------------
+
+def to_rational_function(expr: sp.Expr, x: sp.Symbol) -> Tuple[Poly, Poly]:
+    """Convert ``expr`` to an (unreduced) numerator/denominator pair.
+
+    Common factors between numerator and denominator are kept, mirroring
+    ``sympy.together``; denominators of a sum are combined with their lcm.
+    """
+    if expr == x:
+        return [Fraction(0), Fraction(1)], [Fraction(1)]
+    if expr.is_Rational:
+        return _trim([Fraction(int(expr.p), int(expr.q))]), [Fraction(1)]
+    if expr.is_Add:
+        num, den = [], [Fraction(1)]
+        for arg in expr.args:
+            n, d = to_rational_function(arg, x)
+            if d == den:
+                num = add(num, n)
+                continue
+            common = lcm_poly(den, d)
+            num = add(mul(num, divmod_poly(common, den)[0]), mul(n, divmod_poly(common, d)[0]))
+            den = common
+        return num, den
+    if expr.is_Mul:
+        num, den = [Fraction(1)], [Fraction(1)]
+        for arg in expr.args:
+            n, d = to_rational_function(arg, x)
+            num, den = mul(num, n), mul(den, d)
+        return num, den
+    if expr.is_Pow and expr.exp.is_Integer:
+        exp = int(expr.exp)
+        if abs(exp) > MAX_EXPONENT:
+            raise KernelUnsupported(f"exponent {exp} is too large")
+        n, d = to_rational_function(expr.base, x)
+        if exp < 0:
+            if not n:
+                raise KernelUnsupported("division by zero")
+            n, d, exp = d, n, -exp
+        return power(n, exp), power(d, exp)
+    raise KernelUnsupported(f"unsupported term {expr}")
+
+
+def to_polynomial(expr: sp.Expr, x: sp.Symbol) -> Poly:
+    num, den = to_rational_function(expr, x)
+    quot, rem = divmod_poly(num, den)
+    if rem:
+        raise KernelUnsupported(f"{expr} is not a polynomial")
+    return quot
+
+
+def to_expr(p: Poly, x: sp.Symbol) -> sp.Expr:
+    """Expanded SymPy expression, identical to ``sympy.expand`` output."""
+    return sp.Add(*[sp.Rational(c.numerator, c.denominator) * x**i for i, c in enumerate(p) if c])
+
+
+def to_sympy_rational(value: Fraction) -> sp.Rational:
+    return sp.Rational(value.numerator, value.denominator)
+
+
+# ---------------------------------------------------------------------------
+# Roots
+# ---------------------------------------------------------------------------
+
+def _divisors(n: int) -> List[int]:
+    n = abs(n)
+    if n > MAX_ROOT_SEARCH_COEFFICIENT:
+        raise KernelUnsupported("coefficients too large for rational root search")
+    small, large = [], []
+    for d in range(1, isqrt(n) + 1):
+        if n % d == 0:
+            small.append(d)
+            if d * d != n:
+                large.append(n // d)
+    return small + large[::-1]
+
+
+def _deflate(p: Poly, root: Fraction) -> Poly:
+    """Divide ``p`` by (x - root) with synthetic division; root must be exact."""
+    out = [Fraction(0)] * (len(p) - 1)
+    carry = Fraction(0)
+    for i in range(len(p) - 1, 0, -1):
+        carry = carry * root + p[i]
+        out[i - 1] = carry
+    return out
+
+
+def rational_roots(p: Poly) -> Tuple[List[Fraction], Poly]:
+    """Return (distinct rational roots in ascending order, remaining factor).
+
+    The remaining factor has no rational roots; all multiplicities of the
+    returned roots have been divided out.
+    """
+    roots: List[Fraction] = []
+    rest = list(p)
+    if degree(rest) < 1:
+        return roots, rest
+    if rest[0] == 0:
+        roots.append(Fraction(0))
+        while rest and rest[0] == 0:
+            rest.pop(0)
+    _, ints = primitive(rest)
+    if len(ints) > 1:
+        numerators, denominators = _divisors(ints[0]), _divisors(ints[-1])
+        if 2 * len(numerators) * len(denominators) > MAX_ROOT_CANDIDATES:
+            raise KernelUnsupported("too many rational root candidates")
+        candidates = set()
+        for num in numerators:
+            for den in denominators:
+                candidates.add(Fraction(num, den))
+                candidates.add(Fraction(-num, den))
+        for candidate in sorted(candidates):
+            if degree(rest) < 1:
+                break
+            if evaluate(rest, candidate) == 0:
+                roots.append(candidate)
+                while degree(rest) >= 1 and evaluate(rest, candidate) == 0:
+                    rest = _deflate(rest, candidate)
+    return sorted(roots), rest
+
+
+def _solve_quadratic(p: Poly, x: sp.Symbol) -> List[sp.Expr]:
+    """Roots of a quadratic straight from the discriminant, no root search."""
+    _, (c, b, a) = primitive(p)
+    disc = b * b - 4 * a * c
+    root = isqrt(disc) if disc >= 0 else -1
+    if root * root == disc:
+        return sorted({to_sympy_rational(Fraction(-b + s, 2 * a)) for s in (root, -root)},
+                      key=default_sort_key)
+    remainder = a * x**2 + b * x + c
+    return sorted(roots_quadratic(sp.Poly(remainder, x)), key=default_sort_key)
+
+
+def _integer_expr(p: Poly, x: sp.Symbol) -> sp.Expr:
+    _, ints = primitive(p)
+    return sp.Add(*[c * x**i for i, c in enumerate(ints) if c])
+
+
+def _sign(value: Fraction) -> int:
+    return (value > 0) - (value < 0)
+
+
+def _certified_numpy_roots(p: Poly, digits: int) -> Optional[List[float]]:
+    """Real roots of ``p`` from the companion matrix, or ``None`` if unproven.
+
+    Each polished eigenvalue must be bracketed by an exact sign change of
+    ``p`` no wider than the requested precision, the brackets must be
+    disjoint and their number must match the Sturm count of real roots;
+    together that proves every bracket holds exactly one root.
+    """
+    if digits > 15:
+        return None
+    # Imported here: only cubics and up need it, and it is slow to load
+    import numpy as np
+
+    _, ints = primitive(p)
+    try:
+        coefficients = [float(c) for c in reversed(ints)]
+    except OverflowError:
+        return None
+    derivative = np.polyder(coefficients)
+    approximations = []
+    for root in np.roots(coefficients):
+        if abs(root.imag) > 1e-7 * max(1.0, abs(root.real)):
+            continue
+        value = float(root.real)
+        for _ in range(3):
+            slope = np.polyval(derivative, value)
+            if slope == 0:
+                break
+            value -= np.polyval(coefficients, value) / slope
+        approximations.append(value)
+    approximations.sort()
+
+    expected = sp.Poly(list(reversed(ints)), sp.Symbol('x')).count_roots()
+    if len(approximations) != expected:
+        return None
+    previous = None
+    for value in approximations:
+        tolerance = Fraction(max(1.0, abs(value))) / 10 ** digits
+        low, high = Fraction(value) - tolerance, Fraction(value) + tolerance
+        if previous is not None and low <= previous:
+            return None
+        if _sign(evaluate(p, low)) * _sign(evaluate(p, high)) >= 0:
+            return None
+        previous = high
+    return approximations
+
+
+def isolate_real_roots(p: Poly, digits: int = NUMERIC_DIGITS) -> List[sp.Float]:
+    """Real roots of a squarefree ``p`` with no rational roots, ascending.
+
+    numpy's companion-matrix eigenvalues are used when an exact sign-change
+    check can certify them; otherwise SymPy's exact interval isolation is
+    refined to the same precision.  Either way the cost is bounded by the
+    degree and coefficient size, not by how ugly the radicals would be.
+    """
+    roots = _certified_numpy_roots(p, digits)
+    if roots is not None:
+        return [sp.Float(value, digits) for value in roots]
+    x = sp.Symbol('x')
+    eps = sp.Rational(1, 10 ** (digits + 1))
+    intervals = sp.Poly(_integer_expr(p, x), x).intervals(eps=eps)
+    return [sp.Float((low + high) / 2, digits) for (low, high), _ in intervals]
+
+
+def _factor_roots(p: Poly, x: sp.Symbol) -> List[sp.Expr]:
+    """Roots of a polynomial without rational roots, factor by factor."""
+    if degree(p) == 2:
+        return _solve_quadratic(p, x)
+    roots: List[sp.Expr] = []
+    for factor, _ in sp.factor_list(_integer_expr(p, x), x)[1]:
+        factor_poly = to_polynomial(factor, x)
+        if degree(factor_poly) == 1:
+            roots.append(to_sympy_rational(-factor_poly[0] / factor_poly[1]))
+        elif degree(factor_poly) == 2:
+            roots.extend(_solve_quadratic(factor_poly, x))
+        else:
+            roots.extend(isolate_real_roots(factor_poly))
+    return roots
+
+
+def _numeric_order(value: sp.Expr) -> Tuple[bool, float, float]:
+    """Real roots first, ascending; complex roots after them."""
+    z = complex(value.evalf())
+    return z.imag != 0, z.real, z.imag
+
+
+def solve_polynomial(p: Poly, x: sp.Symbol) -> List[sp.Expr]:
+    """Distinct roots of ``p`` in the order ``sympy.solve`` returns them.
+
+    Rational roots and the roots of quadratic factors are exact.  Once
+    numeric roots are involved the list is ordered by value instead.  The roots
+    of irreducible factors of degree 3 or more are the real ``Float``
+    values from :func:`isolate_real_roots`; their complex roots are not
+    reported.
+    """
+    if degree(p) < 1:
+        return []
+    if degree(p) == 2:
+        return _solve_quadratic(p, x)
+    try:
+        found, rest = rational_roots(p)
+    except KernelUnsupported:
+        # Too many candidates for the search; factoring finds the same roots
+        found, rest = [], p
+    solutions = [to_sympy_rational(r) for r in found]
+    if degree(rest) >= 1:
+        for sol in _factor_roots(rest, x):
+            if sol not in solutions:
+                solutions.append(sol)
+    if any(sol.is_Float for sol in solutions):
+        solutions.sort(key=_numeric_order)
+    else:
+        solutions.sort(key=default_sort_key)
+    return solutions
+
+
+def integer_lcm(polys: List[Poly]) -> Poly:
+    """LCM in Z[x] with the same content and sign convention as ``sympy.lcm``.
+
+    SymPy keeps the lcm of the contents and the product of the leading
+    coefficient signs, so ``lcm(x - 2, 3 - x)`` is ``-(x - 2)*(x - 3)``.
+    """
+    content, sign = 1, 1
+    result: Poly = [Fraction(1)]
+    for p in polys:
+        c, ints = primitive(p)
+        if c.denominator != 1:
+            raise KernelUnsupported("non-integer denominator coefficients")
+        content = lcm(content, abs(c.numerator))
+        if c < 0:
+            sign = -sign
+        result = lcm_poly(result, [Fraction(i) for i in ints])
+    _, ints = primitive(result)
+    return [Fraction(sign * content * i) for i in ints]
+
+
+def _surd_mul(a: Tuple[Fraction, Fraction], b: Tuple[Fraction, Fraction], d: int) -> Tuple[Fraction, Fraction]:
+    return a[0] * b[0] + a[1] * b[1] * d, a[0] * b[1] + a[1] * b[0]
+
+
+def _surd_eval(p: Poly, value: Tuple[Fraction, Fraction], d: int) -> Tuple[Fraction, Fraction]:
+    acc = (Fraction(0), Fraction(0))
+    for c in reversed(p):
+        acc = _surd_mul(acc, value, d)
+        acc = (acc[0] + c, acc[1])
+    return acc
+
+
+def evaluate_at_surd(expr: sp.Expr, value: sp.Expr, x: sp.Symbol) -> sp.Expr:
+    """Exactly evaluate ``expr`` at a real quadratic irrational ``a + b*sqrt(d)``.
+
+    Arithmetic is done in Q(sqrt(d)), so the result is already in the
+    canonical ``p + q*sqrt(d)`` form that ``simplify`` would produce.  Raises
+    :class:`KernelUnsupported` for any other kind of value or when a
+    denominator vanishes.
+    """
+    terms = value.as_coefficients_dict()
+    radicals = [t for t in terms if t != 1]
+    if len(radicals) != 1:
+        raise KernelUnsupported(f"{value} is not a quadratic irrational")
+    radical = radicals[0]
+    if not (radical.is_Pow and radical.exp == sp.S.Half and radical.base.is_Integer and radical.base > 0):
+        raise KernelUnsupported(f"{value} is not a real quadratic irrational")
+    d = int(radical.base)
+    a, b = terms.get(sp.S.One, sp.S.Zero), terms[radical]
+    if not (a.is_Rational and b.is_Rational):
+        raise KernelUnsupported(f"{value} has non-rational coefficients")
+    point = (Fraction(int(a.p), int(a.q)), Fraction(int(b.p), int(b.q)))
+
+    num, den = to_rational_function(expr, x)
+    n, m = _surd_eval(num, point, d), _surd_eval(den, point, d)
+    norm = m[0] * m[0] - m[1] * m[1] * d
+    if norm == 0:
+        raise KernelUnsupported("denominator vanishes")
+    p, q = _surd_mul(n, (m[0], -m[1]), d)
+    return to_sympy_rational(p / norm) + to_sympy_rational(q / norm) * radical
+
+
+# ---------------------------------------------------------------------------
+# Equation-level helpers
+# ---------------------------------------------------------------------------
+
+def classify_difference(lhs: sp.Expr, rhs: sp.Expr, x: sp.Symbol) -> Tuple[bool, str]:
+    """Validation verdict for ``lhs = rhs`` computed with exact arithmetic.
+
+    Returns the same (valid, message) pairs as ``validate_rational_equation``.
+    """
+    ln, ld = to_rational_function(lhs, x)
+    rn, rd = to_rational_function(rhs, x)
+    num = sub(mul(ln, rd), mul(rn, ld))
+    if not num:
+        return True, "This equation is always true (infinite solutions)."
+    den = mul(ld, rd)
+    common = gcd_poly(num, den)
+    if degree(num) == degree(common) and degree(den) == degree(common):
+        return False, "This equation has no solution (contradiction)."
+    if degree(ld) == 0 and degree(rd) == 0:
+        return True, "Valid rational equation (constant denominators)."
+    return True, "Valid rational equation (proceed with solving, check for extraneous solutions)."
+
+
+def clear_denominators(expr: sp.Expr, lcd: Poly, x: sp.Symbol) -> Poly:
+    """Multiply ``expr`` by ``lcd`` and return the resulting polynomial."""
+    num, den = to_rational_function(expr, x)
+    factor, rem = divmod_poly(mul(num, lcd), den)
+    if rem:
+        raise KernelUnsupported("LCD does not clear every denominator")
+    return factor
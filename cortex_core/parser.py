@@ -0,0 +1,286 @@
+"""Restricted parser for the equations students and teachers type in.
+
+The product only accepts rational equations in x, so user input never needs
+the full ``sympy.sympify`` machinery (an ``eval`` of the string plus automatic
+symbol creation).  This module tokenizes and parses the supported grammar
+directly into SymPy objects::
+
+    equation := expr '=' expr
+    expr     := term (('+' | '-') term)*
+    term     := unary (('*' | '/') unary | power)*     # juxtaposition multiplies
+    unary    := ('+' | '-') unary | power
+    power    := atom (('^' | '**') unary)?             # right associative
+    atom     := NUMBER | 'x' | '(' expr ')' | 'sqrt' '(' expr ')'
+
+Juxtaposition covers ``2x``, ``x(x+1)``, ``(x+1)(x-1)`` and ``x2``.  ``sqrt``
+is there for student answers such as ``(5 + sqrt(13))/2``; in an equation it
+simply makes the validator report a non-rational equation.  Other names are
+rejected with :class:`UnsupportedNameError` (a variable such as ``y``) or
+:class:`UnsupportedFunctionError` (a name followed by ``(``, such as
+``sin(x)``), so the validator can still say why the equation is not rational;
+anything else (``!``, ``%``, ...) is rejected with
+:class:`EquationSyntaxError`, as are inputs that would be expensive to build:
+overlong strings, deep nesting, exponents beyond :data:`MAX_EXPONENT` and
+numeric powers with more than :data:`MAX_POWER_BITS` bits, so ``9^9^9`` fails
+in microseconds instead of hanging a worker.
+
+The expressions are built with the same operators ``sympify`` applies, so the
+result is identical to ``sympify`` for every input the grammar accepts.  With
+``evaluate=False`` the tree is kept as typed instead (``x/x`` stays ``x/x``),
+like ``sympify(..., evaluate=False)``.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import List, Tuple
+
+import sympy as sp
+
+X = sp.Symbol('x')
+
+MAX_LENGTH = 1000
+MAX_DEPTH = 40
+MAX_EXPONENT = 64
+MAX_POWER_BITS = 4096
+
+# ``x`` and ``sqrt`` are operators unless a letter follows; ``x2`` is x*2
+_TOKEN_RE = re.compile(
+    r'\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|(?:sqrt|x)(?![A-Za-z_])|[-+*/^()=])|([A-Za-z_]\w*))'
+)
+
+NUMBER, OP, END = 'number', 'op', 'end'
+
+
+class EquationSyntaxError(ValueError):
+    """The input is outside the supported equation grammar or its limits."""
+
+
+class UnsupportedNameError(EquationSyntaxError):
+    """The input names a variable other than ``x``."""
+
+
+class UnsupportedFunctionError(UnsupportedNameError):
+    """The input calls a function other than ``sqrt``."""
+
+
+def tokenize(text: str) -> List[Tuple[str, str, int]]:
+    """Split ``text`` into (kind, value, position) tuples ending with END."""
+    if len(text) > MAX_LENGTH:
+        raise EquationSyntaxError(f"input longer than {MAX_LENGTH} characters")
+    tokens = []
+    names = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            if names:
+                break
+            offset = len(text) - len(text[pos:].lstrip())
+            raise EquationSyntaxError(f"unexpected character {text[offset]!r} at position {offset}")
+        number, op, name = match.groups()
+        if name is not None:
+            # Keep scanning: "s*i*n(x)" (sin after implicit multiplication)
+            # is still a function call even though "s" comes first
+            names.append((name, match.start(3), text[match.end():].lstrip().startswith('(')))
+            pos = match.end()
+            continue
+        start = match.start(1) if number is not None else match.start(2)
+        if number is not None:
+            tokens.append((NUMBER, number, start))
+        else:
+            tokens.append((OP, '^' if op == '**' else op, start))
+        pos = match.end()
+    if names:
+        calls = [(name, start) for name, start, called in names if called]
+        if calls:
+            name, start = calls[0]
+            raise UnsupportedFunctionError(f"unsupported function {name!r} at position {start}")
+        name, start, _ = names[0]
+        raise UnsupportedNameError(f"unsupported name {name!r} at position {start}")
+    tokens.append((END, '', end))
+    return tokens
+
+
+def _abbreviate(value: sp.Expr, limit: int = 20) -> str:
+    """``str(value)`` cut to ``limit`` characters, so error messages stay short."""
+    text = str(value)
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def _check_powers(expr: sp.Expr) -> sp.Expr:
+    """Reject results whose powers would make later stages blow up."""
+    for factor in sp.Mul.make_args(expr):
+        if factor.is_Pow and factor.exp.is_Integer and abs(factor.exp) > MAX_EXPONENT:
+            raise EquationSyntaxError(f"exponent {_abbreviate(factor.exp)} is larger than {MAX_EXPONENT}")
+    return expr
+
+
+class _Parser:
+    def __init__(self, text: str, evaluate: bool = True):
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.depth = 0
+        self.evaluate = evaluate
+
+    # -- tree building -----------------------------------------------------
+
+    def add(self, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+        return a + b if self.evaluate else sp.Add(a, b, evaluate=False)
+
+    def sub(self, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+        return a - b if self.evaluate else sp.Add(a, self.neg(b), evaluate=False)
+
+    def mul(self, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+        return a * b if self.evaluate else sp.Mul(a, b, evaluate=False)
+
+    def div(self, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+        return a / b if self.evaluate else sp.Mul(a, sp.Pow(b, -1, evaluate=False), evaluate=False)
+
+    def neg(self, a: sp.Expr) -> sp.Expr:
+        return -a if self.evaluate or a.is_Number else sp.Mul(-1, a, evaluate=False)
+
+    def pow(self, a: sp.Expr, b: sp.Expr) -> sp.Expr:
+        return a ** b if self.evaluate else sp.Pow(a, b, evaluate=False)
+
+    # -- token helpers -----------------------------------------------------
+
+    def peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.index]
+
+    def accept(self, value: str) -> bool:
+        kind, tok, _ = self.peek()
+        if kind == OP and tok == value:
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, value: str) -> None:
+        if not self.accept(value):
+            self.fail(f"expected {value!r}")
+
+    def fail(self, message: str) -> None:
+        kind, tok, pos = self.peek()
+        found = 'end of input' if kind == END else repr(tok)
+        raise EquationSyntaxError(f"{message}, found {found} at position {pos}")
+
+    def enter(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise EquationSyntaxError(f"expression nested deeper than {MAX_DEPTH} levels")
+
+    # -- grammar -----------------------------------------------------------
+
+    def expr(self) -> sp.Expr:
+        value = self.term()
+        while True:
+            if self.accept('+'):
+                value = self.add(value, self.term())
+            elif self.accept('-'):
+                value = self.sub(value, self.term())
+            else:
+                return value
+
+    def term(self) -> sp.Expr:
+        value = self.unary()
+        while True:
+            if self.accept('*'):
+                value = _check_powers(self.mul(value, self.unary()))
+            elif self.accept('/'):
+                divisor = self.unary()
+                if divisor == 0:
+                    raise EquationSyntaxError("division by zero")
+                value = _check_powers(self.div(value, divisor))
+            elif self._starts_implicit_factor():
+                value = _check_powers(self.mul(value, self.power()))
+            else:
+                return value
+
+    def _starts_implicit_factor(self) -> bool:
+        kind, tok, _ = self.peek()
+        if kind == OP:
+            return tok in ('x', '(', 'sqrt')
+        # A number only multiplies implicitly after x or ')', as in "x2"
+        return kind == NUMBER and self.tokens[self.index - 1][1] in ('x', ')')
+
+    def unary(self) -> sp.Expr:
+        if self.accept('-'):
+            self.enter()
+            value = self.neg(self.unary())
+            self.depth -= 1
+            return value
+        if self.accept('+'):
+            self.enter()
+            value = self.unary()
+            self.depth -= 1
+            return value
+        return self.power()
+
+    def power(self) -> sp.Expr:
+        base = self.atom()
+        if not self.accept('^'):
+            return base
+        self.enter()
+        exponent = self.unary()
+        self.depth -= 1
+        typed = exponent
+        if not self.evaluate:
+            # The limits apply to the exponent's value; its parts are checked already
+            exponent = exponent.doit()
+        if not exponent.is_Rational:
+            raise EquationSyntaxError("exponents must be exact constants")
+        if abs(exponent.p) > MAX_EXPONENT or exponent.q > MAX_EXPONENT:
+            raise EquationSyntaxError(f"exponent {_abbreviate(exponent)} is larger than {MAX_EXPONENT}")
+        if base.is_Rational:
+            bits = max(abs(base.p).bit_length(), base.q.bit_length())
+            if bits * abs(exponent) > MAX_POWER_BITS:
+                raise EquationSyntaxError(f"{_abbreviate(base)}^{_abbreviate(exponent)} is too large")
+        elif base.is_Float and base != 0 and abs(exponent) * abs(math.log2(abs(float(base)))) > MAX_POWER_BITS:
+            raise EquationSyntaxError(f"{_abbreviate(base)}^{_abbreviate(exponent)} is too large")
+        if base == 0 and exponent < 0:
+            raise EquationSyntaxError("division by zero")
+        return _check_powers(self.pow(base, typed))
+
+    def atom(self) -> sp.Expr:
+        kind, tok, _ = self.peek()
+        if kind == NUMBER:
+            self.index += 1
+            return sp.Float(tok) if '.' in tok else sp.Integer(tok)
+        if self.accept('x'):
+            return X
+        if self.accept('sqrt'):
+            self.expect('(')
+            self.enter()
+            value = self.expr()
+            value = sp.sqrt(value) if self.evaluate else sp.Pow(value, sp.S.Half, evaluate=False)
+            self.expect(')')
+            self.depth -= 1
+            return value
+        if self.accept('('):
+            self.enter()
+            value = self.expr()
+            self.expect(')')
+            self.depth -= 1
+            return value
+        self.fail("expected a number, 'x', 'sqrt' or '('")
+
+
+def parse_expression(text: str, evaluate: bool = True) -> sp.Expr:
+    """Parse one side of an equation into a SymPy expression."""
+    parser = _Parser(text, evaluate)
+    if parser.peek()[0] == END:
+        raise EquationSyntaxError("empty expression")
+    value = parser.expr()
+    if parser.peek()[0] != END:
+        parser.fail("unexpected token")
+    return value
+
+
+def parse_equation(text: str, evaluate: bool = True) -> Tuple[sp.Expr, sp.Expr]:
+    """Parse ``lhs = rhs`` into a pair of SymPy expressions."""
+    if '=' not in text:
+        raise EquationSyntaxError("not an equation, missing '='")
+    lhs_str, rhs_str = text.split('=', 1)
+    return parse_expression(lhs_str, evaluate), parse_expression(rhs_str, evaluate)
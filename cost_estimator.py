@@ -0,0 +1,172 @@
+"""Cheap up-front cost estimate for a rational equation.
+
+Before any SymPy solving starts, ``estimate_cost`` looks at the parsed shape
+of the equation: the degree of the polynomial left after clearing
+denominators, the number of distinct denominators, the bit size of the
+cleared coefficients and the number of terms.  :class:`CostLimits` turns that
+into one of three tiers:
+
+``inline``
+    cheap enough to run on the normal solver pool;
+``background``
+    allowed, but sent to the slower background pool so it cannot hold up
+    everybody else;
+``reject``
+    refused with a message that tells the student what to fix.
+
+The estimate only uses the restricted parser and the exact kernel, so it
+costs about a millisecond for a typical lesson equation.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import sympy as sp
+
+from cortex_core import kernel
+from cortex_core.parser import X, EquationSyntaxError, parse_equation
+
+INLINE = 'inline'
+BACKGROUND = 'background'
+REJECT = 'reject'
+
+# Above this structural bound the exact degree is not worth computing
+MAX_EXACT_DEGREE = 64
+
+
+@dataclass(frozen=True)
+class CostLimits:
+    """Largest values served inline and largest values accepted at all."""
+
+    inline_degree: int = 4
+    max_degree: int = 10
+    inline_denominators: int = 6
+    max_denominators: int = 16
+    inline_coefficient_bits: int = 64
+    max_coefficient_bits: int = 512
+    inline_terms: int = 24
+    max_terms: int = 80
+
+
+@dataclass
+class CostEstimate:
+    degree: int = 0
+    denominators: int = 0
+    coefficient_bits: int = 0
+    terms: int = 0
+    tier: str = INLINE
+    reason: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _degree_bound(expr: sp.Expr) -> Tuple[int, int]:
+    """Upper bound on the (numerator, denominator) degrees of ``expr``."""
+    if expr == X:
+        return 1, 0
+    if expr.is_Number:
+        return 0, 0
+    if expr.is_Add:
+        bounds = [_degree_bound(arg) for arg in expr.args]
+        den = sum(d for _, d in bounds)
+        return max(n + den - d for n, d in bounds), den
+    if expr.is_Mul:
+        bounds = [_degree_bound(arg) for arg in expr.args]
+        return sum(n for n, _ in bounds), sum(d for _, d in bounds)
+    if expr.is_Pow and expr.exp.is_Rational:
+        n, d = _degree_bound(expr.base)
+        exp = abs(expr.exp.p)
+        return (d * exp, n * exp) if expr.exp < 0 else (n * exp, d * exp)
+    return 0, 0
+
+
+def _coefficient_bits(expr: sp.Expr) -> int:
+    bits = 0
+    for number in expr.atoms(sp.Rational):
+        bits = max(bits, abs(number.p).bit_length(), number.q.bit_length())
+    return bits
+
+
+def _cleared_shape(lhs: sp.Expr, rhs: sp.Expr) -> Tuple[int, int]:
+    """(degree, coefficient bits) of the polynomial left after clearing denominators.
+
+    Both sides are multiplied by the LCD of their denominators, as the solver
+    does, so shared denominators do not inflate the degree.
+    """
+    ln, ld = kernel.to_rational_function(lhs, X)
+    rn, rd = kernel.to_rational_function(rhs, X)
+    lcd = kernel.lcm_poly(ld, rd)
+    cleared = kernel.sub(
+        kernel.mul(ln, kernel.divmod_poly(lcd, ld)[0]),
+        kernel.mul(rn, kernel.divmod_poly(lcd, rd)[0]),
+    )
+    if not cleared:
+        return 0, 0
+    _, ints = kernel.primitive(cleared)
+    return kernel.degree(cleared), max(abs(c).bit_length() for c in ints)
+
+
+def _classify(estimate: CostEstimate, limits: CostLimits) -> None:
+    checks = (
+        (estimate.degree, limits.inline_degree, limits.max_degree,
+         "after clearing denominators this is a degree-{value} polynomial; "
+         "the solver accepts degree {limit} or lower. Check the exponents for a typo."),
+        (estimate.denominators, limits.inline_denominators, limits.max_denominators,
+         "the equation has {value} different denominators; the solver accepts at most {limit}."),
+        (estimate.coefficient_bits, limits.inline_coefficient_bits,
+         limits.max_coefficient_bits,
+         "the coefficients are too large ({value} bits, at most {limit} allowed). Try smaller numbers."),
+        (estimate.terms, limits.inline_terms, limits.max_terms,
+         "the equation has {value} terms; the solver accepts at most {limit}. Try splitting it up."),
+    )
+    for value, inline_limit, max_limit, message in checks:
+        if value > max_limit:
+            estimate.tier = REJECT
+            estimate.reason = "Too complex: " + message.format(value=value, limit=max_limit)
+            return
+        if value > inline_limit:
+            estimate.tier = BACKGROUND
+    estimate.reason = None
+
+
+def estimate_cost(equation_str: str, limits: CostLimits = CostLimits()) -> CostEstimate:
+    """Estimate how expensive ``equation_str`` is to solve.
+
+    Inputs the parser rejects are reported as ``inline`` with an empty
+    estimate, so the validator can return its usual error message quickly.
+    """
+    estimate = CostEstimate()
+    try:
+        lhs, rhs = parse_equation(equation_str)
+    except EquationSyntaxError:
+        return estimate
+
+    denominators = set()
+    for side in (lhs, rhs):
+        terms = sp.Add.make_args(side)
+        estimate.terms += len(terms)
+        for term in terms:
+            den = sp.denom(term)
+            if den.has(X):
+                denominators.add(den)
+    estimate.denominators = len(denominators)
+
+    (ln, ld), (rn, rd) = _degree_bound(lhs), _degree_bound(rhs)
+    bound = max(ln + rd, rn + ld)
+    estimate.degree = bound
+    estimate.coefficient_bits = max(_coefficient_bits(lhs), _coefficient_bits(rhs))
+    if bound <= MAX_EXACT_DEGREE:
+        rationals = {f: sp.Rational(str(f)) for side in (lhs, rhs) for f in side.atoms(sp.Float)}
+        try:
+            estimate.degree, estimate.coefficient_bits = _cleared_shape(
+                lhs.xreplace(rationals), rhs.xreplace(rationals)
+            )
+        except (kernel.KernelUnsupported, ZeroDivisionError):
+            # Radicals and the like; the validator rejects them cheaply
+            pass
+
+    _classify(estimate, limits)
+    return estimate
@@ -0,0 +1,11 @@
+"""Kept so existing ``import equation_parser`` lines keep working.
+
+The code lives in :mod:`cortex_core.parser`; this name is an alias for that
+module, not a copy of it.
+"""
+
+import sys
+
+from cortex_core import parser
+
+sys.modules[__name__] = parser
@@ -10,7 +10,6 @@ import sys
 import time
 import requests
 import sympy as sp
-from latex2sympy2 import latex2sympy
 from sympy import Eq
 try:
     from typing import Optional, Any
@@ -545,6 +544,8 @@ def latex_to_sympy_via_latex2sympy(latex: str) -> Any:
     """
     if not isinstance(latex, str):
         raise RuntimeError("Expected LaTeX string input")
+    # Imported here so the rest of this module works without latex2sympy2 (and its ANTLR runtime)
+    from latex2sympy2 import latex2sympy
 
     latex_norm = preprocess_latex_for_rationals(latex)
     print("[DEBUG] LaTeX after preprocessing:", latex_norm)
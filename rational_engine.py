@@ -0,0 +1,11 @@
+"""Kept so existing ``import rational_engine`` lines keep working.
+
+The code lives in :mod:`cortex_core.engine`; this name is an alias for that
+module, not a copy of it.
+"""
+
+import sys
+
+from cortex_core import engine
+
+sys.modules[__name__] = engine
@@ -0,0 +1,11 @@
+"""Kept so existing ``import rational_kernel`` lines keep working.
+
+The code lives in :mod:`cortex_core.kernel`; this name is an alias for that
+module, not a copy of it.
+"""
+
+import sys
+
+from cortex_core import kernel
+
+sys.modules[__name__] = kernel
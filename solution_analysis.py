@@ -13,6 +13,7 @@ from typing import Any, Dict, Iterable, List, Optional
 
 import sympy as sp
 
+from cortex_core.parser import parse_equation, parse_expression
 from step import (  # type: ignore
     analyze_verification_context,
     contains_text_or_symbols,
@@ -103,7 +104,7 @@ def _parse_student_value(answer: str, equations: List[str]) -> Optional[sp.Expr]
             normalized = normalize_math_expression(candidate)
             if not normalized:
                 continue
-            return sp.sympify(normalized)
+            return parse_expression(normalized)
         except Exception:
             continue
 
@@ -116,7 +117,7 @@ def _parse_student_value(answer: str, equations: List[str]) -> Optional[sp.Expr]
                 normalized = normalize_math_expression(math_part)
                 if not normalized:
                     continue
-                return sp.sympify(normalized)
+                return parse_expression(normalized)
             except Exception:
                 continue
 
@@ -192,8 +193,7 @@ def analyze_student_solution(
             }
 
     try:
-        lhs_str, rhs_str = cleaned_equation.split("=", 1)
-        lhs, rhs = map(sp.sympify, [lhs_str, rhs_str])
+        lhs, rhs = parse_equation(cleaned_equation)
     except Exception as exc:
         return {
             "status": "error",
@@ -3,6 +3,7 @@
 Complete startup script for MathVerse - starts both backend and frontend
 """
 
+import argparse
 import os
 import sys
 import subprocess
@@ -12,9 +13,11 @@ import signal
 import webbrowser
 from pathlib import Path
 
-def check_python_dependencies():
+def check_python_dependencies(production=False):
     """Check if required Python packages are installed"""
     required_packages = ['flask', 'flask-cors', 'sympy', 'numpy']
+    if production:
+        required_packages.append('gunicorn')
     missing_packages = []
     
     for package in required_packages:
@@ -56,9 +59,10 @@ def check_node_dependencies():
     
     return True
 
-def start_backend():
+def start_backend(production=False):
     """Start the Flask backend server"""
-    print("🚀 Starting Rational Equation Solver Backend...")
+    mode = "production (gunicorn)" if production else "development"
+    print(f"🚀 Starting Rational Equation Solver Backend in {mode} mode...")
     
     # Change to the api directory
     api_dir = Path(__file__).parent / "api"
@@ -80,8 +84,11 @@ def start_backend():
     print("   - GET /api/health - Health check")
     
     try:
-        # Start the Flask server
-        subprocess.run([sys.executable, 'solver.py'])
+        # Pre-forked gunicorn workers in production, Flask's dev server otherwise
+        if production:
+            subprocess.run([sys.executable, 'serve.py', 'solver'])
+        else:
+            subprocess.run([sys.executable, 'solver.py'])
     except KeyboardInterrupt:
         print("\n🛑 Backend server stopped by user")
     except Exception as e:
@@ -158,12 +165,19 @@ def open_browser():
 
 def main():
     """Main startup function"""
+    parser = argparse.ArgumentParser(description="Start the MathVerse backend and frontend")
+    parser.add_argument('--production', action='store_true',
+                        default=os.environ.get('SOLVER_SERVE_MODE') == 'production',
+                        help="run the backend under gunicorn (api/serve.py) instead of Flask's dev server; "
+                             "also SOLVER_SERVE_MODE=production")
+    args = parser.parse_args()
+
     print("🔬 MathVerse - Complete Application Startup")
     print("=" * 50)
     
     # Check dependencies
     print("\n📦 Checking dependencies...")
-    if not check_python_dependencies():
+    if not check_python_dependencies(args.production):
         print("❌ Failed to install Python dependencies")
         return
     
@@ -175,7 +189,7 @@ def main():
     
     # Start backend in a separate thread
     print("\n🚀 Starting servers...")
-    backend_thread = threading.Thread(target=start_backend, daemon=True)
+    backend_thread = threading.Thread(target=start_backend, args=(args.production,), daemon=True)
     backend_thread.start()
     
     # Wait a bit for backend to start
@@ -3,14 +3,17 @@
 Startup script for the Rational Equation Solver Backend
 """
 
+import argparse
 import os
 import sys
 import subprocess
 import time
 
-def check_dependencies():
+def check_dependencies(production=False):
     """Check if required packages are installed"""
     required_packages = ['flask', 'flask-cors', 'sympy', 'numpy']
+    if production:
+        required_packages.append('gunicorn')
     missing_packages = []
     
     for package in required_packages:
@@ -32,9 +35,10 @@ def check_dependencies():
     
     return True
 
-def start_backend():
+def start_backend(production=False):
     """Start the Flask backend server"""
-    print("🚀 Starting Rational Equation Solver Backend...")
+    mode = "production (gunicorn)" if production else "development"
+    print(f"🚀 Starting Rational Equation Solver Backend in {mode} mode...")
     
     # Change to the api directory
     api_dir = os.path.join(os.path.dirname(__file__), 'api')
@@ -59,8 +63,11 @@ def start_backend():
     print("-" * 50)
     
     try:
-        # Start the Flask server
-        subprocess.run([sys.executable, 'solver.py'])
+        # Pre-forked gunicorn workers in production, Flask's dev server otherwise
+        if production:
+            subprocess.run([sys.executable, 'serve.py', 'solver'])
+        else:
+            subprocess.run([sys.executable, 'solver.py'])
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
     except Exception as e:
@@ -69,12 +76,21 @@ def start_backend():
     
     return True
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Rational Equation Solver Backend")
+    parser.add_argument('--production', action='store_true',
+                        default=os.environ.get('SOLVER_SERVE_MODE') == 'production',
+                        help="run under gunicorn (api/serve.py) instead of Flask's dev server; "
+                             "also SOLVER_SERVE_MODE=production")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     print("🔬 Rational Equation Solver Backend")
     print("=" * 40)
     
-    if check_dependencies():
-        start_backend()
+    if check_dependencies(args.production):
+        start_backend(args.production)
     else:
         print("❌ Failed to start backend")
         sys.exit(1) 
\ No newline at end of file
@@ -693,8 +693,8 @@ def check_solution_correctness(student_solution, original_equation):
         if "=" not in original_equation:
             return False, "Invalid equation format. Missing '='."
         
-        lhs_str, rhs_str = original_equation.split("=", 1)
-        lhs, rhs = map(sp.sympify, [lhs_str, rhs_str])
+        from cortex_core.parser import parse_equation, parse_expression
+        lhs, rhs = parse_equation(original_equation)
         
         # Extract denominators and compute restrictions
         denominators = []
@@ -902,7 +902,7 @@ def check_solution_correctness(student_solution, original_equation):
                         continue
                     
                     math_part = normalize_math_expression(math_part)
-                    final_answer = sp.sympify(math_part)
+                    final_answer = parse_expression(math_part)
                     break
                 except:
                     continue
@@ -910,16 +910,20 @@ def check_solution_correctness(student_solution, original_equation):
         # Check if answer is correct
         answer_correct = False
         if final_answer is not None:
-            # Find the actual solution
-            if denominators and isinstance(denominators, (list, tuple)):
-                simplified_lhs = sp.expand(sp.simplify(lhs * lcd))
-                simplified_rhs = sp.expand(sp.simplify(rhs * lcd))
-            else:
-                simplified_lhs = lhs
-                simplified_rhs = rhs
-            
-            standard_form = sp.expand(simplified_lhs - simplified_rhs)
-            actual_solutions = sp.solve(standard_form, x)
+            # Find the actual solution (exact polynomial kernel first)
+            try:
+                from cortex_core.engine import solve_rational_equation
+                actual_solutions = solve_rational_equation(original_equation).raw_solutions
+            except Exception:
+                if denominators and isinstance(denominators, (list, tuple)):
+                    simplified_lhs = sp.expand(sp.simplify(lhs * lcd))
+                    simplified_rhs = sp.expand(sp.simplify(rhs * lcd))
+                else:
+                    simplified_lhs = lhs
+                    simplified_rhs = rhs
+
+                standard_form = sp.expand(simplified_lhs - simplified_rhs)
+                actual_solutions = sp.solve(standard_form, x)
             
             # Check if student's answer matches any of the actual solutions
             for actual_sol in actual_solutions:
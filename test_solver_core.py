@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Checks for the pure solver modules: the restricted equation parser, the
+exact polynomial kernel, the cost estimator and the rational-function
+analyzer.
+
+Runs under pytest or directly: python test_solver_core.py
+"""
+
+import json
+import os
+import random
+import time
+
+import sympy as sp
+
+from bench_solver import CATEGORIES, TIMED_STAGES, build_corpus, run
+from cortex_core import kernel
+from cortex_core.calculator import validate_rational_equation
+from cortex_core.engine import (
+    STAGES, _unique, explain_rational_equation, iter_teacher_steps, render_concise, solve_rational_equation,
+)
+from cortex_core.parser import MAX_DEPTH, EquationSyntaxError, parse_equation, parse_expression
+from cost_estimator import BACKGROUND, INLINE, REJECT, estimate_cost
+from olol_hahahaa import insert_multiplication_signs
+from yessss import RationalFunctionCalculator
+
+x = sp.Symbol('x')
+WARMUP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'warmup_equations.json')
+
+
+def _rejects(text):
+    try:
+        parse_expression(text)
+    except EquationSyntaxError:
+        return True
+    return False
+
+
+def test_parser_rejects_huge_powers_quickly():
+    start = time.perf_counter()
+    for text in ["9^9^9", "9**9**9", "x^1000", "(x^60)^60", "x*(x^40)*(x^40)", "2^5000"]:
+        assert _rejects(text), text
+    assert time.perf_counter() - start < 0.5
+
+    # Messages name the operands without echoing hundreds of digits back
+    for text in ["2^" + "9" * 500, "(" + "7" * 500 + ")^9", "x^(1/" + "3" * 500 + ")"]:
+        try:
+            parse_expression(text)
+        except EquationSyntaxError as exc:
+            assert len(str(exc)) < 80 and '…' in str(exc), str(exc)
+        else:
+            raise AssertionError(f"expected {text[:20]!r} to be rejected")
+
+
+def test_parser_rejects_deep_nesting():
+    assert _rejects("(" * (MAX_DEPTH + 1) + "x" + ")" * (MAX_DEPTH + 1))
+    assert _rejects("-" * (MAX_DEPTH + 1) + "x")
+    assert parse_expression("(" * 10 + "x" + ")" * 10) == x
+
+
+def test_parser_rejects_other_names_and_syntax():
+    for text in ["y+1", "sin(x)", "factorial(100)", "x!", "__import__('os')", "1e5", "x % 2",
+                 "", "(x", "x)", "2 3", "1/0", "x^x"]:
+        assert _rejects(text), text
+
+    # Other names still get the validator's explanation: functions are not
+    # polynomial, and any variable but x makes it not an equation in x
+    functions = "Error: Not a rational equation (contains non-polynomial functions)."
+    variables = "Error: Not a rational equation (must be a fraction of polynomials in x)."
+    cases = [("sin(x)/x=1", functions), ("log(x)=1", functions),
+             (insert_multiplication_signs("sin(x)/x=1"), functions), ("y + sin (x) = 1", functions),
+             ("1/(x-2)=y", variables), ("a*x=1", variables), (insert_multiplication_signs("2y=x"), variables)]
+    for equation, message in cases:
+        assert validate_rational_equation(equation) == (False, message), equation
+        try:
+            solve_rational_equation(equation)
+        except ValueError as exc:
+            assert str(exc) == message, equation
+        else:
+            raise AssertionError(f"expected {equation!r} to be rejected")
+
+
+def test_parser_matches_sympify_on_warmup_equations():
+    with open(WARMUP_FILE, encoding='utf-8') as fh:
+        equations = json.load(fh)['equations']
+    assert equations
+    for equation in equations:
+        # Same preprocessing as /api/solve
+        equation = insert_multiplication_signs(equation.replace('X', 'x'))
+        lhs_str, rhs_str = equation.split('=', 1)
+        expected = (sp.sympify(lhs_str.replace('^', '**')), sp.sympify(rhs_str.replace('^', '**')))
+        assert tuple(map(sp.srepr, parse_equation(equation))) == tuple(map(sp.srepr, expected)), equation
+
+
+def test_parser_implicit_multiplication_and_sqrt():
+    assert parse_expression("2x") == 2 * x
+    assert parse_expression("x(x+1)") == x * (x + 1)
+    assert parse_expression("(x+1)(x-1)") == (x + 1) * (x - 1)
+    assert parse_expression("(5+sqrt(13))/2") == (5 + sp.sqrt(13)) / 2
+
+
+def test_kernel_roots_match_sympy():
+    rng = random.Random(7)
+    checked = 0
+    for _ in range(300):
+        degree = rng.choice([1, 2, 2, 3, 4])
+        poly = sum(rng.randint(-30, 30) * x**i for i in range(degree + 1))
+        if sp.degree(poly, x) < 1:
+            continue
+        try:
+            roots = kernel.solve_polynomial(kernel.to_polynomial(poly, x), x)
+        except kernel.KernelUnsupported:
+            continue
+        if sp.degree(poly, x) <= 2:
+            assert roots == sp.solve(poly, x), poly
+        else:
+            # Rational roots stay exact; the others are real and good to 15 digits
+            expected = sorted(set(r for r in sp.Poly(poly, x).nroots(n=30) if r.is_real))
+            real_roots = sorted(r for r in roots if r.is_real)
+            assert len(real_roots) == len(expected), poly
+            for root, reference in zip(real_roots, expected):
+                assert abs(root - reference) < 1e-12 * max(1, abs(reference)), poly
+            for root in sp.Poly(poly, x).ground_roots():
+                assert root in roots, poly
+        checked += 1
+    assert checked > 200
+
+
+def test_kernel_large_coefficients_are_fast():
+    poly = 963761198400 * x**2 + x + 963761198400
+    start = time.perf_counter()
+    roots = kernel.solve_polynomial(kernel.to_polynomial(poly, x), x)
+    assert time.perf_counter() - start < 1.0
+    assert set(roots) == set(sp.solve(poly, x))
+
+    # Too many rational-root candidates: the search gives up...
+    cubic = 963761198400 * x**3 + x + 963761198400
+    try:
+        kernel.rational_roots(kernel.to_polynomial(cubic, x))
+    except kernel.KernelUnsupported:
+        pass
+    else:
+        raise AssertionError("expected the candidate cap to trigger")
+    # ...and the solver factors and isolates the real root instead
+    start = time.perf_counter()
+    roots = kernel.solve_polynomial(kernel.to_polynomial(cubic, x), x)
+    assert time.perf_counter() - start < 1.0
+    assert len(roots) == 1 and abs(roots[0] + 1) < 1e-9
+
+
+def test_high_degree_roots_are_numeric_and_bounded():
+    start = time.perf_counter()
+    roots = kernel.solve_polynomial(kernel.to_polynomial((x - 2) * (x**2 - 2) * (x**3 - x - 1), x), x)
+    assert time.perf_counter() - start < 1.0
+    # Ordered by value once a numeric root is involved
+    assert [roots[0], roots[2], roots[3]] == [-sp.sqrt(2), sp.sqrt(2), 2]
+    assert roots[1].is_Float and abs(roots[1] - sp.Rational(132471795724475, 10**14)) < 1e-13
+
+
+def test_numeric_roots_that_zero_a_denominator_are_extraneous():
+    # The sqrt(2) coefficients send this one down the SymPy fallback
+    for equation in ["x^3/(x^3-x-1) = (x+1)/(x^3-x-1)",
+                     "sqrt(2)*x^3/(x^3-x-1) = sqrt(2)*(x+1)/(x^3-x-1)"]:
+        result = solve_rational_equation(equation, strict=False)
+        assert result.valid_solutions == []
+        assert len(result.extraneous_solutions) == 1 and result.extraneous_solutions[0].is_Float
+        assert all(c.makes_denominator_zero for c in result.checks)
+
+    kept = solve_rational_equation("sqrt(2)*x^3/(x-5) = sqrt(2)*(x+1)/(x-5)", strict=False)
+    assert len(kept.valid_solutions) == 1 and kept.extraneous_solutions == []
+
+
+def test_engine_verifies_roots_exactly():
+    result = solve_rational_equation("x/(x-2) + 3/(x+2) = 8/(x^2-4)")
+    assert result.valid_solutions == [-7]
+    assert result.extraneous_solutions == [2]
+    checks = {c.solution: c for c in result.checks}
+    assert checks[-7].lhs_value == checks[-7].rhs_value == sp.Rational(8, 45)
+    assert checks[2].makes_denominator_zero and not checks[2].satisfies
+
+    surd = solve_rational_equation("1/(x-1) = x")
+    assert all(c.satisfies for c in surd.checks) and len(surd.valid_solutions) == 2
+
+
+def test_renderers_keep_the_original_wording():
+    result = solve_rational_equation("x/(x-2) + 3/(x+2) = 8/(x^2-4)")
+    # Denominators as written; the product is not listed next to its own factors
+    assert [sp.sstr(d) for d in result.denominators] == ['x + 2', 'x - 2', 'x**2 - 4']
+    assert result.excluded_values == [-2, 2]
+
+    teacher = explain_rational_equation("x/(x-2) + 3/(x+2) = 8/(x^2-4)")
+    assert "(x - 2)*(x + 2)  # Already in simplest form" not in teacher
+    assert "  Error: Division by zero or undefined result." in teacher
+
+    concise = render_concise(result)
+    assert "    Left side expression: (x**2 + 5*x - 6)/(x**2 - 4)" in concise
+    assert "      → Substitute: 8/45" in concise
+
+
+def test_teacher_step3_wording_follows_the_cleared_degree():
+    openings = {
+        "x/x=1": '"Now we solve this equation:',
+        "1/(x-2)=3": '"Now we solve like a regular linear algebra problem:',
+        "x/(x-2) + 3/(x+2) = 8/(x^2-4)": '"Now we solve like a regular quadratic algebra problem:',
+        "x^3/(x^3-x-1) = (x+1)/(x^3-x-1)": '"Now we solve this polynomial equation:',
+    }
+    for equation, opening in openings.items():
+        text = explain_rational_equation(equation)
+        step3 = text.split("### **Step 3: Solve the Simplified Equation**\n**TEACHER'S VOICE:**\n", 1)[1]
+        assert step3.startswith(opening + "\n"), equation
+
+
+def test_unique_compares_canonical_forms():
+    assert _unique([sp.sqrt(8) / 2, sp.sqrt(2), sp.Rational(1, 2), sp.Rational(2, 4)]) == [sp.sqrt(2), sp.Rational(1, 2)]
+    expanded = sp.Mul(sp.Rational(1, 2), 1 + sp.sqrt(5), evaluate=False)
+    assert _unique([expanded, sp.Rational(1, 2) + sp.sqrt(5) / 2]) == [expanded]
+
+
+def test_teacher_steps_join_to_the_full_solution():
+    for equation in ["x/(x-2) + 3/(x+2) = 8/(x^2-4)", "1/(x-1) = x", "x^3 = 1/(x^3-2)", "1/(x-1) = 1/(x-1) + 1"]:
+        steps = list(iter_teacher_steps(equation))
+        assert tuple(step['step'] for step in steps) == STAGES
+        assert "\n".join(step['markdown'] for step in steps) == explain_rational_equation(equation)
+    assert [step['step'] for step in iter_teacher_steps("sin(x) = 1")] == ['error']
+
+
+def test_benchmark_corpus_and_stage_timings():
+    corpus = build_corpus(per_category=5, seed=1)
+    assert corpus == build_corpus(per_category=5, seed=1)
+    assert sorted({item['category'] for item in corpus}) == sorted(CATEGORIES)
+    assert len(corpus) == 5 * len(CATEGORIES)
+
+    sample = [item for item in corpus if item['category'] == 'extraneous'][:2]
+    for row in run(sample, ['olol_hahahaa'], repeat=1):
+        assert tuple(row['stages_ms']) == TIMED_STAGES
+        assert row['outcome']['extraneous'], row['equation']
+
+
+def test_rational_function_analysis_is_structured():
+    calculator = RationalFunctionCalculator()
+    analysis = calculator.analyze("(x^2-1)/(x-1)")
+    assert analysis.domain_restrictions == [1] and analysis.zeros == [-1]
+    assert analysis.holes == [(1, 2)] and analysis.y_intercept == (0, 1)
+    assert analysis.oblique_asymptote == "y = x + 1" and analysis.horizontal_asymptote is None
+
+    data = analysis.as_dict()
+    assert data['domain_restrictions'] == ['1'] and data['zeros'] == ['-1']
+    assert data['x_intercepts'] == ['(-1, 0)'] and data['holes'] == ['(1, 2)']
+    assert data['vertical_asymptotes'] == [] and data['horizontal_asymptote'] == ''
+    assert [section['title'].split(')')[0] for section in data['sections']] == [str(n) for n in range(1, 9)] + ['10']
+    json.dumps(data)
+
+    text = analysis.render_text()
+    assert "7) HOLES (REMOVABLE DISCONTINUITIES)" in text and "✓ Holes: [(1, 2)]" in text
+    try:
+        calculator.analyze("x + 1")
+    except ValueError as exc:
+        assert "No division found" in str(exc)
+    else:
+        raise AssertionError("a polynomial without a denominator was analyzed")
+
+
+def test_graph_sampling_is_vectorized_and_leaves_gaps_at_asymptotes():
+    calculator = RationalFunctionCalculator()
+    x = calculator.x
+    func = (x**2 - 1) / (x - 2)
+    x_min, x_max, xs, ys = calculator.sample_function(func, [sp.Integer(2)], points=401)
+    assert (x_min, x_max, len(xs)) == (-10.0, 10.0, 401)
+    near = abs(xs - 2) < 0.1
+    assert all(y != y for y in ys[near])
+    kept = [(xv, yv) for xv, yv in zip(xs, ys) if yv == yv]
+    assert all(abs(yv) < 100 for _, yv in kept)
+    for xv, yv in kept[::40]:
+        assert abs(float(func.subs(x, xv)) - yv) < 1e-9
+
+    # Complex asymptotes do not stretch the range; constants fill the grid
+    assert calculator.sample_function(5 / (x**2 + 4), [-2 * sp.I, 2 * sp.I])[:2] == (-10.0, 10.0)
+    assert list(calculator.sample_function(sp.Integer(3), [], points=3)[3]) == [3.0, 3.0, 3.0]
+
+
+def test_plot_data_splits_at_asymptotes_and_holes_within_the_viewport():
+    calculator = RationalFunctionCalculator()
+    data = calculator.plot_data("(x^2-4)/((x-2)(x+1))", -4, 6, -20, 20, 600, 400)
+    assert data['vertical_asymptotes'] == [-1.0] and data['holes'] == [[2.0, 1.33]]
+    assert data['horizontal_asymptote'] == 1.0 and data['y_intercept'] == 2.0
+    # Pieces left of the asymptote, between it and the hole, right of the hole
+    segments = data['segments']
+    assert len(segments) == 3 and all(x < -1 for x, _ in segments[0])
+    assert all(-1 < x < 2 for x, _ in segments[1]) and all(x > 2 for x, _ in segments[2])
+    for x, y in (point for segment in segments for point in segment):
+        assert -4 <= x <= 6 and -20 <= y <= 20
+        # Rounded to a tenth of a pixel; steep next to the asymptote
+        assert abs(x + 1) < 0.5 or abs((x + 2) / (x + 1) - y) < 0.06
+    # The curve leaves the view at its top and bottom edges next to the asymptote
+    assert segments[0][-1][1] == -20 and segments[1][0][1] == 20
+    # Points gather where the curve bends, near the asymptote
+    near = sum(abs(x + 1) < 1 for x, _ in segments[0] + segments[1])
+    assert near > sum(3 < x < 5 for x, _ in segments[2])
+    assert len(json.dumps(data)) < 8000
+
+    # Zooming out keeps the payload small; a bad viewport is refused
+    wide = calculator.plot_data("(x^2-4)/((x-2)(x+1))", -1000, 1000, -5, 5, 600, 400)
+    assert wide['holes'] and len(json.dumps(wide)) < 8000
+    for bounds in ((1, -1, -5, 5, 600, 400), (-1, 1, -5, 5, 0, 400), (-1, float('inf'), -5, 5, 600, 400)):
+        try:
+            calculator.plot_data("1/x", *bounds)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"viewport {bounds} accepted")
+
+
+def test_estimator_tiers():
+    assert estimate_cost("1/(x-2)=3").tier == INLINE
+    assert estimate_cost("x^5 - 1 = 0").tier == BACKGROUND
+    rejected = estimate_cost("x^12 + 1 = 0")
+    assert rejected.tier == REJECT
+    assert "degree-12" in rejected.reason
+    # Unparseable input is left for the validator to explain
+    assert estimate_cost("sin(x)=1").tier == INLINE
+
+
+def test_estimator_clears_with_the_lcd():
+    assert estimate_cost("x^6/(x-1)^6 = 1/(x-1)^6").degree == 6
+    assert estimate_cost("x^3/(x^2-1)^2 = 3/(x^2-1)^2").degree == 3
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✓ {name}")
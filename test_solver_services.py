@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+Checks for the shared backend services in api/: the solution cache, the
+solver pool, request metrics, profiling, the production server options and
+concurrent serving of the rational-function endpoints.
+
+Runs under pytest or directly: python test_solver_services.py
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+# The servers read these at import: no warm-up or persistent store, and
+# solver calls run inline in the request threads, where sharing is riskiest
+_TEST_DIR = tempfile.mkdtemp(prefix='solver-test-')
+os.environ.update(
+    SOLVER_WARMUP='0',
+    SOLVER_STORE_PATH='',
+    SOLVER_POOL_WORKERS='0',
+    SOLVER_JOBS_PATH=os.path.join(_TEST_DIR, 'jobs.db'),
+    SOLVER_GRAPH_STORE_PATH=os.path.join(_TEST_DIR, 'graphs.db'),
+)
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from profiling import Profiler, profiled_call
+from request_metrics import RequestMetrics, timed
+from serve import default_workers, gunicorn_options, main as serve_main
+from solution_cache import SolutionCache
+from solver_pool import SolverPool, SolverTimeout
+
+
+def test_cache_coalesces_concurrent_misses():
+    cache = SolutionCache(maxsize=16, ttl=0)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'solved'
+
+    with ThreadPoolExecutor(max_workers=35) as executor:
+        futures = [executor.submit(cache.get_or_compute, 'key', compute) for _ in range(35)]
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < 34 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ['solved'] * 35
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 34
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_cache_shares_errors_without_caching_them():
+    cache = SolutionCache(maxsize=16, ttl=0)
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("bad equation")
+
+    def call():
+        try:
+            cache.get_or_compute('key', fail)
+        except ValueError as exc:
+            return str(exc)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(call) for _ in range(5)]
+        time.sleep(0.1)
+        release.set()
+        assert [future.result() for future in futures] == ["bad equation"] * 5
+
+    assert cache.get_or_compute('key', lambda: 'fixed') == 'fixed'
+
+
+def test_solve_cache_keys_and_renders_for_the_callers_equation():
+    import solver
+    from solution_cache import canonical_equation_key, equation_sides_swapped
+    from solution_store import SolutionStore
+
+    # Nothing is simplified before keying; only the sides are put in order
+    keys = [canonical_equation_key(eq) for eq in
+            ('x/x=1', '(x-2)/(x-2)=1', 'x/x=x', '2*x/2=1', 'x=1', '1/(x-2)=3')]
+    assert len(set(keys)) == len(keys)
+    assert canonical_equation_key('1/(x - 2) = 3') == canonical_equation_key('1/(x-2)=3')
+    assert canonical_equation_key('3=1/(x-2)') == canonical_equation_key('1/(x-2)=3')
+    assert equation_sides_swapped('3=1/(x-2)') != equation_sides_swapped('1/(x-2)=3')
+
+    client = solver.app.test_client()
+    solver.solution_cache.clear()
+    first = client.post('/api/solve', json={'equation': '1/(x-2)=3'}).get_json()
+    second = client.post('/api/solve', json={'equation': '1/(x - 2) = 3'}).get_json()
+    assert solver.solution_cache.stats()['hits'] >= 1
+    assert '1/(x-2) = 3' in first['solution'] and '1/(x - 2)  =  3' in second['solution']
+    assert first['solution'].replace('1/(x-2) = 3', '1/(x - 2)  =  3') == second['solution']
+
+    # The mirrored equation shares the entry but shows its own side order
+    solver.solution_cache.clear()
+    mirrored = client.post('/api/solve', json={'equation': '3=1/(x-2)'}).get_json()['solution']
+    assert solver.solution_cache.stats()['size'] == 2  # validate + solve
+    assert client.post('/api/solve', json={'equation': '1/(x-2)=3'}).get_json()['solution'] == first['solution']
+    assert solver.solution_cache.stats()['size'] == 2
+    solver.solution_cache.clear()
+    assert client.post('/api/solve', json={'equation': '3=1/(x-2)'}).get_json()['solution'] == mirrored
+    assert mirrored != first['solution'] and '3 = 1/(x-2)' in mirrored
+    streamed = '\n'.join(step['markdown'] for step in solver.stream_steps('3=1/(x-2)'))
+    assert streamed == mirrored
+
+    restricted = client.post('/api/solve', json={'equation': '(x-2)/(x-2)=1'}).get_json()
+    assert restricted['solution'] != client.post('/api/solve', json={'equation': 'x/x=1'}).get_json()['solution']
+
+    # The structured solution survives the SQLite store unchanged
+    store = SolutionStore(os.path.join(_TEST_DIR, 'solutions.db'), version='test',
+                          default=solver.solution_to_json, object_hook=solver.solution_from_json)
+    solution = solver.solution_cache.lookup(('solve', canonical_equation_key('1/(x-2)=3')))
+    store.set('key', solution)
+    assert store.get('key') == solution
+
+
+def test_solver_jobs_get_the_job_timeout():
+    import solver
+
+    budgets = []
+
+    def recording(pool):
+        call = pool.call
+
+        def record(func, *args, timeout=None, **kwargs):
+            budgets.append(timeout)
+            return call(func, *args, timeout=timeout, **kwargs)
+        return record
+
+    pools = (solver.solver_pool, solver.background_pool)
+    for pool in pools:
+        pool.call = recording(pool)
+    try:
+        solver.solution_cache.clear()
+        payload, status = solver.solve_job({'equation': '2/(x+1)=1'})
+        assert status == 200 and payload['success']
+        payload, status = solver.batch_job({'equations': ['5/(x-3)=1']})
+        assert status == 200 and payload['results'][0]['status'] == 200
+        assert budgets and set(budgets) == {solver.SOLVER_JOB_TIMEOUT}
+
+        # A synchronous request keeps the pool's own budget
+        budgets.clear()
+        solver.app.test_client().post('/api/solve', json={'equation': '7/(x-4)=1'})
+        assert budgets and set(budgets) == {None}
+    finally:
+        for pool in pools:
+            del pool.call
+
+
+def test_jobs_outliving_stale_after_are_not_reported_failed():
+    from job_queue import DONE, FAILED, JobQueue
+
+    def slow(request):
+        time.sleep(request['seconds'])
+        return {'success': True}, 200
+
+    # One worker: the second job waits queued while the first runs, and
+    # both last several times stale_after
+    queue = JobQueue(os.path.join(_TEST_DIR, 'stale-jobs.db'), {'slow': slow}, workers=1, stale_after=0.3)
+    ids = [queue.submit('slow', {'seconds': 0.8})['id'] for _ in range(2)]
+    seen = {job_id: set() for job_id in ids}
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and not all(DONE in statuses for statuses in seen.values()):
+        for job_id in ids:
+            seen[job_id].add(queue.get(job_id)['status'])
+        time.sleep(0.05)
+    for job_id in ids:
+        assert FAILED not in seen[job_id] and DONE in seen[job_id], seen[job_id]
+    assert queue.get(ids[0])['result'] == {'success': True}
+
+    # A job nobody is running any more (its process died) still goes stale
+    conn = queue._connect()
+    conn.execute("INSERT INTO jobs (id, kind, status, request, created_at, updated_at) "
+                 "VALUES ('orphan', 'slow', 'running', '{}', ?, ?)", (time.time(), time.time() - 1))
+    conn.commit()
+    conn.close()
+    orphan = queue.get('orphan')
+    assert orphan['status'] == FAILED and orphan['http_status'] == 500
+
+
+def test_jobs_are_only_visible_to_the_service_that_queued_them():
+    import sqlite3
+    from job_queue import JobQueue
+
+    path = os.path.join(_TEST_DIR, 'shared-jobs.db')
+    # A table from before jobs were tagged with their service gains the column
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                 "request TEXT NOT NULL, result TEXT, http_status INTEGER, "
+                 "created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    def handler(request):
+        return {'success': True}, 200
+
+    mine = JobQueue(path, {'analyze': handler}, service='rational-function')
+    theirs = JobQueue(path, {'analyze': handler}, service='hybrid-db')
+    job_id = mine.submit('analyze', {})['id']
+    deadline = time.monotonic() + 5
+    while mine.get(job_id)['status'] != 'done' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert mine.get(job_id)['result'] == {'success': True}
+    assert theirs.get(job_id) is None
+
+    # The servers are configured with distinct services
+    import hybrid_db_server
+    import rational_function_solver
+    import solver
+    services = {solver.jobs.service, rational_function_solver.jobs.service, hybrid_db_server.jobs.service}
+    assert len(services) == 3 and '' not in services
+
+
+def test_solve_batch_streams_one_line_per_equation():
+    import solver
+
+    equations = ['1/(x-2)=3', 'sin(x)/x=1', 'x^30/(x-1)=1', '', 5]
+    response = solver.app.test_client().post('/api/solve/batch', json={'equations': equations})
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == len(equations)
+    results = {line['index']: line for line in lines}
+    assert sorted(results) == list(range(len(equations)))
+    assert [results[i]['status'] for i in range(len(equations))] == [200, 400, 422, 400, 400]
+    assert results[0]['success'] and '1/(x-2) = 3' in results[0]['solution']
+    assert 'non-polynomial' in results[1]['error']
+    assert results[2]['too_complex'] and results[2]['equation'] == 'x^30/(x-1)=1'
+
+    client = solver.app.test_client()
+    too_many = ['1/(x-2)=3'] * (solver.SOLVER_BATCH_MAX + 1)
+    assert client.post('/api/solve/batch', json={'equations': too_many}).status_code == 413
+    assert client.post('/api/solve/batch', json={'equations': []}).status_code == 400
+
+
+def test_warmup_gates_health_and_fills_the_cache():
+    import solver
+    from bench_solver import lesson_corpus
+    from solution_cache import canonical_equation_key
+    from warmup import Warmup
+
+    equations = [item['equation'] for item in lesson_corpus()]
+    assert equations
+    release = threading.Event()
+
+    def run(equation):
+        release.wait(5)
+        solver.solve_pipeline(equation)
+
+    client = solver.app.test_client()
+    original = solver.warmup
+    solver.solution_cache.clear()
+    solver.warmup = Warmup(equations, run, workers=2).start()
+    try:
+        health = client.get('/api/health')
+        assert health.status_code == 503 and health.get_json()['status'] == 'warming_up'
+        release.set()
+        assert solver.warmup.wait(60)
+        health = client.get('/api/health')
+        assert health.status_code == 200 and health.get_json()['ready']
+        assert health.get_json()['warmup']['done'] == len(equations)
+        assert health.get_json()['warmup']['failed'] == 0
+    finally:
+        solver.warmup = original
+
+    # Every lesson equation is validated; the solvable ones are solved too
+    for equation in equations:
+        key = canonical_equation_key(solver.insert_multiplication_signs(equation.replace('X', 'x')))
+        valid, _ = solver.solution_cache.lookup(('validate', key))
+        assert not valid or solver.solution_cache.lookup(('solve', key)) is not None, equation
+
+
+def test_store_reads_leave_the_database_untouched():
+    import sqlite3
+    from solution_store import SolutionStore
+
+    path = os.path.join(_TEST_DIR, 'reads.db')
+    store = SolutionStore(path, version='test')
+    store.set('old', 1)
+    store.set('new', 2)
+
+    def accessed(key):
+        with sqlite3.connect(path) as conn:
+            return conn.execute('SELECT accessed_at FROM solutions WHERE key = ?', (key,)).fetchone()[0]
+
+    before = accessed('old')
+    assert store.get('old') == 1 and accessed('old') == before
+    # The read is recorded with the next write, in time for eviction
+    store.set('other', 3)
+    assert accessed('old') > before
+
+
+def test_store_treats_undecodable_rows_as_misses():
+    import sqlite3
+    import solver
+    from solution_store import SolutionStore
+
+    path = os.path.join(_TEST_DIR, 'corrupt.db')
+    store = SolutionStore(path, version='test',
+                          default=solver.solution_to_json, object_hook=solver.solution_from_json)
+    bad_srepr = json.dumps({'rational_solution': {'lhs': {'srepr': "Symbol('x'"}}})
+    for value in ('{"truncated": ', bad_srepr, json.dumps({'rational_solution': {}})):
+        store.set('key', 1)
+        with sqlite3.connect(path) as conn:
+            conn.execute('UPDATE solutions SET value = ?', (value,))
+        errors = store.errors
+        assert store.get('key', 'missing') == 'missing', value
+        assert store.errors == errors + 1
+
+
+def test_request_metrics_server_timing_and_histograms():
+    app = Flask(__name__)
+    RequestMetrics('test', buckets=(0.01, 1.0)).install(app)
+
+    @app.route('/api/work', methods=['POST'])
+    def work():
+        request.get_json()
+        with timed('solve'):
+            time.sleep(0.02)
+        return jsonify({'ok': True})
+
+    client = app.test_client()
+    response = client.post('/api/work', json={'equation': '1/(x-2)=3'})
+    stages = [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+    assert stages == ['parse', 'solve', 'json', 'total']
+
+    text = client.get('/api/metrics').get_data(as_text=True)
+    labels = 'service="test",endpoint="/api/work",stage="solve"'
+    assert f'http_request_stage_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'http_request_stage_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'http_request_stage_seconds_count{{{labels}}} 1' in text
+    assert 'http_request_duration_seconds_count{service="test",endpoint="/api/work",method="POST",status="2xx"} 1' in text
+
+
+def _worker_pid(delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _count(n):
+    for i in range(n):
+        yield i, os.getpid()
+
+
+def test_solver_pool_with_real_workers():
+    # Worker processes, unlike the inline pools the servers use under test
+    pool = SolverPool(max_workers=1, timeout=5.0, max_tasks=2)
+    try:
+        first = pool.call(_worker_pid)
+        # Items cross the process boundary; this is the worker's second task
+        items = list(pool.stream(_count, 3))
+        assert [i for i, _ in items] == [0, 1, 2] and {pid for _, pid in items} == {first}
+        assert pool.stats()['recycled'] == 1 and pool.stats()['workers'] == 0
+        second = pool.call(_worker_pid)
+        assert second != first
+
+        # An overrun kills the worker; the next call gets a new one
+        start = time.monotonic()
+        try:
+            pool.call(_worker_pid, 30, timeout=0.5)
+        except SolverTimeout:
+            pass
+        else:
+            raise AssertionError("expected SolverTimeout")
+        assert time.monotonic() - start < 5
+        assert pool.stats()['timeouts'] == 1 and pool.stats()['workers'] == 0
+        assert pool.call(_worker_pid) not in (first, second)
+    finally:
+        pool.shutdown()
+
+    # A caller waiting on a full pool is woken when the busy worker retires,
+    # instead of waiting out its budget and getting SolverBusy
+    pool = SolverPool(max_workers=1, timeout=10.0, max_tasks=1)
+    try:
+        pool.call(_worker_pid)  # start-up cost out of the way
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            busy = executor.submit(pool.call, _worker_pid, 0.5)
+            deadline = time.monotonic() + 5
+            while pool.stats()['workers'] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            start = time.monotonic()
+            waiter = pool.call(_worker_pid)
+            assert time.monotonic() - start < 5
+            assert waiter != busy.result()
+        assert pool.stats()['recycled'] == 3
+    finally:
+        pool.shutdown()
+
+
+def _busy(n):
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        n = (n * 31 + 7) % 1000003
+    return n
+
+
+def test_profiling_returns_folded_stacks_to_local_clients():
+    app = Flask(__name__)
+    Profiler(token='admin').install(app)
+    pool = SolverPool(max_workers=0)
+
+    @app.route('/api/work', methods=['POST'])
+    def work():
+        return jsonify({'result': profiled_call(pool, _busy, 3)})
+
+    client = app.test_client()
+    profile = client.post('/api/work', headers={'X-Profile': 'stacks'}).get_json()['profile'][0]
+    assert profile['function'].endswith('._busy') and profile['samples'] > 0
+    for line in profile['collapsed'].splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('test_solver_services.py:_busy') and int(count) > 0
+
+    assert 'pstats' in client.post('/api/work?profile=pstats').get_json()['profile'][0]
+    assert 'profile' not in client.post('/api/work').get_json()
+
+    remote = {'REMOTE_ADDR': '10.1.2.3'}
+    assert client.post('/api/work', headers={'X-Profile': 'stacks'}, environ_base=remote).status_code == 403
+    assert client.post('/api/work', headers={'X-Profile': 'stacks', 'X-Profile-Token': 'admin'},
+                       environ_base=remote).status_code == 200
+
+
+def test_serve_worker_count_and_gunicorn_options():
+    assert default_workers(0, per_core=2.0, cores=4) == 8
+    assert default_workers(0, per_core=0.1, cores=2) == 1
+    assert default_workers(3, per_core=2.0, cores=4) == 3
+
+    class Args:
+        bind, workers, threads, max_requests, max_requests_jitter = None, 2, 4, 0, 50
+
+    options = gunicorn_options('hybrid-db', Args)
+    assert options['bind'] == '0.0.0.0:5055' and options['workers'] == 2
+    # Recycling off means no jitter either, and the app is never imported in the master
+    assert options['max_requests'] == 0 and options['max_requests_jitter'] == 0
+    assert options['preload_app'] is False and options['pidfile'].endswith('hybrid-db.pid')
+
+    try:
+        serve_main(['no-such-service'])
+    except SystemExit as exc:
+        assert exc.code == 2
+    else:
+        raise AssertionError("unknown service accepted")
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _post(url, payload):
+    body = json.dumps(payload).encode()
+    req = urllib.request.Request(url, body, {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.load(response)
+
+
+def test_rational_function_endpoints_under_concurrent_requests():
+    import rational_function_solver
+
+    # 50 distinct functions (x^2 - a^2)/(x - b): zeros -a and a, excluded value b
+    cases = [(a, b) for a in range(1, 11) for b in range(-15, -10)]
+    server = make_server('127.0.0.1', 0, rational_function_solver.app, threaded=True,
+                         request_handler=_QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/api/rational-function"
+
+    def check(case):
+        a, b = case
+        function = f"(x^2-{a * a})/(x-({b}))"
+        analysis = _post(f"{base}/analyze", {'function': function})
+        assert analysis['function'] == function
+        assert analysis['analysis']['domain_restrictions'] == [str(b)]
+        assert analysis['analysis']['zeros'] == [str(-a), str(a)]
+        assert analysis['analysis']['vertical_asymptotes'] == [str(b)]
+        assert f"Original: f(x) = x**2 - {a * a}/x + {-b}" in analysis['raw_output']
+        assert _post(f"{base}/domain", {'function': function})['domain_restrictions'] == [str(b)]
+        assert _post(f"{base}/zeros", {'function': function})['zeros'] == [str(-a), str(a)]
+        assert _post(f"{base}/asymptotes", {'function': function})['oblique_asymptote'] == f"y = x - {-b}"
+        return case
+
+    # Nothing in the analysis may go through the process-wide sys.stdout
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+            done = list(executor.map(check, cases))
+        printed = sys.stdout.getvalue()
+    finally:
+        sys.stdout = stdout
+        server.shutdown()
+    assert done == cases
+    assert printed == ''
+
+
+def test_rational_function_report_is_rendered_outside_the_solve():
+    import rational_function_solver
+    from yessss import RationalFunctionCalculator
+
+    client = rational_function_solver.app.test_client()
+    response = client.post('/api/rational-function/analyze', json={'function': '(x^2-4)/(x+3)'})
+    stages = [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+    assert stages == ['parse', 'solve', 'render', 'json', 'total']
+    expected = RationalFunctionCalculator().analyze('(x^2-4)/(x+3)').render_text()
+    assert response.get_json()['raw_output'] == expected
+
+
+def test_rational_function_plot_endpoint_follows_the_viewport():
+    import rational_function_solver
+
+    client = rational_function_solver.app.test_client()
+    url = '/api/rational-function/plot'
+    default = client.post(url, json={'function': '1/(x-12)'}).get_json()
+    assert default['success'] and default['viewport']['x_max'] == 14.0
+    assert default['vertical_asymptotes'] == [12.0] and len(default['segments']) == 2
+
+    zoomed = client.post(url, json={'function': '1/(x-12)', 'viewport': {
+        'x_min': 0, 'x_max': 5, 'y_min': -1, 'y_max': 0, 'width': 300}}).get_json()
+    assert zoomed['viewport'] == {'x_min': 0.0, 'x_max': 5.0, 'y_min': -1.0, 'y_max': 0.0,
+                                  'width': 300, 'height': 533}
+    assert zoomed['vertical_asymptotes'] == [] and len(zoomed['segments']) == 1
+    assert all(0 <= x <= 5 for x, _ in zoomed['segments'][0])
+
+    for viewport in ({'width': 'wide'}, {'x_min': 3, 'x_max': 1}, [0, 1]):
+        response = client.post(url, json={'function': '1/(x-12)', 'viewport': viewport})
+        assert response.status_code == 400 and not response.get_json()['success']
+
+
+def test_rational_function_graph_is_cached_and_revalidated_with_its_etag():
+    import rational_function_solver
+
+    client = rational_function_solver.app.test_client()
+    url = '/api/rational-function/graph?function=(x^2-9)/(x-1)&width=480&height=320&dpi=80'
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.mimetype == 'image/png'
+    assert first.data.startswith(b'\x89PNG') and etag.startswith('"') and not etag.startswith('W/')
+    assert 'max-age' in first.headers['Cache-Control']
+
+    # Same canonical function and viewport: served from memory, 304 for a matching ETag
+    hits = rational_function_solver.graph_cache.stats()['hits']
+    revalidated = client.get(url.replace('(x-1)', '(x - 1)'), headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304 and revalidated.data == b''
+    assert rational_function_solver.graph_cache.stats()['hits'] == hits + 1
+
+    # A new process finds the image on disk; another size is another image
+    rational_function_solver.graph_cache.clear()
+    assert client.get(url).headers['ETag'] == etag
+    stats = client.get('/api/cache/stats').get_json()['graphs']
+    assert stats['maxsize'] > 0 and stats['store']['hits'] >= 1
+    assert client.get(url.replace('dpi=80', 'dpi=100')).headers['ETag'] != etag
+
+    assert client.get(url.replace('dpi=80', 'dpi=5000')).status_code == 400
+    assert client.get('/api/rational-function/graph?function=1/x&width=wide').status_code == 400
+    # Rendering never goes through pyplot, so there is no window to open
+    assert 'matplotlib.pyplot' not in sys.modules
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✓ {name}")
@@ -1,6 +1,4 @@
 import sympy as sp
-import matplotlib.pyplot as plt
-import numpy as np
 from sympy import symbols, solve, factor, limit, degree, simplify, cancel, div, expand
 from sympy.parsing.sympy_parser import (
     parse_expr,
@@ -8,7 +6,123 @@ from sympy.parsing.sympy_parser import (
     implicit_multiplication_application,
     convert_xor,
 )
+import math
 import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Graph sampling: grid size, |y| above which points are hidden (to keep the
+# curve readable) and the gap left on each side of a vertical asymptote
+GRAPH_POINTS = 1000
+GRAPH_CLIP = 100
+ASYMPTOTE_GAP = 0.1
+
+# Plot data for the frontend (plot_data): default viewport size in pixels and
+# the limits accepted, spacing of the initial grid, how far the polyline may
+# stray from the curve before an interval is split, the narrowest interval
+# split, the gap left at vertical asymptotes and holes, and the point budget
+PLOT_WIDTH = 800
+PLOT_HEIGHT = 533
+PLOT_MIN_PX = 16
+PLOT_MAX_PX = 4096
+PLOT_STEP_PX = 8
+PLOT_TOLERANCE_PX = 0.5
+PLOT_MIN_STEP_PX = 0.125
+PLOT_BREAK_GAP_PX = 0.5
+PLOT_REFINE_PASSES = 12
+PLOT_MAX_POINTS = 4000
+
+# Rendered graphs (render_graph): default image size and the resolutions accepted
+GRAPH_WIDTH = 1200
+GRAPH_HEIGHT = 800
+GRAPH_DPI = 100
+GRAPH_MIN_DPI = 50
+GRAPH_MAX_DPI = 300
+
+BANNER = "=" * 60 + "\nRATIONAL FUNCTION CALCULATOR\n" + "=" * 60
+
+
+@dataclass
+class AnalysisSection:
+    """One numbered part of the analysis and its step text."""
+
+    title: str
+    lines: List[str] = field(default_factory=list)
+    rule: int = 30
+
+    def render(self) -> str:
+        return "\n".join([f"\n{self.title}", "-" * self.rule] + self.lines)
+
+
+def render_report(sections: List[AnalysisSection]) -> str:
+    """The console report made of ``sections``, under the calculator banner."""
+    return "\n".join([BANNER] + [section.render() for section in sections]) + "\n"
+
+
+@dataclass
+class RationalFunctionAnalysis:
+    """Everything ``RationalFunctionCalculator.analyze`` finds, as SymPy values."""
+
+    function: str
+    numerator: sp.Expr
+    denominator: sp.Expr
+    factored_numerator: sp.Expr
+    factored_denominator: sp.Expr
+    common_factors: List[sp.Expr]
+    simplified_numerator: sp.Expr
+    simplified_denominator: sp.Expr
+    domain_restrictions: List[sp.Expr]
+    domain: str
+    zeros: List[sp.Expr]
+    x_intercepts: List[Tuple[sp.Expr, int]]
+    y_intercept: Optional[Tuple[int, sp.Expr]]
+    vertical_asymptotes: List[sp.Expr]
+    horizontal_asymptote: Optional[str]
+    oblique_asymptote: Optional[str]
+    holes: List[Tuple[sp.Expr, sp.Expr]]
+    sections: List[AnalysisSection] = field(default_factory=list)
+
+    def checklist(self) -> AnalysisSection:
+        asymptote = self.horizontal_asymptote or self.oblique_asymptote
+        return AnalysisSection("10) FINAL CHECKLIST", [
+            f"✓ Domain: {self.domain}",
+            f"✓ Domain restrictions: {self.domain_restrictions if self.domain_restrictions else 'None'}",
+            f"✓ Zeros: {self.zeros if self.zeros else 'None'}",
+            f"✓ X-intercepts: {self.x_intercepts if self.x_intercepts else 'None'}",
+            f"✓ Y-intercept: {self.y_intercept if self.y_intercept else 'None'}",
+            f"✓ Vertical asymptotes: {self.vertical_asymptotes if self.vertical_asymptotes else 'None'}",
+            f"✓ Horizontal/Oblique asymptote: {asymptote if asymptote else 'None'}",
+            f"✓ Holes: {self.holes if self.holes else 'None'}",
+        ], 20)
+
+    def render_text(self) -> str:
+        """The console report without the graph."""
+        return render_report(self.sections + [self.checklist()])
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-ready layout returned by ``/api/rational-function/analyze``."""
+        sections = self.sections + [self.checklist()]
+        steps = []
+        for section in sections:
+            steps.append(section.title)
+            steps.extend(line.strip() for line in section.lines if line.strip())
+        return {
+            'function': self.function,
+            'cleaned_function': f"({self.numerator})/({self.denominator})",
+            'factored_form': f"({self.factored_numerator})/({self.factored_denominator})",
+            'domain': self.domain,
+            'domain_restrictions': [str(r) for r in self.domain_restrictions],
+            'zeros': [str(z) for z in self.zeros],
+            'x_intercepts': [f"({x}, {y})" for x, y in self.x_intercepts],
+            'y_intercept': f"({self.y_intercept[0]}, {self.y_intercept[1]})" if self.y_intercept else '',
+            'vertical_asymptotes': [str(va) for va in self.vertical_asymptotes],
+            'horizontal_asymptote': self.horizontal_asymptote or '',
+            'oblique_asymptote': self.oblique_asymptote or '',
+            'holes': [f"({x}, {y})" for x, y in self.holes],
+            'steps': steps,
+            'sections': [{'title': section.title, 'lines': section.lines, 'rule': section.rule}
+                         for section in sections],
+        }
 
 
 class RationalFunctionCalculator:
@@ -202,261 +316,525 @@ class RationalFunctionCalculator:
                 pass
         return holes
 
-    def analyze_rational_function(self, func_str):
-        """Complete analysis of a rational function"""
-        print("=" * 60)
-        print("RATIONAL FUNCTION CALCULATOR")
-        print("=" * 60)
-
-        try:
-            # 1) Parse and clean function
-            print("\n1) CLEANED FUNCTION")
-            print("-" * 30)
-            numerator, denominator = self.parse_function(func_str)
-            print(f"Original: f(x) = {numerator}/{denominator}")
-
-            # Factor both
-            factored_num = self.factor_polynomial(numerator)
-            factored_den = self.factor_polynomial(denominator)
-            print(f"Factored: f(x) = {factored_num}/{factored_den}")
-
-            # Also show the factored denominator separately for clarity
-            if factored_den != denominator:
-                print(f"  Denominator factors: {denominator} = {factored_den}")
-
-            # Find common factors
-            common_factors, simplified_num, simplified_den = self.find_common_factors(numerator, denominator)
-            if common_factors:
-                print(f"Simplified: f(x) = {simplified_num}/{simplified_den}")
-                print(f"Common factors cancelled: {common_factors}")
-            else:
-                print("No common factors to cancel")
-
-            # 2) Domain & Restrictions
-            print("\n2) DOMAIN & DOMAIN RESTRICTIONS")
-            print("-" * 40)
-            domain_restrictions = self.find_domain(denominator)
-            print("Steps:")
-            print(f"  • Solve {denominator} = 0")
-            if factored_den != denominator:
-                print(f"  • Factored: {factored_den} = 0")
-            if domain_restrictions:
-                print(f"  • Excluded x-values: {domain_restrictions}")
-                domain_str = "(-∞, ∞) excluding " + ", ".join([str(r) for r in domain_restrictions])
-            else:
-                print("  • No excluded values")
-                domain_str = "(-∞, ∞)"
-            print(f"  • Domain: {domain_str}")
-            print("Explain: We exclude values that make the denominator zero.")
-
-            # 3) Zeros
-            print("\n3) ZEROS (ROOTS OF f)")
-            print("-" * 30)
-            zeros = self.find_zeros(simplified_num, common_factors)
-            print("Steps:")
-            print(f"  • Solve {simplified_num} = 0 (after cancellations)")
-            if zeros:
-                print("  • Solving step by step:")
-                # Show the factored form and solve each factor
+    def analyze(self, func_str):
+        """Analyze ``func_str``; returns a :class:`RationalFunctionAnalysis`.
+
+        Raises ValueError when the input is not of the form p(x)/q(x).
+        """
+        x = self.x
+        sections = []
+
+        # 1) Parse and clean function
+        lines = []
+        numerator, denominator = self.parse_function(func_str)
+        lines.append(f"Original: f(x) = {numerator}/{denominator}")
+
+        # Factor both
+        factored_num = self.factor_polynomial(numerator)
+        factored_den = self.factor_polynomial(denominator)
+        lines.append(f"Factored: f(x) = {factored_num}/{factored_den}")
+
+        # Also show the factored denominator separately for clarity
+        if factored_den != denominator:
+            lines.append(f"  Denominator factors: {denominator} = {factored_den}")
+
+        # Find common factors
+        common_factors, simplified_num, simplified_den = self.find_common_factors(numerator, denominator)
+        if common_factors:
+            lines.append(f"Simplified: f(x) = {simplified_num}/{simplified_den}")
+            lines.append(f"Common factors cancelled: {common_factors}")
+        else:
+            lines.append("No common factors to cancel")
+        sections.append(AnalysisSection("1) CLEANED FUNCTION", lines, 30))
+
+        # 2) Domain & Restrictions
+        lines = []
+        domain_restrictions = self.find_domain(denominator)
+        lines.append("Steps:")
+        lines.append(f"  • Solve {denominator} = 0")
+        if factored_den != denominator:
+            lines.append(f"  • Factored: {factored_den} = 0")
+        if domain_restrictions:
+            lines.append(f"  • Excluded x-values: {domain_restrictions}")
+            domain_str = "(-∞, ∞) excluding " + ", ".join([str(r) for r in domain_restrictions])
+        else:
+            lines.append("  • No excluded values")
+            domain_str = "(-∞, ∞)"
+        lines.append(f"  • Domain: {domain_str}")
+        lines.append("Explain: We exclude values that make the denominator zero.")
+        sections.append(AnalysisSection("2) DOMAIN & DOMAIN RESTRICTIONS", lines, 40))
+
+        # 3) Zeros
+        lines = []
+        zeros = self.find_zeros(simplified_num, common_factors)
+        lines.append("Steps:")
+        lines.append(f"  • Solve {simplified_num} = 0 (after cancellations)")
+        if zeros:
+            lines.append("  • Solving step by step:")
+            # Show the factored form and solve each factor
+            try:
+                factored_simplified = sp.factor(simplified_num)
+                if factored_simplified != simplified_num:
+                    lines.append(f"    {simplified_num} = {factored_simplified}")
+                    # Extract factors and show solving steps
+                    factors = sp.factor_list(simplified_num, x)[1]
+                    for factor_expr, multiplicity in factors:
+                        if multiplicity > 0:
+                            sol = sp.solve(factor_expr, x)[0]
+                            lines.append(f"    {factor_expr} = 0 → x = {sol}")
+                else:
+                    # If it can't be factored, show the solving directly
+                    lines.append(f"    {simplified_num} = 0 → x = {zeros[0]}")
+            except Exception:
+                # Fallback if factoring doesn't work
+                lines.append(f"    {simplified_num} = 0 → x = {zeros[0]}")
+            lines.append(f"  • Zeros: {zeros}")
+            lines.append("Explain: Zeros come from the numerator, unless cancelled by the denominator.")
+        else:
+            lines.append("  • No zeros found")
+        sections.append(AnalysisSection("3) ZEROS (ROOTS OF f)", lines, 30))
+
+        # 4) Intercepts
+        lines = []
+        x_intercepts, y_intercept = self.find_intercepts(simplified_num / simplified_den, zeros,
+                                                         domain_restrictions)
+        lines.append("X-intercepts:")
+        if x_intercepts:
+            lines.append("  • f(x) = 0, y = 0")
+            for x_int in x_intercepts:
+                x_val = x_int[0]
+                # Show the complete solving step
                 try:
-                    factored_num = sp.factor(simplified_num)
-                    if factored_num != simplified_num:
-                        print(f"    {simplified_num} = {factored_num}")
-                        # Extract factors and show solving steps
-                        factors = sp.factor_list(simplified_num, self.x)[1]
+                    if sp.factor(simplified_num) != simplified_num:
+                        factors = sp.factor_list(simplified_num, x)[1]
                         for factor_expr, multiplicity in factors:
                             if multiplicity > 0:
-                                sol = sp.solve(factor_expr, self.x)[0]
-                                print(f"    {factor_expr} = 0 → x = {sol}")
-                    else:
-                        # If it can't be factored, show the solving directly
-                        print(f"    {simplified_num} = 0 → x = {zeros[0] if zeros else 'no solution'}")
-                except:
-                    # Fallback if factoring doesn't work
-                    print(f"    {simplified_num} = 0 → x = {zeros[0] if zeros else 'no solution'}")
-                print(f"  • Zeros: {zeros}")
-                print("Explain: Zeros come from the numerator, unless cancelled by the denominator.")
-            else:
-                print("  • No zeros found")
-
-            # 4) Intercepts
-            print("\n4) INTERCEPTS")
-            print("-" * 20)
-            x_intercepts, y_intercept = self.find_intercepts(simplified_num / simplified_den, zeros,
-                                                             domain_restrictions)
-
-            print("X-intercepts:")
-            if x_intercepts:
-                print("  • f(x) = 0, y = 0")
-                for x_int in x_intercepts:
-                    x_val = x_int[0]
-                    # Show the complete solving step
-                    try:
-                        factored_num = sp.factor(simplified_num)
-                        if factored_num != simplified_num:
-                            factors = sp.factor_list(simplified_num, self.x)[1]
-                            for factor_expr, multiplicity in factors:
-                                if multiplicity > 0:
-                                    sol = sp.solve(factor_expr, self.x)[0]
-                                    if sol == x_val:
-                                        print(f"    → {factor_expr} = 0 → x = {x_val}")
-                                        print(f"    → ({x_val}, 0)")
-                                        break
-                    except:
-                        # If factoring doesn't work, show the direct solving
-                        print(f"    → {simplified_num} = 0 → x = {x_val}")
-                        print(f"    → ({x_val}, 0)")
-            else:
-                print("  • None")
+                                sol = sp.solve(factor_expr, x)[0]
+                                if sol == x_val:
+                                    lines.append(f"    → {factor_expr} = 0 → x = {x_val}")
+                                    lines.append(f"    → ({x_val}, 0)")
+                                    break
+                except Exception:
+                    # If factoring doesn't work, show the direct solving
+                    lines.append(f"    → {simplified_num} = 0 → x = {x_val}")
+                    lines.append(f"    → ({x_val}, 0)")
+        else:
+            lines.append("  • None")
 
-            print("Y-intercept:")
-            if y_intercept:
-                print("  • f(0) = substitute x = 0")
-                try:
-                    # Show the complete substitution step by step
-                    print(f"    f(0) = {simplified_num}/{simplified_den}")
-                    print(f"    f(0) = {simplified_num.subs(self.x, 0)}/{simplified_den.subs(self.x, 0)}")
-                    
-                    # Show the calculation step by step
-                    num_val = simplified_num.subs(self.x, 0)
-                    den_val = simplified_den.subs(self.x, 0)
-                    if den_val != 0:
-                        result = num_val / den_val
-                        print(f"    f(0) = {num_val}/{den_val} = {result}")
-                        print(f"    → (0, {result})")
-                    else:
-                        print(f"    → Undefined (denominator = 0)")
-                except Exception as e:
-                    print(f"    → Error calculating y-intercept: {e}")
-            else:
-                print("  • None (x=0 is excluded from domain)")
-
-            # 5) Vertical Asymptotes
-            print("\n5) VERTICAL ASYMPTOTES")
-            print("-" * 30)
-            v_asymptotes = self.find_vertical_asymptotes(denominator, common_factors)
-            print("Rule: Uncancelled real roots of q(x) produce VAs.")
-            print("Steps:")
-            print(f"  • Solve {denominator} = 0")
-            if factored_den != denominator:
-                print(f"  • Factored: {factored_den} = 0")
-            print(f"  • Check for cancellations: {common_factors}")
-            if v_asymptotes:
-                for va in v_asymptotes:
-                    print(f"  • VA: x = {va}")
-                    print(f"    lim(x→{va}±) f(x) = ±∞")
-            else:
-                print("  • No vertical asymptotes")
-
-            # 6) Horizontal/Oblique Asymptotes
-            print("\n6) HORIZONTAL / OBLIQUE ASYMPTOTES")
-            print("-" * 40)
-            n = degree(numerator, self.x)
-            m = degree(denominator, self.x)
-            print(f"Degrees: n = {n} (numerator), m = {m} (denominator)")
-
-            # Explain the rules clearly with mathematical notation
-            print("Rules for horizontal asymptotes:")
-            print("• If degree numerator < degree denominator → y = 0")
-            print("• If degree numerator = degree denominator → y = a/b (ratio of leading coefficients)")
-            print(
-                "• If degree numerator > degree denominator → no horizontal asymptote (instead: maybe oblique or higher polynomial asymptote)")
-
-            # Apply the specific rule for this function
-            print(f"\nFor this function:")
-            if n < m:
-                print(f"  Since degree numerator ({n}) < degree denominator ({m}) → y = 0")
-            elif n == m:
-                print(f"  Since degree numerator ({n}) = degree denominator ({m}) → y = a/b")
-            else:
-                print(f"  Since degree numerator ({n}) > degree denominator ({m}) → no horizontal asymptote")
+        lines.append("Y-intercept:")
+        if y_intercept:
+            lines.append("  • f(0) = substitute x = 0")
+            try:
+                # Show the complete substitution step by step
+                lines.append(f"    f(0) = {simplified_num}/{simplified_den}")
+                lines.append(f"    f(0) = {simplified_num.subs(x, 0)}/{simplified_den.subs(x, 0)}")
+
+                # Show the calculation step by step
+                num_val = simplified_num.subs(x, 0)
+                den_val = simplified_den.subs(x, 0)
+                if den_val != 0:
+                    result = num_val / den_val
+                    lines.append(f"    f(0) = {num_val}/{den_val} = {result}")
+                    lines.append(f"    → (0, {result})")
+                else:
+                    lines.append("    → Undefined (denominator = 0)")
+            except Exception as e:
+                lines.append(f"    → Error calculating y-intercept: {e}")
+        else:
+            lines.append("  • None (x=0 is excluded from domain)")
+        sections.append(AnalysisSection("4) INTERCEPTS", lines, 20))
+
+        # 5) Vertical Asymptotes
+        lines = []
+        v_asymptotes = self.find_vertical_asymptotes(denominator, common_factors)
+        lines.append("Rule: Uncancelled real roots of q(x) produce VAs.")
+        lines.append("Steps:")
+        lines.append(f"  • Solve {denominator} = 0")
+        if factored_den != denominator:
+            lines.append(f"  • Factored: {factored_den} = 0")
+        lines.append(f"  • Check for cancellations: {common_factors}")
+        if v_asymptotes:
+            for va in v_asymptotes:
+                lines.append(f"  • VA: x = {va}")
+                lines.append(f"    lim(x→{va}±) f(x) = ±∞")
+        else:
+            lines.append("  • No vertical asymptotes")
+        sections.append(AnalysisSection("5) VERTICAL ASYMPTOTES", lines, 30))
+
+        # 6) Horizontal/Oblique Asymptotes
+        lines = []
+        n = degree(numerator, x)
+        m = degree(denominator, x)
+        lines.append(f"Degrees: n = {n} (numerator), m = {m} (denominator)")
+
+        # Explain the rules clearly with mathematical notation
+        lines.append("Rules for horizontal asymptotes:")
+        lines.append("• If degree numerator < degree denominator → y = 0")
+        lines.append("• If degree numerator = degree denominator → y = a/b (ratio of leading coefficients)")
+        lines.append("• If degree numerator > degree denominator → no horizontal asymptote "
+                     "(instead: maybe oblique or higher polynomial asymptote)")
+
+        # Apply the specific rule for this function
+        lines.append("")
+        lines.append("For this function:")
+        if n < m:
+            lines.append(f"  Since degree numerator ({n}) < degree denominator ({m}) → y = 0")
+        elif n == m:
+            lines.append(f"  Since degree numerator ({n}) = degree denominator ({m}) → y = a/b")
+        else:
+            lines.append(f"  Since degree numerator ({n}) > degree denominator ({m}) → no horizontal asymptote")
 
-            ha = self.find_horizontal_asymptote(numerator, denominator)
-            if ha:
-                print(f"Horizontal asymptote: {ha}")
+        ha = self.find_horizontal_asymptote(numerator, denominator)
+        if ha:
+            lines.append(f"Horizontal asymptote: {ha}")
 
-            oa = self.find_oblique_asymptote(numerator, denominator)
-            if oa:
-                print(f"Oblique asymptote: {oa}")
-                print("Long division work:")
-                try:
-                    quotient, remainder = div(numerator, denominator)
-                    print(f"  {numerator} ÷ {denominator} = {quotient} + {remainder}/{denominator}")
-                    print(f"  So the slant asymptote is: y = {quotient}")
-                except:
-                    print("  Division calculation shown above")
-            elif n > m:
-                print("Since numerator degree > denominator degree, check for oblique asymptote:")
-                try:
-                    quotient, remainder = div(numerator, denominator)
-                    if degree(quotient, self.x) > 1:
-                        print(f"  Long division: {numerator} ÷ {denominator} = {quotient} + {remainder}/{denominator}")
-                        print(
-                            f"  This gives a polynomial asymptote of degree {degree(quotient, self.x)}: y = {quotient}")
-                    else:
-                        print(f"  Long division: {numerator} ÷ {denominator} = {quotient} + {remainder}/{denominator}")
-                        print(f"  No linear oblique asymptote found")
-                except:
-                    print("  Long division could not be performed")
-
-            if not ha and not oa:
-                print("No horizontal or oblique asymptote")
-                if n <= m:
-                    print("  This is expected since numerator degree ≤ denominator degree")
+        oa = self.find_oblique_asymptote(numerator, denominator)
+        if oa:
+            lines.append(f"Oblique asymptote: {oa}")
+            lines.append("Long division work:")
+            try:
+                quotient, remainder = div(numerator, denominator)
+                lines.append(f"  {numerator} ÷ {denominator} = {quotient} + {remainder}/{denominator}")
+                lines.append(f"  So the slant asymptote is: y = {quotient}")
+            except Exception:
+                lines.append("  Division calculation shown above")
+        elif n > m:
+            lines.append("Since numerator degree > denominator degree, check for oblique asymptote:")
+            try:
+                quotient, remainder = div(numerator, denominator)
+                lines.append(f"  Long division: {numerator} ÷ {denominator} = {quotient} + {remainder}/{denominator}")
+                if degree(quotient, x) > 1:
+                    lines.append(f"  This gives a polynomial asymptote of degree {degree(quotient, x)}: y = {quotient}")
                 else:
-                    print("  Long division was performed but no linear asymptote found")
-
-            # 7) Holes
-            print("\n7) HOLES (REMOVABLE DISCONTINUITIES)")
-            print("-" * 40)
-            holes = self.find_holes(common_factors, simplified_num / simplified_den)
-            print("Rule: Any common factor between p(x) and q(x) that was cancelled creates a hole.")
-            if holes:
-                for hole in holes:
-                    x_val = hole[0]
-                    print(f"  • Hole at ({x_val}, {hole[1]})")
-                    print(f"    (from cancelled factor x - {x_val} = 0 → x = {x_val})")
-            else:
-                print("  • No holes")
-
-            # 8) End Behavior
-            print("\n8) END BEHAVIOR & LOCAL BEHAVIOR")
-            print("-" * 40)
-            if v_asymptotes:
-                for va in v_asymptotes:
-                    print(f"  • Near VA x = {va}: function approaches ±∞")
-            if ha:
-                print(f"  • End behavior: approaches {ha}")
-            elif oa:
-                print(f"  • End behavior: approaches {oa}")
+                    lines.append("  No linear oblique asymptote found")
+            except Exception:
+                lines.append("  Long division could not be performed")
+
+        if not ha and not oa:
+            lines.append("No horizontal or oblique asymptote")
+            if n <= m:
+                lines.append("  This is expected since numerator degree ≤ denominator degree")
             else:
-                print(f"  • End behavior: dominated by highest degree terms")
-
-            # 9) Graph
-            print("\n9) GRAPH")
-            print("-" * 10)
-            self.plot_function(numerator, denominator, simplified_num, simplified_den,
-                               zeros, y_intercept, v_asymptotes, ha, oa, holes, domain_restrictions)
-
-            # 10) Final Checklist
-            print("\n10) FINAL CHECKLIST")
-            print("-" * 20)
-            print(f"✓ Domain: {domain_str}")
-            print(f"✓ Domain restrictions: {domain_restrictions if domain_restrictions else 'None'}")
-            print(f"✓ Zeros: {zeros if zeros else 'None'}")
-            print(f"✓ X-intercepts: {x_intercepts if x_intercepts else 'None'}")
-            print(f"✓ Y-intercept: {y_intercept if y_intercept else 'None'}")
-            print(f"✓ Vertical asymptotes: {v_asymptotes if v_asymptotes else 'None'}")
-            print(f"✓ Horizontal/Oblique asymptote: {ha if ha else oa if oa else 'None'}")
-            print(f"✓ Holes: {holes if holes else 'None'}")
+                lines.append("  Long division was performed but no linear asymptote found")
+        sections.append(AnalysisSection("6) HORIZONTAL / OBLIQUE ASYMPTOTES", lines, 40))
+
+        # 7) Holes
+        lines = []
+        holes = self.find_holes(common_factors, simplified_num / simplified_den)
+        lines.append("Rule: Any common factor between p(x) and q(x) that was cancelled creates a hole.")
+        if holes:
+            for hole in holes:
+                x_val = hole[0]
+                lines.append(f"  • Hole at ({x_val}, {hole[1]})")
+                lines.append(f"    (from cancelled factor x - {x_val} = 0 → x = {x_val})")
+        else:
+            lines.append("  • No holes")
+        sections.append(AnalysisSection("7) HOLES (REMOVABLE DISCONTINUITIES)", lines, 40))
+
+        # 8) End Behavior
+        lines = []
+        for va in v_asymptotes:
+            lines.append(f"  • Near VA x = {va}: function approaches ±∞")
+        if ha:
+            lines.append(f"  • End behavior: approaches {ha}")
+        elif oa:
+            lines.append(f"  • End behavior: approaches {oa}")
+        else:
+            lines.append("  • End behavior: dominated by highest degree terms")
+        sections.append(AnalysisSection("8) END BEHAVIOR & LOCAL BEHAVIOR", lines, 40))
+
+        return RationalFunctionAnalysis(
+            function=func_str,
+            numerator=numerator,
+            denominator=denominator,
+            factored_numerator=factored_num,
+            factored_denominator=factored_den,
+            common_factors=common_factors,
+            simplified_numerator=simplified_num,
+            simplified_denominator=simplified_den,
+            domain_restrictions=domain_restrictions,
+            domain=domain_str,
+            zeros=zeros,
+            x_intercepts=x_intercepts,
+            y_intercept=y_intercept,
+            vertical_asymptotes=v_asymptotes,
+            horizontal_asymptote=ha,
+            oblique_asymptote=oa,
+            holes=holes,
+            sections=sections,
+        )
 
+    def analyze_rational_function(self, func_str):
+        """Print the complete analysis of a rational function and plot it"""
+        print(BANNER)
+        try:
+            analysis = self.analyze(func_str)
         except Exception as e:
             print(f"Error analyzing function: {e}")
+            return None
+
+        for section in analysis.sections:
+            print(section.render())
+
+        # 9) Graph
+        print(AnalysisSection("9) GRAPH", [], 10).render())
+        self.plot_function(analysis.numerator, analysis.denominator,
+                           analysis.simplified_numerator, analysis.simplified_denominator,
+                           analysis.zeros, analysis.y_intercept, analysis.vertical_asymptotes,
+                           analysis.horizontal_asymptote, analysis.oblique_asymptote,
+                           analysis.holes, analysis.domain_restrictions)
+
+        print(analysis.checklist().render())
+        return analysis
+
+    def graph_range(self, v_asymptotes):
+        """Default x-range of the graph: -10..10, widened to show every real vertical asymptote."""
+        asymptotes = [float(va) for va in v_asymptotes if va.is_real]
+        x_min, x_max = -10.0, 10.0
+        if asymptotes:
+            # Adjust range to show asymptotes clearly
+            x_min = min(x_min, min(asymptotes) - 2)
+            x_max = max(x_max, max(asymptotes) + 2)
+        return x_min, x_max
+
+    def vectorize(self, func):
+        """Compile ``func`` with lambdify into a function of a numpy array of x values.
+
+        The result is a float array of the same shape, NaN where ``func`` is
+        undefined or not real.
+        """
+        import numpy as np
+
+        try:
+            compiled = sp.lambdify(self.x, func, 'numpy')
+        except (TypeError, ValueError, NameError, SyntaxError):
+            compiled = None
+
+        def evaluate(x_vals):
+            with np.errstate(all='ignore'):
+                try:
+                    raw = np.asarray(compiled(x_vals))
+                except (TypeError, ValueError, NameError):
+                    # Not a numeric function of x alone (e.g. another symbol)
+                    raw = np.array(np.nan)
+                if np.iscomplexobj(raw):
+                    raw = np.where(np.abs(raw.imag) < 1e-12, raw.real, np.nan)
+                return np.broadcast_to(raw.astype(float), x_vals.shape).copy()
+        return evaluate
+
+    def sample_function(self, func, v_asymptotes, points=GRAPH_POINTS, x_range=None):
+        """Sample ``func`` for plotting; returns ``(x_min, x_max, x_vals, y_vals)``.
+
+        The function is compiled once with lambdify and evaluated on the whole
+        grid at once.  Points within ASYMPTOTE_GAP of a vertical asymptote,
+        undefined points and values beyond GRAPH_CLIP come back as NaN, which
+        matplotlib leaves as gaps instead of joining across the asymptote.
+        ``x_range`` defaults to ``graph_range``.
+        """
+        import numpy as np
+
+        asymptotes = np.array([float(va) for va in v_asymptotes if va.is_real], dtype=float)
+        x_min, x_max = x_range or self.graph_range(v_asymptotes)
+
+        x_vals = np.linspace(x_min, x_max, points)
+        y_vals = self.vectorize(func)(x_vals)
+        with np.errstate(invalid='ignore'):
+            hidden = ~np.isfinite(y_vals) | (np.abs(y_vals) >= GRAPH_CLIP)
+        if asymptotes.size:
+            hidden |= (np.abs(x_vals[:, None] - asymptotes) < ASYMPTOTE_GAP).any(axis=1)
+        y_vals[hidden] = np.nan
+        return x_min, x_max, x_vals, y_vals
+
+    def sample_segments(self, func, breaks, x_min, x_max, y_min, y_max, width, height):
+        """Sample ``func`` adaptively for a ``width`` x ``height`` pixel viewport.
+
+        Returns the visible polylines as lists of ``(x, y)`` points.  The
+        x-range is cut at ``breaks`` (vertical asymptotes and holes), so no
+        polyline crosses one.  Each piece starts on a grid of one point per
+        PLOT_STEP_PX pixels; intervals whose midpoint is more than
+        PLOT_TOLERANCE_PX off the chord, or where the curve stops being
+        defined, are halved again, so points gather where the curve bends.
+        """
+        import numpy as np
+
+        evaluate = self.vectorize(func)
+        x_scale = width / (x_max - x_min)
+        y_scale = height / (y_max - y_min)
+        gap = PLOT_BREAK_GAP_PX / x_scale
+        edges = [x_min] + sorted(b for b in set(breaks) if x_min < b < x_max) + [x_max]
+        budget = PLOT_MAX_POINTS // (len(edges) - 1)
+
+        polylines = []
+        for i, (start, stop) in enumerate(zip(edges, edges[1:])):
+            if i > 0:
+                start += gap
+            if i < len(edges) - 2:
+                stop -= gap
+            if stop <= start:
+                continue
+            count = max(3, math.ceil((stop - start) * x_scale / PLOT_STEP_PX) + 1)
+            x_vals = np.linspace(start, stop, min(count, budget))
+            x_vals, y_vals = self._refine(evaluate, x_vals, evaluate(x_vals), x_scale, y_scale,
+                                          y_min, y_max, budget)
+            polylines.extend(self._clip_to_view(x_vals, y_vals, y_min, y_max))
+        return polylines
+
+    def _refine(self, evaluate, x_vals, y_vals, x_scale, y_scale, y_min, y_max, budget):
+        """Halve the intervals where the chord is off the curve, up to ``budget`` points."""
+        import numpy as np
+
+        # Far off-screen values are capped so they don't swamp the error measure
+        low = y_min - (y_max - y_min)
+        high = y_max + (y_max - y_min)
+        for _ in range(PLOT_REFINE_PASSES):
+            room = budget - len(x_vals)
+            if room <= 0:
+                break
+            mids = (x_vals[:-1] + x_vals[1:]) / 2
+            y_mids = evaluate(mids)
+            left, right, middle = (np.clip(v, low, high) for v in (y_vals[:-1], y_vals[1:], y_mids))
+            with np.errstate(invalid='ignore'):
+                error = np.abs(middle - (left + right) / 2) * y_scale
+                defined = np.isfinite(left) & np.isfinite(right) & np.isfinite(middle)
+                undefined = ~np.isfinite(left) & ~np.isfinite(right) & ~np.isfinite(middle)
+                # Partly undefined: refine to find where the curve stops
+                error[~defined & ~undefined] = np.inf
+                hidden = (((left > y_max) & (right > y_max) & (middle > y_max))
+                          | ((left < y_min) & (right < y_min) & (middle < y_min)))
+            split = ((error > PLOT_TOLERANCE_PX) & ~hidden
+                     & ((x_vals[1:] - x_vals[:-1]) * x_scale > PLOT_MIN_STEP_PX))
+            index = np.nonzero(split)[0]
+            if not index.size:
+                break
+            if index.size > room:
+                index = np.sort(index[np.argsort(-error[index], kind='stable')[:room]])
+            x_vals = np.insert(x_vals, index + 1, mids[index])
+            y_vals = np.insert(y_vals, index + 1, y_mids[index])
+        return x_vals, y_vals
+
+    @staticmethod
+    def _clip_to_view(x_vals, y_vals, y_min, y_max):
+        """Split sampled points into the polylines inside ``y_min..y_max``.
+
+        Undefined and off-screen runs are dropped; where the curve leaves or
+        enters the view the polyline is cut at the view's edge, so it still
+        reaches the border.
+        """
+        def edge(outside, inside):
+            target = y_max if outside[1] > y_max else y_min
+            t = (target - inside[1]) / (outside[1] - inside[1])
+            return (inside[0] + t * (outside[0] - inside[0]), target)
+
+        polylines, current, previous = [], [], None
+        for point in zip(x_vals.tolist(), y_vals.tolist()):
+            finite = math.isfinite(point[1])
+            if y_min <= point[1] <= y_max:
+                if not current and previous is not None and math.isfinite(previous[1]):
+                    current.append(edge(previous, point))
+                current.append(point)
+            elif current:
+                if finite:
+                    current.append(edge(point, current[-1]))
+                if len(current) > 1:
+                    polylines.append(current)
+                current = []
+            previous = point
+        if len(current) > 1:
+            polylines.append(current)
+        return polylines
+
+    def viewport(self, analysis, x_min, x_max, y_min, y_max, width, height):
+        """Checked ``(x_min, x_max, y_min, y_max, width, height)`` for graphing ``analysis``.
+
+        A missing x bound selects ``graph_range``.  Raises ValueError for
+        bounds that are not finite or not increasing, and for sizes outside
+        PLOT_MIN_PX..PLOT_MAX_PX pixels.
+        """
+        if x_min is None or x_max is None:
+            x_min, x_max = self.graph_range(analysis.vertical_asymptotes)
+        x_min, x_max, y_min, y_max = (float(v) for v in (x_min, x_max, y_min, y_max))
+        width, height = int(width), int(height)
+        if not all(math.isfinite(v) for v in (x_min, x_max, y_min, y_max)):
+            raise ValueError("The viewport bounds must be finite numbers")
+        if x_min >= x_max or y_min >= y_max:
+            raise ValueError("The viewport needs x_min < x_max and y_min < y_max")
+        if not (PLOT_MIN_PX <= width <= PLOT_MAX_PX and PLOT_MIN_PX <= height <= PLOT_MAX_PX):
+            raise ValueError(f"The viewport width and height must be {PLOT_MIN_PX} to {PLOT_MAX_PX} pixels")
+        return x_min, x_max, y_min, y_max, width, height
+
+    def plot_data(self, func_str, x_min=None, x_max=None, y_min=-10.0, y_max=10.0,
+                  width=PLOT_WIDTH, height=PLOT_HEIGHT):
+        """Everything the frontend needs to draw ``func_str`` itself, as JSON-ready data.
+
+        The viewport is ``x_min..x_max`` by ``y_min..y_max`` drawn on
+        ``width`` x ``height`` pixels; without an x-range the graph's default
+        range is used.  ``segments`` are the polylines from sample_segments,
+        rounded to a tenth of a pixel.  Asymptotes, holes and intercepts are
+        numbers, listed when they fall inside the viewport.
+
+        Raises ValueError for an unusable function or viewport.
+        """
+        analysis = self.analyze(func_str)
+        x_min, x_max, y_min, y_max, width, height = self.viewport(
+            analysis, x_min, x_max, y_min, y_max, width, height)
+
+        def real(value):
+            try:
+                value = complex(sp.N(value))
+            except TypeError:
+                return None
+            return value.real if abs(value.imag) < 1e-12 and math.isfinite(value.real) else None
+
+        def digits(scale):
+            return max(0, math.ceil(math.log10(10 * scale)))
+
+        x_digits = digits(width / (x_max - x_min))
+        y_digits = digits(height / (y_max - y_min))
+
+        def in_x(value):
+            return value is not None and x_min <= value <= x_max
+
+        asymptotes = [x for x in map(real, analysis.vertical_asymptotes) if x is not None]
+        holes = [(real(x), real(y)) for x, y in analysis.holes]
+        holes = [(x, y) for x, y in holes if in_x(x) and y is not None]
+        func = analysis.simplified_numerator / analysis.simplified_denominator
+        segments = self.sample_segments(func, asymptotes + [x for x, _ in holes],
+                                        x_min, x_max, y_min, y_max, width, height)
+
+        # The line the curve approaches far out is the polynomial part of the quotient
+        horizontal = oblique = None
+        quotient, _ = div(expand(analysis.simplified_numerator), expand(analysis.simplified_denominator), self.x)
+        quotient_degree = degree(quotient, self.x) if quotient != 0 else 0
+        if quotient_degree == 0:
+            horizontal = real(quotient)
+        elif quotient_degree == 1:
+            slope, intercept = sp.Poly(quotient, self.x).all_coeffs()
+            oblique = {'slope': real(slope), 'intercept': real(intercept)}
+        y_intercept = real(analysis.y_intercept[1]) if analysis.y_intercept else None
+
+        return {
+            'function': func_str,
+            'viewport': {'x_min': x_min, 'x_max': x_max, 'y_min': y_min, 'y_max': y_max,
+                         'width': width, 'height': height},
+            'segments': [[[round(x, x_digits), round(y, y_digits)] for x, y in segment]
+                         for segment in segments],
+            'points': sum(len(segment) for segment in segments),
+            'vertical_asymptotes': [round(x, x_digits) for x in asymptotes if in_x(x)],
+            'horizontal_asymptote': horizontal,
+            'oblique_asymptote': oblique,
+            'holes': [[round(x, x_digits), round(y, y_digits)] for x, y in holes],
+            'zeros': [round(x, x_digits) for x in map(real, analysis.zeros) if in_x(x)],
+            'y_intercept': round(y_intercept, y_digits) if in_x(0.0) and y_intercept is not None else None,
+        }
 
     def plot_function(self, numerator, denominator, simplified_num, simplified_den,
                       zeros, y_intercept, v_asymptotes, ha, oa, holes, domain_restrictions):
         """Create a comprehensive plot of the rational function"""
         try:
+            # Imported here: only plotting needs them and matplotlib is slow to load
+            import matplotlib.pyplot as plt
+            import numpy as np
+
             # Create the function for plotting
             if simplified_num != numerator or simplified_den != denominator:
                 func = simplified_num / simplified_den
@@ -466,39 +844,14 @@ class RationalFunctionCalculator:
             # Create plot
             fig, ax = plt.subplots(figsize=(12, 8))
 
-            # Determine x-range (avoid asymptotes)
-            x_min, x_max = -10, 10
-            if v_asymptotes:
-                # Adjust range to show asymptotes clearly
-                x_min = min(x_min, min(v_asymptotes) - 2)
-                x_max = max(x_max, max(v_asymptotes) + 2)
-
-            # Generate x values, avoiding asymptotes
-            x_vals = []
-            y_vals = []
-
-            for x in np.linspace(x_min, x_max, 1000):
-                # Skip values too close to asymptotes
-                skip = False
-                for va in v_asymptotes:
-                    if abs(x - va) < 0.1:
-                        skip = True
-                        break
-
-                if not skip:
-                    try:
-                        y = float(func.subs(self.x, x))
-                        if abs(y) < 100:  # Limit extreme values for visibility
-                            x_vals.append(x)
-                            y_vals.append(y)
-                    except:
-                        continue
+            # Sample the curve, leaving gaps at the asymptotes
+            x_min, x_max, x_vals, y_vals = self.sample_function(func, v_asymptotes)
 
             # Plot the main function
             ax.plot(x_vals, y_vals, 'b-', linewidth=2, label='f(x)')
 
-            # Plot asymptotes
-            for va in v_asymptotes:
+            # Plot asymptotes (complex roots of the denominator have no line to draw)
+            for va in (va for va in v_asymptotes if va.is_real):
                 ax.axvline(x=va, color='r', linestyle='--', alpha=0.7, label=f'VA: x={va}')
 
             # Plot horizontal asymptote
@@ -534,7 +887,7 @@ class RationalFunctionCalculator:
                     pass
 
             # Plot intercepts
-            for zero in zeros:
+            for zero in (zero for zero in zeros if zero.is_real):
                 ax.plot(zero, 0, 'ko', markersize=8, label=f'x-int: ({zero}, 0)')
 
             if y_intercept:
@@ -568,12 +921,22 @@ class RationalFunctionCalculator:
             print("Graph could not be generated.")
 
     def plot_function_to_base64(self, numerator, denominator, simplified_num, simplified_den,
-                      zeros, y_intercept, v_asymptotes, ha, oa, holes, domain_restrictions):
-        """Create a comprehensive plot and return as base64 encoded image"""
+                      zeros, y_intercept, v_asymptotes, ha, oa, holes, domain_restrictions,
+                      x_range=None, y_range=(-10, 10), size=(12, 8), dpi=GRAPH_DPI):
+        """Create a comprehensive plot and return as base64 encoded image
+
+        ``size`` is the figure size in inches.  The figure is drawn on an
+        Agg canvas without going through pyplot, so this never opens a
+        window and is safe to call from several threads at once.
+        """
         try:
             import base64
             from io import BytesIO
-            
+
+            import numpy as np
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
             # Create the function for plotting
             if simplified_num != numerator or simplified_den != denominator:
                 func = simplified_num / simplified_den
@@ -581,41 +944,18 @@ class RationalFunctionCalculator:
                 func = numerator / denominator
 
             # Create plot
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig = Figure(figsize=size)
+            FigureCanvasAgg(fig)
+            ax = fig.subplots()
 
-            # Determine x-range (avoid asymptotes)
-            x_min, x_max = -10, 10
-            if v_asymptotes:
-                # Adjust range to show asymptotes clearly
-                x_min = min(x_min, min(v_asymptotes) - 2)
-                x_max = max(x_max, max(v_asymptotes) + 2)
-
-            # Generate x values, avoiding asymptotes
-            x_vals = []
-            y_vals = []
-
-            for x in np.linspace(x_min, x_max, 1000):
-                # Skip values too close to asymptotes
-                skip = False
-                for va in v_asymptotes:
-                    if abs(x - va) < 0.1:
-                        skip = True
-                        break
-
-                if not skip:
-                    try:
-                        y = float(func.subs(self.x, x))
-                        if abs(y) < 100:  # Limit extreme values for visibility
-                            x_vals.append(x)
-                            y_vals.append(y)
-                    except:
-                        continue
+            # Sample the curve, leaving gaps at the asymptotes
+            x_min, x_max, x_vals, y_vals = self.sample_function(func, v_asymptotes, x_range=x_range)
 
             # Plot the main function
             ax.plot(x_vals, y_vals, 'b-', linewidth=2, label='f(x)')
 
-            # Plot asymptotes
-            for va in v_asymptotes:
+            # Plot asymptotes (complex roots of the denominator have no line to draw)
+            for va in (va for va in v_asymptotes if va.is_real):
                 ax.axvline(x=va, color='r', linestyle='--', alpha=0.7, label=f'VA: x={va}')
 
             # Plot horizontal asymptote
@@ -651,7 +991,7 @@ class RationalFunctionCalculator:
                     pass
 
             # Plot intercepts
-            for zero in zeros:
+            for zero in (zero for zero in zeros if zero.is_real):
                 ax.plot(zero, 0, 'ko', markersize=8, label=f'x-int: ({zero}, 0)')
 
             if y_intercept:
@@ -669,7 +1009,7 @@ class RationalFunctionCalculator:
             ax.set_title('Rational Function Graph')
             ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
             ax.set_xlim(x_min, x_max)
-            ax.set_ylim(-10, 10)
+            ax.set_ylim(*y_range)
 
             # Add domain restrictions as text
             if domain_restrictions:
@@ -677,22 +1017,41 @@ class RationalFunctionCalculator:
                 ax.text(0.02, 0.98, restriction_text, transform=ax.transAxes,
                         verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
 
-            plt.tight_layout()
-            
+            fig.tight_layout()
+
             # Save to BytesIO buffer and convert to base64
             buf = BytesIO()
-            plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-            buf.close()
-            plt.close(fig)  # Important: close the figure to free memory
-            
-            return img_base64
+            fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+            return base64.b64encode(buf.getvalue()).decode('utf-8')
 
         except Exception as e:
-            plt.close(fig) if 'fig' in locals() else None
             return None
 
+    def render_graph(self, func_str, x_min=None, x_max=None, y_min=-10.0, y_max=10.0,
+                     width=GRAPH_WIDTH, height=GRAPH_HEIGHT, dpi=GRAPH_DPI):
+        """The graph of ``func_str`` as a base64 PNG, drawn ``width`` x ``height`` pixels at ``dpi``.
+
+        The viewport is checked as in ``plot_data``.  Raises ValueError for an
+        unusable function, viewport or resolution, or when the graph cannot
+        be drawn.
+        """
+        analysis = self.analyze(func_str)
+        x_min, x_max, y_min, y_max, width, height = self.viewport(
+            analysis, x_min, x_max, y_min, y_max, width, height)
+        dpi = int(dpi)
+        if not GRAPH_MIN_DPI <= dpi <= GRAPH_MAX_DPI:
+            raise ValueError(f"The resolution must be {GRAPH_MIN_DPI} to {GRAPH_MAX_DPI} dpi")
+        image = self.plot_function_to_base64(
+            analysis.numerator, analysis.denominator,
+            analysis.simplified_numerator, analysis.simplified_denominator,
+            analysis.zeros, analysis.y_intercept, analysis.vertical_asymptotes,
+            analysis.horizontal_asymptote, analysis.oblique_asymptote,
+            analysis.holes, analysis.domain_restrictions,
+            x_range=(x_min, x_max), y_range=(y_min, y_max), size=(width / dpi, height / dpi), dpi=dpi)
+        if image is None:
+            raise ValueError("Graph could not be generated")
+        return image
+
 
 def main():
     calculator = RationalFunctionCalculator()